@@ -8,6 +8,7 @@ Supporte plusieurs modes: STDIO (Claude Desktop), HTTP, SSE, et ChatGPT.
 import logging
 from config.settings import setup_logging, load_environment
 from core.mcp_server import create_mcp_server
+from services.property_catalog import get_property_catalog
 from tools import register_all_tools
 
 def main():
@@ -29,6 +30,10 @@ def main():
         register_all_tools(mcp_server)
         logger.info("Outils MCP enregistrés avec succès")
         
+        # Préchargement du catalogue de propriétés Wikidata (identifiants externes sans appel réseau)
+        catalog = get_property_catalog()
+        logger.info(f"Catalogue de propriétés Wikidata: {len(catalog)} propriétés en local")
+        
         # Démarrage du serveur selon le mode configuré
         mode = config.get("mode", "stdio")
         logger.info(f"✅ Serveur MCP Wiki prêt à recevoir des requêtes en mode {mode.upper()}")
@@ -39,7 +39,105 @@ def get_wikipedia_config():
         "pageviews_api_url": "https://wikimedia.org/api/rest_v1",
         "user_agent": os.getenv("WIKIPEDIA_USER_AGENT", "MCP-Wiki/1.0 (https://github.com/yourrepo/mcp-wiki)"),
         "default_language": os.getenv("WIKIPEDIA_DEFAULT_LANGUAGE", "en"),
-        "max_results": int(os.getenv("WIKIPEDIA_MAX_RESULTS", "20"))
+        "max_results": int(os.getenv("WIKIPEDIA_MAX_RESULTS", "20")),
+        "stats_concurrency": int(os.getenv("WIKIPEDIA_STATS_CONCURRENCY", "10"))  # Pages traitées en parallèle
+    }
+
+def get_wikidata_config():
+    """Retourne la configuration Wikidata"""
+    return {
+        "entity_streaming": os.getenv("WIKIDATA_ENTITY_STREAMING", "false").lower() in ("1", "true", "yes"),  # Parsing en flux (ijson)
+        "batch_concurrency": int(os.getenv("WIKIDATA_BATCH_CONCURRENCY", "4"))  # Lots wbgetentities envoyés en parallèle (reprises: HTTP_MAX_RETRIES)
+    }
+
+def get_response_config():
+    """Retourne la configuration des réponses d'outils (sérialisation JSON, compression HTTP)"""
+    content_mode = os.getenv("RESPONSE_CONTENT_MODE", "text").lower()
+    return {
+        "json_compact": os.getenv("RESPONSE_JSON_COMPACT", "true").lower() in ("1", "true", "yes"),  # false = JSON indenté
+        "content_mode": content_mode if content_mode in ("text", "structured") else "text",  # structured = + structuredContent
+        "compression_min_size": int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024")),  # Octets (0 = pas de compression)
+        "compression_level": int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "5"))  # gzip 1-9, brotli 0-11
+    }
+
+def get_http_config():
+    """Retourne la configuration du transport HTTP partagé (pools keep-alive)"""
+    return {
+        "pool_maxsize": int(os.getenv("HTTP_POOL_MAXSIZE", "20")),  # Connexions persistantes par hôte
+        "keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60")),  # Secondes
+        "timeout": float(os.getenv("HTTP_TIMEOUT", "30")),
+        "connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")),
+        "http2": os.getenv("HTTP_ENABLE_HTTP2", "true").lower() in ("1", "true", "yes"),
+        "rate_limit_per_host": float(os.getenv("HTTP_RATE_LIMIT_PER_HOST", "50")),  # Requêtes/s par hôte (0 = illimité)
+        "max_retries": int(os.getenv("HTTP_MAX_RETRIES", "3")),  # Reprises sur 429/503/maxlag et erreurs réseau
+        "retry_backoff": float(os.getenv("HTTP_RETRY_BACKOFF", "0.5")),  # Secondes, doublé à chaque reprise (avec gigue)
+        "retry_backoff_max": float(os.getenv("HTTP_RETRY_BACKOFF_MAX", "30")),
+        "retry_after_max": float(os.getenv("HTTP_RETRY_AFTER_MAX", "60")),  # Retry-After plus long = abandon
+        "maxlag": int(os.getenv("HTTP_MAXLAG", "5"))  # Paramètre maxlag des appels MediaWiki (0 = désactivé)
+    }
+
+def get_url_fetch_config():
+    """Retourne la configuration du téléchargement de pages web (resolve_wikidata_entities_from_urls)"""
+    return {
+        "concurrency": int(os.getenv("URL_FETCH_CONCURRENCY", "8")),  # Pages téléchargées en parallèle
+        "per_domain": int(os.getenv("URL_FETCH_PER_DOMAIN", "2")),  # Pages en parallèle sur un même domaine
+        "max_bytes": int(os.getenv("URL_FETCH_MAX_BYTES", "2000000"))  # Octets lus au plus par page
+    }
+
+def get_cache_config():
+    """Retourne la configuration du cache de réponses (mémoire LRU + disque SQLite)"""
+    default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'mcp_wiki_cache.sqlite3')
+    return {
+        "enabled": os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "memory_maxsize": int(os.getenv("CACHE_MEMORY_MAXSIZE", "2048")),  # Entrées
+        "memory_max_bytes": int(os.getenv("CACHE_MEMORY_MAX_BYTES", "67108864")),  # Taille JSON cumulée (0 = sans plafond)
+        "memory_max_entry_bytes": int(os.getenv("CACHE_MEMORY_MAX_ENTRY_BYTES", "4194304")),  # Au-delà: disque uniquement
+        "disk_path": os.getenv("CACHE_DISK_PATH", default_path),  # Vide = pas de cache disque
+        # TTL (secondes) par catégorie d'endpoint
+        "ttl": {
+            "search": int(os.getenv("CACHE_TTL_SEARCH", "300")),
+            "page_info": int(os.getenv("CACHE_TTL_PAGE_INFO", "3600")),
+            "links": int(os.getenv("CACHE_TTL_LINKS", "3600")),
+            "pageviews": int(os.getenv("CACHE_TTL_PAGEVIEWS", "3600")),
+            "entity": int(os.getenv("CACHE_TTL_ENTITY", "21600")),
+            "labels": int(os.getenv("CACHE_TTL_LABELS", "86400"))
+        }
+    }
+
+def get_property_catalog_config():
+    """Retourne la configuration du catalogue local des propriétés Wikidata"""
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    return {
+        "path": os.getenv("PROPERTY_CATALOG_PATH", os.path.join(project_root, 'data', 'wikidata_properties.sqlite3')),
+        # Snapshot livré avec le projet, importé au premier démarrage
+        "snapshot_path": os.getenv("PROPERTY_CATALOG_SNAPSHOT", os.path.join(project_root, 'data', 'wikidata_properties.json')),
+        "max_age": int(os.getenv("PROPERTY_CATALOG_MAX_AGE", "2592000"))  # Secondes avant rafraîchissement (0 = jamais)
+    }
+
+def get_link_graph_config():
+    """Retourne la configuration des index de liens locaux (construits depuis les dumps Wikipedia)"""
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    return {
+        # Un sous-répertoire par langue (ex: data/link_graph/fr); langue sans index = API en direct
+        "path": os.getenv("LINK_GRAPH_PATH", os.path.join(project_root, 'data', 'link_graph'))
+    }
+
+def get_wikidata_store_config():
+    """Retourne la configuration du store Wikidata local (construit depuis un dump JSON)"""
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    return {
+        # Store absent = API en direct
+        "path": os.getenv("WIKIDATA_STORE_PATH", os.path.join(project_root, 'data', 'wikidata_store')),
+        # Langues des labels/descriptions/alias conservés à la construction
+        "languages": [lang.strip() for lang in os.getenv("WIKIDATA_STORE_LANGUAGES", "fr,en").split(",") if lang.strip()]
+    }
+
+def get_label_index_config():
+    """Retourne la configuration des index de labels Wikidata locaux (résolution d'entités)"""
+    project_root = os.path.dirname(os.path.dirname(__file__))
+    return {
+        # Un sous-répertoire par langue (ex: data/label_index/fr); langue sans index = wbsearchentities
+        "path": os.getenv("LABEL_INDEX_PATH", os.path.join(project_root, 'data', 'label_index'))
     }
 
 def get_headers():
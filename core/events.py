@@ -0,0 +1,83 @@
+"""Événements intermédiaires émis par les outils pendant leur exécution (streaming SSE)
+
+Protocole (un objet JSON par événement SSE, entre `tool_start` et `tool_result`):
+    {"type": "progress", "seq": 3, "elapsed_ms": 412, "stage": "labels", "current": 2, "total": 4}
+    {"type": "partial_result", "seq": 4, "elapsed_ms": 430, "kind": "link_stats", ...}
+
+`seq` est croissant au sein d'un appel; `current`/`total` sont omis quand ils n'ont pas de sens.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from core.serialization import dumps
+
+
+class EventStream:
+    """Flux d'événements d'un appel d'outil: numérotés, horodatés et sérialisés à l'émission."""
+
+    def __init__(self, sink: Callable[[str], None]):
+        self.sink = sink
+        self.seq = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def push(self, event_type: str, data: dict) -> None:
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+        event = {
+            "type": event_type,
+            "seq": seq,
+            "elapsed_ms": int((time.monotonic() - self.started) * 1000),
+            **data,
+        }
+        # Sérialisé immédiatement: les objets passés peuvent être modifiés ensuite sans effet
+        self.sink(dumps(event, compact=True))
+
+
+# Flux de l'appel d'outil en cours (None hors streaming)
+_event_stream: ContextVar[Optional[EventStream]] = ContextVar("tool_event_stream", default=None)
+
+
+def emit_event(event_type: str, **data: Any) -> None:
+    """Émet un événement intermédiaire vers le client de l'appel en cours.
+
+    Sans client en streaming (STDIO, /tools/call), l'appel ne fait rien.
+    """
+    stream = _event_stream.get()
+    if stream is not None:
+        stream.push(event_type, data)
+
+
+def emit_progress(stage: str, current: Optional[int] = None, total: Optional[int] = None, **data: Any) -> None:
+    """Avancement d'une étape (ex: stage="labels", current=2, total=4)."""
+    if current is not None:
+        data["current"] = current
+    if total is not None:
+        data["total"] = total
+    emit_event("progress", stage=stage, **data)
+
+
+def emit_partial_result(kind: str, **data: Any) -> None:
+    """Résultat partiel exploitable avant la fin de l'outil (ex: kind="link_stats")."""
+    emit_event("partial_result", kind=kind, **data)
+
+
+def streaming_enabled() -> bool:
+    """Indique si un client reçoit les événements de l'appel en cours."""
+    return _event_stream.get() is not None
+
+
+@contextmanager
+def capture_events(sink: Callable[[str], None]) -> Iterator[EventStream]:
+    """Redirige vers `sink` les événements émis dans ce contexte (et ses tâches filles)."""
+    stream = EventStream(sink)
+    token = _event_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _event_stream.reset(token)
@@ -0,0 +1,105 @@
+"""Sérialisation JSON des réponses d'outils (orjson si installé) et compression HTTP"""
+
+import gzip
+import json
+import logging
+from array import array
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+
+from config.settings import get_response_config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # Optionnel: repli sur le module json standard
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optionnel: seul gzip est alors proposé
+    brotli = None
+
+
+def _default(value: Any) -> Any:
+    """Types non natifs JSON produits par les services (ex: array("L") d'identifiants)."""
+    if isinstance(value, (array, set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps_bytes(obj: Any, compact: Optional[bool] = None) -> bytes:
+    """Sérialise `obj` en JSON UTF-8.
+
+    `compact=None` suit la configuration (RESPONSE_JSON_COMPACT); sinon indentation de 2.
+    """
+    if compact is None:
+        compact = get_response_config()["json_compact"]
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    if compact:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+    return text.encode("utf-8")
+
+
+def dumps(obj: Any, compact: Optional[bool] = None) -> str:
+    """Comme `dumps_bytes`, en `str` (texte MCP, événements SSE)."""
+    return dumps_bytes(obj, compact).decode("utf-8")
+
+
+def tool_result_content(result: Any) -> Dict[str, Any]:
+    """Contenu `result` d'un appel d'outil MCP.
+
+    Le texte est toujours du JSON (et non la représentation Python du résultat). En mode
+    RESPONSE_CONTENT_MODE=structured, le résultat est aussi renvoyé tel quel dans
+    `structuredContent`, que le client peut lire sans reparser le texte.
+    """
+    text = result if isinstance(result, str) else dumps(result)
+    content: Dict[str, Any] = {"content": [{"type": "text", "text": text}]}
+    if get_response_config()["content_mode"] == "structured" and isinstance(result, dict):
+        content["structuredContent"] = result
+    return content
+
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def json_response(payload: Any, accept_encoding: str = "") -> Response:
+    """Réponse HTTP JSON, compressée (br ou gzip) au-delà de RESPONSE_COMPRESSION_MIN_SIZE octets."""
+    config = get_response_config()
+    body = dumps_bytes(payload)
+    headers = {"Vary": "Accept-Encoding"}
+
+    encoding = None
+    if config["compression_min_size"] > 0 and len(body) >= config["compression_min_size"]:
+        encoding = _negotiate_encoding(accept_encoding)
+    if encoding == "br":
+        body = brotli.compress(body, quality=config["compression_level"])
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=config["compression_level"])
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def serializer_info() -> Dict[str, Any]:
+    """Encodeur et compressions disponibles (exposé par /stats)."""
+    return {
+        "json_encoder": "orjson" if orjson is not None else "json",
+        "compression": ["br", "gzip"] if brotli is not None else ["gzip"],
+        **get_response_config(),
+    }
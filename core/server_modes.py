@@ -3,15 +3,32 @@
 import asyncio
 import json
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from fastmcp import FastMCP
+from core.events import capture_events
+from core.serialization import dumps, json_response, serializer_info, tool_result_content
+from services.cache import get_cache_stats
+from services.entity_store import get_entity_store_stats
+from services.http_client import get_transport, get_transport_stats
+from services.label_index import get_label_index_stats
+from services.link_graph import get_link_graph_stats
+from services.property_catalog import get_property_catalog
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Ferme les pools de connexions HTTP partagés à l'arrêt de l'application"""
+    yield
+    await get_transport().aclose()
+
+
 class MCPServerMultiMode:
     """Serveur MCP supportant plusieurs modes de communication"""
     
@@ -32,14 +49,19 @@ class MCPServerMultiMode:
     def run_stdio(self):
         """Lance le serveur en mode STDIO (mode par défaut MCP)"""
         logger.info("🔌 Démarrage en mode STDIO")
-        self.mcp.run()
+        try:
+            self.mcp.run()
+        finally:
+            # La boucle de FastMCP est déjà fermée: seuls les clients sync restent à fermer
+            get_transport().close()
         
     def setup_fastapi(self, config: Dict[str, Any]):
         """Configure l'application FastAPI pour HTTP et SSE"""
         self.app = FastAPI(
             title="MCP Wiki",
             description="Serveur MCP pour Wikipedia avec support HTTP et SSE",
-            version="1.0.0"
+            version="1.0.0",
+            lifespan=_lifespan,
         )
         
         # Configuration CORS
@@ -67,6 +89,11 @@ class MCPServerMultiMode:
                 "tools_count": len(self.tools)
             }
             
+        @self.app.get("/stats")
+        async def stats():
+            """Compteurs du transport HTTP et du cache de réponses"""
+            return self.runtime_stats()
+            
         @self.app.get("/tools")
         async def list_tools():
             """Liste tous les outils disponibles"""
@@ -105,18 +132,11 @@ class MCPServerMultiMode:
                 tool_func = self.tools[tool_name]["function"]
                 result = await self._execute_tool(tool_func, arguments)
                 
-                return {
+                return json_response({
                     "jsonrpc": "2.0",
-                    "result": {
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": str(result)
-                            }
-                        ]
-                    },
+                    "result": tool_result_content(result),
                     "id": data.get("id")
-                }
+                }, request.headers.get("accept-encoding", ""))
                 
             except Exception as e:
                 logger.error(f"Erreur lors de l'appel d'outil: {e}")
@@ -162,6 +182,18 @@ class MCPServerMultiMode:
                 logger.error(f"Erreur SSE: {e}")
                 return {"error": str(e)}
     
+    def runtime_stats(self) -> Dict[str, Any]:
+        """Compteurs exposés par l'endpoint /stats"""
+        return {
+            "transport": get_transport_stats(),
+            "cache": get_cache_stats(),
+            "property_catalog": get_property_catalog().stats(),
+            "link_graph": get_link_graph_stats(),
+            "entity_store": get_entity_store_stats(),
+            "label_index": get_label_index_stats(),
+            "responses": serializer_info()
+        }
+    
     async def _execute_tool(self, tool_func, arguments: Dict[str, Any]):
         """Exécute un outil de manière asynchrone"""
         try:
@@ -191,21 +223,47 @@ class MCPServerMultiMode:
             yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': asyncio.get_event_loop().time()})}\n\n"
     
     async def sse_tool_generator(self, tool_name: str, arguments: Dict[str, Any]):
-        """Générateur pour l'exécution d'outils via SSE"""
+        """Générateur pour l'exécution d'outils via SSE
+
+        Les événements émis par l'outil (`core.events.emit_event`) sont envoyés au client
+        dès qu'ils sont produits, entre `tool_start` et `tool_result`.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        async def run():
+            try:
+                with capture_events(queue.put_nowait):
+                    return await self._execute_tool(tool_func, arguments)
+            finally:
+                queue.put_nowait(done)
+        
+        task = None
         try:
             # Envoyer le début de l'exécution
             yield f"data: {json.dumps({'type': 'tool_start', 'tool': tool_name})}\n\n"
             
-            # Exécuter l'outil
+            # Exécuter l'outil en tâche de fond et relayer ses événements au fil de l'eau
             tool_func = self.tools[tool_name]["function"]
-            result = await self._execute_tool(tool_func, arguments)
+            task = asyncio.create_task(run())
+            while True:
+                event = await queue.get()
+                if event is done:
+                    break
+                yield f"data: {event}\n\n"
+            
+            result = await task
             
-            # Envoyer le résultat
-            yield f"data: {json.dumps({'type': 'tool_result', 'result': str(result)})}\n\n"
+            # Envoyer le résultat (objet JSON, sur une seule ligne SSE)
+            yield f"data: {dumps({'type': 'tool_result', 'result': result}, compact=True)}\n\n"
             yield f"data: {json.dumps({'type': 'tool_complete'})}\n\n"
             
         except Exception as e:
             yield f"data: {json.dumps({'type': 'tool_error', 'error': str(e)})}\n\n"
+        finally:
+            # Client déconnecté: inutile de poursuivre l'outil
+            if task is not None and not task.done():
+                task.cancel()
     
     def run_http(self, config: Dict[str, Any]):
         """Lance le serveur en mode HTTP"""
@@ -245,7 +303,8 @@ class MCPServerMultiMode:
         self.app = FastAPI(
             title="MCP Wiki for ChatGPT",
             description="Serveur MCP Wikipedia compatible ChatGPT avec protocole Streamable HTTP",
-            version="1.0.0"
+            version="1.0.0",
+            lifespan=_lifespan,
         )
         
         # Configuration CORS plus permissive pour ChatGPT
@@ -343,18 +402,11 @@ class MCPServerMultiMode:
                     tool_func = self.tools[tool_name]["function"]
                     result = await self._execute_tool(tool_func, arguments)
                     
-                    return {
+                    return json_response({
                         "jsonrpc": "2.0",
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": str(result)
-                                }
-                            ]
-                        },
+                        "result": tool_result_content(result),
                         "id": request_id
-                    }
+                    }, request.headers.get("accept-encoding", ""))
                 
                 else:
                     return {
@@ -377,6 +429,11 @@ class MCPServerMultiMode:
                     "id": data.get("id", None)
                 }
         
+        @self.app.get("/stats")
+        async def stats():
+            """Compteurs du transport HTTP et du cache de réponses"""
+            return self.runtime_stats()
+        
         @self.app.get("/mcp")
         async def mcp_get():
             """GET sur /mcp pour la découverte du serveur"""
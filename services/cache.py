@@ -0,0 +1,369 @@
+"""Two-tier response cache (in-memory LRU + on-disk SQLite) for upstream API calls"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import get_cache_config
+
+logger = logging.getLogger(__name__)
+
+# Sentinelle: distingue "absent du cache" d'une valeur JSON `null`
+MISS = object()
+
+
+def make_cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Clé stable: URL + paramètres triés"""
+    if not params:
+        return url
+    return url + "?" + json.dumps(
+        sorted((str(k), str(v)) for k, v in params.items()),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+class MemoryCache:
+    """Cache LRU borné en mémoire (nombre d'entrées et octets), avec une date d'expiration par entrée.
+
+    La taille d'une entrée est celle de la réponse JSON d'origine, fournie par l'appelant.
+    Les valeurs plus grosses que `max_entry_bytes` ne sont pas gardées en mémoire (le
+    niveau disque les sert). Les valeurs sont partagées (pas de copie): les appelants
+    doivent les traiter en lecture seule.
+    """
+
+    def __init__(self, maxsize: int = 2048, max_bytes: int = 0, max_entry_bytes: int = 0):
+        self.maxsize = max(1, int(maxsize))
+        self.max_bytes = max(0, int(max_bytes))  # 0 = pas de plafond en octets
+        self.max_entry_bytes = max(0, int(max_entry_bytes))
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.oversized = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+
+            expires_at, value, size = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, expires_at: float, size: int = 0) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            if self.max_entry_bytes and size > self.max_entry_bytes:
+                self.oversized += 1
+                return
+
+            self._entries[key] = (expires_at, value, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (self.max_bytes and self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "oversized": self.oversized,
+            }
+
+
+class DiskCache:
+    """Cache persistant SQLite (survit aux redémarrages), valeurs stockées en JSON.
+
+    Les écritures (sérialisation JSON comprise) sont faites par un thread dédié, par lots
+    (un commit par lot): `set` ne bloque jamais l'appelant. Les valeurs en attente
+    d'écriture restent lisibles via `get`.
+    """
+
+    # Purge des entrées expirées toutes les N écritures
+    PURGE_EVERY = 500
+    # Écritures au plus par transaction
+    BATCH_SIZE = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self._writes = 0
+        self.purge_expired()
+
+        self._pending: Dict[str, Tuple[Any, float]] = {}
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="disk-cache-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def get(self, key: str) -> Any:
+        """Retourne (valeur, expiration, taille) ou MISS"""
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None and pending[1] > time.time():
+                self.hits += 1
+                return pending[0], pending[1], 0
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return MISS
+
+            value, expires_at = row
+            if expires_at <= time.time():
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+
+            self.hits += 1
+        return json.loads(value), expires_at, len(value)
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        """Met l'entrée en file d'écriture (non bloquant)"""
+        with self._lock:
+            self._pending[key] = (value, expires_at)
+        self._queue.put(key)
+
+    def _write_loop(self) -> None:
+        while True:
+            keys = [self._queue.get()]
+            while len(keys) < self.BATCH_SIZE:
+                try:
+                    keys.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch([key for key in keys if key is not None])
+            except Exception as e:
+                logger.error(f"Erreur d'écriture du cache disque: {e}")
+            finally:
+                for _ in keys:
+                    self._queue.task_done()
+            if None in keys:
+                return
+
+    def _write_batch(self, keys: List[str]) -> None:
+        with self._lock:
+            entries = {key: self._pending[key] for key in keys if key in self._pending}
+        if not entries:
+            return
+
+        rows = [
+            (key, json.dumps(value, ensure_ascii=False, separators=(",", ":")), expires_at)
+            for key, (value, expires_at) in entries.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            for key, entry in entries.items():
+                # Une valeur plus récente a pu être mise en file entre-temps
+                if self._pending.get(key) is entry:
+                    del self._pending[key]
+            purge = self._writes // self.PURGE_EVERY != (self._writes + len(rows)) // self.PURGE_EVERY
+            self._writes += len(rows)
+        if purge:
+            self.purge_expired()
+
+    def flush(self) -> None:
+        """Attend la fin des écritures en file"""
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+            self.expirations += cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        self.flush()
+        with self._lock:
+            self._pending.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            return {
+                "path": self.path,
+                "size": size,
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+            }
+
+
+class ResponseCache:
+    """Cache à deux niveaux: LRU mémoire puis SQLite, TTL par catégorie d'endpoint"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or get_cache_config()
+        self.enabled = bool(self.config.get("enabled"))
+        self.ttl: Dict[str, float] = self.config.get("ttl", {})
+        self.memory = MemoryCache(
+            self.config.get("memory_maxsize", 2048),
+            self.config.get("memory_max_bytes", 0),
+            self.config.get("memory_max_entry_bytes", 0),
+        )
+
+        self.disk: Optional[DiskCache] = None
+        disk_path = self.config.get("disk_path")
+        if self.enabled and disk_path:
+            try:
+                self.disk = DiskCache(disk_path)
+            except Exception as e:
+                logger.error(f"Cache disque indisponible ({disk_path}): {e}")
+
+    def ttl_for(self, category: Optional[str]) -> float:
+        if not self.enabled or not category:
+            return 0
+        return float(self.ttl.get(category, 0) or 0)
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not MISS or self.disk is None:
+            return value
+
+        try:
+            found = self.disk.get(key)
+        except Exception as e:
+            logger.error(f"Erreur de lecture du cache disque: {e}")
+            return MISS
+        return self._promote(key, found)
+
+    async def aget(self, key: str) -> Any:
+        """Comme `get`, la lecture SQLite (et le décodage JSON) hors de la boucle d'événements"""
+        value = self.memory.get(key)
+        if value is not MISS or self.disk is None:
+            return value
+
+        try:
+            found = await asyncio.to_thread(self.disk.get, key)
+        except Exception as e:
+            logger.error(f"Erreur de lecture du cache disque: {e}")
+            return MISS
+        return self._promote(key, found)
+
+    def _promote(self, key: str, found: Any) -> Any:
+        if found is MISS:
+            return MISS
+
+        # Promotion vers le niveau mémoire
+        value, expires_at, size = found
+        if size:
+            self.memory.set(key, value, expires_at, size)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float, size: int = 0) -> None:
+        """`size`: taille de la réponse JSON d'origine (budget mémoire). L'écriture disque est asynchrone."""
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        self.memory.set(key, value, expires_at, size)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, expires_at)
+            except Exception as e:
+                logger.error(f"Erreur d'écriture du cache disque: {e}")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Retourne le cache de réponses partagé par tout le processus."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Compteurs hits/misses/évictions des deux niveaux de cache."""
+    return get_response_cache().stats()
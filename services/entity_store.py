@@ -0,0 +1,341 @@
+"""Offline Wikidata entity store built from a JSON dump (memory-mapped lookups)
+
+Chaque entité (élément Q ou propriété P) est réduite à ce que les outils utilisent:
+labels, descriptions et alias dans les langues configurées, claims réduits à leur
+`mainsnak` et à leur rang (sans qualificatifs ni références), sitelinks (site, titre)
+et datatype des propriétés. Les enregistrements sont compressés (zlib) et concaténés;
+un index trié d'identifiants numériques donne leur position (recherche dichotomique).
+Tous les fichiers sont ouverts en mmap: le store n'est pas chargé en mémoire.
+
+Construire le store (dump `latest-all.json[.gz|.bz2]` de dumps.wikimedia.org, complet
+ou filtré, une entité par ligne):
+
+    python -m services.entity_store build latest-all.json.gz [--languages fr,en] [--output data/wikidata_store]
+"""
+
+import bz2
+import gzip
+import json
+import logging
+import mmap
+import os
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import get_wikidata_store_config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # Optionnel: repli sur le module json standard
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # Optionnel: tri de l'index en Python pur (petits dumps uniquement)
+    np = None
+
+FORMAT_VERSION = 1
+
+# Fichiers du store
+_FILES = {
+    "records": "entities.bin",  # Enregistrements JSON compressés (zlib), concaténés
+    "keys": "keys.bin",         # uint64 triés: type << 40 | numéro (Q42 -> 42, P31 -> 1 << 40 | 31)
+    "offsets": "offsets.bin",   # uint64, position de l'enregistrement de chaque clé
+    "lengths": "lengths.bin",   # uint32, taille de l'enregistrement de chaque clé
+}
+
+_KINDS = {"Q": 0, "P": 1}
+_KIND_SHIFT = 40
+
+# Blocs d'une entité filtrés par langue
+_LANGUAGE_BLOCKS = ("labels", "descriptions", "aliases")
+
+
+def _loads(data) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def entity_key(entity_id: str) -> Optional[int]:
+    """Q42 / P31 -> clé numérique de l'index, None pour les autres identifiants"""
+    entity_id = (entity_id or "").strip().upper()
+    kind = _KINDS.get(entity_id[:1])
+    if kind is None or not entity_id[1:].isdigit():
+        return None
+    return (kind << _KIND_SHIFT) | int(entity_id[1:])
+
+
+def _open_dump(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_dump_entities(path: str) -> Iterator[Dict[str, Any]]:
+    """Entités d'un dump JSON Wikidata, en flux (tableau JSON avec une entité par ligne)"""
+    with _open_dump(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.endswith(b","):
+                line = line[:-1]
+            if not line or line in (b"[", b"]"):
+                continue
+            try:
+                yield _loads(line)
+            except ValueError as e:
+                logger.warning(f"Ligne de dump ignorée ({e})")
+
+
+def compact_entity(entity: Dict[str, Any], languages: Iterable[str]) -> Dict[str, Any]:
+    """Entité réduite aux champs servis par le store (même structure que wbgetentities)"""
+    languages = set(languages)
+    compact: Dict[str, Any] = {"id": entity.get("id"), "type": entity.get("type")}
+    if entity.get("datatype"):
+        compact["datatype"] = entity["datatype"]
+
+    for block in _LANGUAGE_BLOCKS:
+        values = {lang: value for lang, value in (entity.get(block) or {}).items() if lang in languages}
+        if values:
+            compact[block] = values
+
+    claims: Dict[str, Any] = {}
+    for pid, statements in (entity.get("claims") or {}).items():
+        reduced = []
+        for statement in statements or []:
+            mainsnak = statement.get("mainsnak") or {}
+            snak = {key: mainsnak[key] for key in ("snaktype", "property", "datatype", "datavalue") if key in mainsnak}
+            reduced.append({"mainsnak": snak, "rank": statement.get("rank", "normal")})
+        if reduced:
+            claims[pid] = reduced
+    compact["claims"] = claims
+
+    compact["sitelinks"] = {
+        site: {"site": site, "title": link.get("title")}
+        for site, link in (entity.get("sitelinks") or {}).items()
+        if link and link.get("title")
+    }
+    return compact
+
+
+def _sorted_index(keys: array, offsets: array, lengths: array) -> Tuple[array, array, array]:
+    """Index trié par clé; en cas de doublon, la dernière occurrence du dump l'emporte"""
+    if np is not None:
+        return _sorted_index_numpy(keys, offsets, lengths)
+
+    # Repli Python pur: liste d'entiers Python de la taille du dump, évitée si déjà trié
+    if all(keys[i] < keys[i + 1] for i in range(len(keys) - 1)):
+        return keys, offsets, lengths
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    sorted_keys, sorted_offsets, sorted_lengths = array("Q"), array("Q"), array("I")
+    for i in order:
+        if sorted_keys and sorted_keys[-1] == keys[i]:
+            sorted_offsets[-1], sorted_lengths[-1] = offsets[i], lengths[i]
+            continue
+        sorted_keys.append(keys[i])
+        sorted_offsets.append(offsets[i])
+        sorted_lengths.append(lengths[i])
+    return sorted_keys, sorted_offsets, sorted_lengths
+
+
+def _sorted_index_numpy(keys: array, offsets: array, lengths: array) -> Tuple[array, array, array]:
+    """Comme `_sorted_index`, vectorisé: argsort stable des clés uint64 (8 octets par entité)"""
+    if not keys:
+        return keys, offsets, lengths
+    key_values = np.frombuffer(keys, dtype=np.uint64)
+    order = np.argsort(key_values, kind="stable")
+    ordered = key_values[order]
+    # Tri stable: la dernière occurrence d'une clé est la dernière de son groupe
+    last = np.empty(len(ordered), dtype=bool)
+    last[-1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=last[:-1])
+    order = order[last]
+    return (
+        array("Q", ordered[last].tobytes()),
+        array("Q", np.frombuffer(offsets, dtype=np.uint64)[order].tobytes()),
+        array("I", np.frombuffer(lengths, dtype=np.uint32)[order].tobytes()),
+    )
+
+
+def build_entity_store(directory: str, dump_path: str, languages: List[str]) -> Dict[str, Any]:
+    """Construit le store dans `directory` à partir d'un dump JSON (une seule passe)"""
+    os.makedirs(directory, exist_ok=True)
+    keys = array("Q")
+    offsets = array("Q")
+    lengths = array("I")
+    position = 0
+
+    with open(os.path.join(directory, _FILES["records"]), "wb") as records:
+        for entity in iter_dump_entities(dump_path):
+            key = entity_key(entity.get("id"))
+            if key is None:
+                continue
+            record = zlib.compress(_dumps(compact_entity(entity, languages)))
+            records.write(record)
+            keys.append(key)
+            offsets.append(position)
+            lengths.append(len(record))
+            position += len(record)
+
+    sorted_keys, sorted_offsets, sorted_lengths = _sorted_index(keys, offsets, lengths)
+    for name, values in (("keys", sorted_keys), ("offsets", sorted_offsets), ("lengths", sorted_lengths)):
+        with open(os.path.join(directory, _FILES[name]), "wb") as f:
+            values.tofile(f)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "languages": list(languages),
+        "entities": len(sorted_keys),
+        # Les clés des propriétés suivent toutes celles des éléments
+        "properties": len(sorted_keys) - bisect_left(sorted_keys, _KINDS["P"] << _KIND_SHIFT),
+        "size_bytes": position,
+        "built_at": int(time.time()),
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+class EntityStore:
+    """Store d'entités ouvert en lecture seule (mmap)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported entity store format in {directory}")
+
+        self.languages = set(self.meta.get("languages") or [])
+        self._maps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
+        self._records = self._map("records", None)
+        self._keys = self._map("keys", "Q")
+        self._offsets = self._map("offsets", "Q")
+        self._lengths = self._map("lengths", "I")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _map(self, name: str, typecode: Optional[str]) -> memoryview:
+        path = os.path.join(self.directory, _FILES[name])
+        if os.path.getsize(path) == 0:
+            view = memoryview(b"")
+        else:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            view = memoryview(mapped)
+        self._views.append(view)
+        if typecode:
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def covers(self, languages: Optional[Iterable[str]]) -> bool:
+        """True si le store contient les labels de toutes ces langues"""
+        return not languages or set(languages) <= self.languages
+
+    def get(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Entité réduite (voir `compact_entity`), None si absente du store"""
+        key = entity_key(entity_id)
+        index = bisect_left(self._keys, key) if key is not None else len(self)
+        found = index < len(self) and self._keys[index] == key
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return self._record(index) if found else None
+
+    def _record(self, index: int) -> Dict[str, Any]:
+        start = self._offsets[index]
+        return _loads(zlib.decompress(self._records[start:start + self._lengths[index]]))
+
+    def entities(self) -> Iterator[Dict[str, Any]]:
+        """Toutes les entités du store, dans l'ordre des identifiants (construction d'index dérivés)"""
+        for index in range(len(self)):
+            yield self._record(index)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {key: self.meta.get(key) for key in ("languages", "entities", "properties", "size_bytes", "built_at")}
+        stats.update({"hits": self.hits, "misses": self.misses})
+        return stats
+
+    def close(self) -> None:
+        # Les vues doivent être libérées avant la fermeture des mmap qu'elles exposent
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+
+_store: Optional[EntityStore] = None
+_store_loaded = False
+_store_lock = threading.Lock()
+
+
+def get_entity_store() -> Optional[EntityStore]:
+    """Store local, ou None si WIKIDATA_STORE_PATH n'en contient pas (API en direct)"""
+    global _store, _store_loaded
+    if not _store_loaded:
+        with _store_lock:
+            if not _store_loaded:
+                directory = get_wikidata_store_config()["path"]
+                if directory and os.path.exists(os.path.join(directory, "meta.json")):
+                    try:
+                        _store = EntityStore(directory)
+                        logger.info(f"Store Wikidata local: {len(_store)} entités ({', '.join(sorted(_store.languages))})")
+                    except Exception as e:
+                        logger.error(f"Erreur d'ouverture du store Wikidata {directory}: {e}")
+                _store_loaded = True
+    return _store
+
+
+def get_entity_store_stats() -> Optional[Dict[str, Any]]:
+    """Store ouvert (exposé par /stats)."""
+    return _store.stats() if _store is not None else None
+
+
+def _main(argv: List[str]) -> None:
+    import argparse
+
+    config = get_wikidata_store_config()
+    parser = argparse.ArgumentParser(prog="python -m services.entity_store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Construire le store depuis un dump JSON Wikidata")
+    build.add_argument("dump", help="Dump JSON (.json, .json.gz ou .json.bz2)")
+    build.add_argument("--languages", help="Langues des labels conservés (défaut: WIKIDATA_STORE_LANGUAGES)")
+    build.add_argument("--output", help="Répertoire du store (défaut: WIKIDATA_STORE_PATH)")
+    args = parser.parse_args(argv)
+
+    languages = [lang.strip() for lang in args.languages.split(",") if lang.strip()] if args.languages else config["languages"]
+    directory = args.output or config["path"]
+    started = time.monotonic()
+    meta = build_entity_store(directory, args.dump, languages)
+    print(
+        f"Store Wikidata: {meta['entities']} entités ({meta['properties']} propriétés), "
+        f"{meta['size_bytes'] / 1e6:.1f} Mo -> {directory} en {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
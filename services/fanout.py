@@ -0,0 +1,27 @@
+"""Bounded-concurrency fan-out for per-item upstream calls"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List
+
+
+async def fan_out(
+    items: Iterable[Any],
+    worker: Callable[[Any], Awaitable[Any]],
+    max_concurrency: int = 10,
+) -> List[Any]:
+    """Exécute `worker` sur chaque élément avec au plus `max_concurrency` appels en vol.
+
+    Les résultats sont retournés dans l'ordre des éléments. Une exception levée par
+    un worker est retournée à sa place (au lieu d'annuler tout le lot), pour que
+    l'appelant puisse produire un résultat partiel.
+    """
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(item: Any) -> Any:
+        async with sem:
+            try:
+                return await worker(item)
+            except Exception as e:
+                return e
+
+    return await asyncio.gather(*(run(item) for item in items))
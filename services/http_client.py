@@ -0,0 +1,667 @@
+"""Shared HTTP transport with keep-alive connection pools for Wikimedia APIs"""
+
+import asyncio
+import contextlib
+import importlib.util
+import logging
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.settings import get_http_config
+from services.cache import MISS, get_response_cache, make_cache_key
+from services.rate_limit import TokenBucket, backoff_delay, parse_retry_after
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 nécessite le paquet optionnel `h2` (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _ijson_available() -> bool:
+    """Le parsing JSON en flux nécessite le paquet optionnel `ijson`."""
+    return importlib.util.find_spec("ijson") is not None
+
+
+# Erreurs réseau transitoires reprises par le transport (un ReadTimeout, lui, est rendu à l'appelant)
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+
+# Refus de l'hôte qui ralentissent tous ses appels (et non seulement la requête reprise)
+_THROTTLE_REASONS = ("429", "503", "maxlag")
+
+
+def _retry_reason(response: httpx.Response) -> Optional[str]:
+    """Motif de reprise d'une réponse, None si elle est définitive"""
+    # MediaWiki signale maxlag par une erreur d'API (statut 200 ou 503) et l'en-tête MediaWiki-API-Error
+    if response.headers.get("MediaWiki-API-Error") == "maxlag":
+        return "maxlag"
+    if response.status_code in (429, 502, 503, 504):
+        return str(response.status_code)
+    return None
+
+
+class UpstreamUnavailableError(Exception):
+    """Hôte toujours surchargé après les reprises (maxlag, 429, 503): l'appel est à retenter plus tard.
+
+    Distinct d'une réponse vide ou d'une page absente.
+    """
+
+    def __init__(self, host: str, reason: str, retry_after: Optional[float] = None):
+        self.host = host
+        self.reason = reason
+        self.retry_after = retry_after
+        hint = f" in {retry_after:.0f}s" if retry_after else " later"
+        super().__init__(f"{host} unavailable ({reason}), retry{hint}")
+
+
+def raise_for_status(response: httpx.Response) -> None:
+    """`response.raise_for_status()`, avec `UpstreamUnavailableError` pour les refus temporaires
+    encore présents après les reprises du transport (dont maxlag, renvoyé avec un statut 200)."""
+    reason = _retry_reason(response)
+    if reason in _THROTTLE_REASONS:
+        raise UpstreamUnavailableError(
+            response.url.host, reason, parse_retry_after(response.headers.get("Retry-After"))
+        )
+    response.raise_for_status()
+
+
+class TransportStats:
+    """Compteurs de connexions (nouvelles vs réutilisées) et de reprises par hôte."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, host: str, new_connection: bool) -> None:
+        with self._lock:
+            counters = self._counters(host)
+            counters["requests"] += 1
+            if new_connection:
+                counters["new_connections"] += 1
+            else:
+                counters["reused_connections"] += 1
+
+    def record_retry(self, host: str, throttled: bool) -> None:
+        with self._lock:
+            counters = self._counters(host)
+            counters["retries"] += 1
+            if throttled:
+                counters["throttled"] += 1
+
+    def _counters(self, host: str) -> Dict[str, int]:
+        return self._hosts.setdefault(
+            host,
+            {"requests": 0, "new_connections": 0, "reused_connections": 0, "retries": 0, "throttled": 0},
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = {host: dict(c) for host, c in self._hosts.items()}
+
+        totals = {"requests": 0, "new_connections": 0, "reused_connections": 0, "retries": 0, "throttled": 0}
+        for counters in hosts.values():
+            for key in totals:
+                totals[key] += counters[key]
+
+        return {**totals, "hosts": hosts}
+
+
+class HTTPTransport:
+    """Pools de connexions persistantes (un client httpx par hôte), partagés par les services."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or get_http_config()
+        self.http2 = bool(self.config.get("http2")) and _http2_available()
+        if self.config.get("http2") and not self.http2:
+            logger.info("HTTP/2 indisponible (paquet 'h2' absent), repli sur HTTP/1.1")
+
+        self.stats = TransportStats()
+        self._clients: Dict[str, httpx.Client] = {}
+        # Les clients async sont liés à leur boucle d'événements: boucle -> {hôte: client}
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._limiters: Dict[str, Optional[TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def _limits(self) -> httpx.Limits:
+        pool_maxsize = max(1, int(self.config["pool_maxsize"]))
+        return httpx.Limits(
+            max_connections=pool_maxsize,
+            max_keepalive_connections=pool_maxsize,
+            keepalive_expiry=self.config["keepalive_expiry"],
+        )
+
+    def _timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        return httpx.Timeout(
+            timeout if timeout is not None else self.config["timeout"],
+            connect=self.config["connect_timeout"],
+        )
+
+    def _client_for(self, host: str) -> httpx.Client:
+        client = self._clients.get(host)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(host)
+            if client is None:
+                client = httpx.Client(
+                    http2=self.http2,
+                    limits=self._limits(),
+                    timeout=self._timeout(None),
+                    follow_redirects=True,
+                )
+                self._clients[host] = client
+            return client
+
+    def _async_client_for(self, host: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(host)
+            if client is None:
+                client = httpx.AsyncClient(
+                    http2=self.http2,
+                    limits=self._limits(),
+                    timeout=self._timeout(None),
+                    follow_redirects=True,
+                )
+                clients[host] = client
+            return client
+
+    def _limiter_for(self, host: str) -> Optional[TokenBucket]:
+        """Plafond de requêtes/s de l'hôte (None si désactivé)"""
+        if host not in self._limiters:
+            with self._lock:
+                if host not in self._limiters:
+                    rate = float(self.config.get("rate_limit_per_host") or 0)
+                    self._limiters[host] = TokenBucket(rate) if rate > 0 else None
+        return self._limiters[host]
+
+    def _rate_limit_delay(self, host: str) -> float:
+        limiter = self._limiter_for(host)
+        return limiter.reserve() if limiter else 0.0
+
+    def _request_params(self, url: str, params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Ajoute `maxlag` aux appels de l'API MediaWiki (refus explicite si les réplicas sont en retard)"""
+        maxlag = self.config.get("maxlag") or 0
+        if maxlag <= 0 or not urlsplit(url).path.endswith("/api.php"):
+            return params
+        params = dict(params or {})
+        params.setdefault("maxlag", maxlag)
+        return params
+
+    def _retry_delay(
+        self,
+        host: str,
+        attempt: int,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+    ) -> Optional[float]:
+        """Délai avant une nouvelle tentative, ou None si la réponse est à rendre à l'appelant.
+
+        Les refus de l'hôte (429, 503, maxlag) suspendent tout l'hôte via son seau à jetons:
+        le délai retourné est alors déjà pris en compte par la prochaine réservation.
+        """
+        limiter = self._limiter_for(host)
+        if response is not None:
+            reason = _retry_reason(response)
+            if reason is None:
+                if limiter and response.status_code < 400:
+                    limiter.recover()
+                return None
+        else:
+            reason = type(error).__name__
+
+        if attempt >= self.config["max_retries"]:
+            logger.warning(f"{host}: abandon après {attempt} reprise(s) ({reason})")
+            return None
+
+        delay = backoff_delay(attempt, self.config["retry_backoff"], self.config["retry_backoff_max"])
+        throttled = reason in _THROTTLE_REASONS
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self.config["retry_after_max"]:
+                    logger.warning(f"{host}: Retry-After de {retry_after:.0f}s trop long, abandon ({reason})")
+                    return None
+                delay = max(delay, retry_after)
+
+        self.stats.record_retry(host, throttled)
+        logger.info(f"{host}: nouvelle tentative dans {delay:.2f}s ({reason}, reprise {attempt + 1})")
+        if throttled and limiter:
+            limiter.penalize(delay)
+            return 0.0
+        return delay
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """GET via le pool de l'hôte ciblé, en comptant les connexions ouvertes.
+
+        Les refus temporaires (429, 503, maxlag, erreurs réseau transitoires) sont repris
+        avec un délai exponentiel à gigue, ou celui imposé par `Retry-After`.
+        """
+        host = urlsplit(url).netloc
+        client = self._client_for(host)
+        params = self._request_params(url, params)
+
+        attempt = 0
+        while True:
+            delay = self._rate_limit_delay(host)
+            if delay:
+                time.sleep(delay)
+
+            connected = []
+
+            def trace(event_name: str, info: Dict[str, Any]) -> None:
+                if event_name == "connection.connect_tcp.complete":
+                    connected.append(True)
+
+            try:
+                response = client.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=self._timeout(timeout),
+                    extensions={"trace": trace},
+                )
+            except _RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(host, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(host, attempt, response=response)
+                if delay is None:
+                    return response
+                response.close()
+            finally:
+                self.stats.record(host, new_connection=bool(connected))
+
+            attempt += 1
+            if delay:
+                time.sleep(delay)
+
+    async def aget(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """Version asyncio de `get` (pool par hôte et par boucle d'événements)."""
+        host = urlsplit(url).netloc
+        client = self._async_client_for(host)
+        params = self._request_params(url, params)
+
+        attempt = 0
+        while True:
+            delay = self._rate_limit_delay(host)
+            if delay:
+                await asyncio.sleep(delay)
+
+            connected = []
+
+            async def trace(event_name: str, info: Dict[str, Any]) -> None:
+                if event_name == "connection.connect_tcp.complete":
+                    connected.append(True)
+
+            try:
+                response = await client.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=self._timeout(timeout),
+                    extensions={"trace": trace},
+                )
+            except _RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(host, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(host, attempt, response=response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            finally:
+                self.stats.record(host, new_connection=bool(connected))
+
+            attempt += 1
+            if delay:
+                await asyncio.sleep(delay)
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[httpx.Response]:
+        """Comme `get`, sans lire le corps: à consommer via `response.iter_bytes()`.
+
+        Les reprises ont lieu avant de rendre la réponse, jamais en cours de lecture.
+        """
+        host = urlsplit(url).netloc
+        client = self._client_for(host)
+        params = self._request_params(url, params)
+
+        attempt = 0
+        while True:
+            delay = self._rate_limit_delay(host)
+            if delay:
+                time.sleep(delay)
+
+            connected = []
+
+            def trace(event_name: str, info: Dict[str, Any]) -> None:
+                if event_name == "connection.connect_tcp.complete":
+                    connected.append(True)
+
+            with contextlib.ExitStack() as stack:
+                stack.callback(lambda: self.stats.record(host, new_connection=bool(connected)))
+                try:
+                    response = stack.enter_context(client.stream(
+                        "GET",
+                        url,
+                        params=params,
+                        headers=headers,
+                        timeout=self._timeout(timeout),
+                        extensions={"trace": trace},
+                    ))
+                except _RETRYABLE_ERRORS as e:
+                    delay = self._retry_delay(host, attempt, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._retry_delay(host, attempt, response=response)
+                    if delay is None:
+                        yield response
+                        return
+
+            attempt += 1
+            if delay:
+                time.sleep(delay)
+
+    @contextlib.asynccontextmanager
+    async def astream(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """Version asyncio de `stream` (corps via `response.aiter_bytes()`)."""
+        host = urlsplit(url).netloc
+        client = self._async_client_for(host)
+        params = self._request_params(url, params)
+
+        attempt = 0
+        while True:
+            delay = self._rate_limit_delay(host)
+            if delay:
+                await asyncio.sleep(delay)
+
+            connected = []
+
+            async def trace(event_name: str, info: Dict[str, Any]) -> None:
+                if event_name == "connection.connect_tcp.complete":
+                    connected.append(True)
+
+            async with contextlib.AsyncExitStack() as stack:
+                stack.callback(lambda: self.stats.record(host, new_connection=bool(connected)))
+                try:
+                    response = await stack.enter_async_context(client.stream(
+                        "GET",
+                        url,
+                        params=params,
+                        headers=headers,
+                        timeout=self._timeout(timeout),
+                        extensions={"trace": trace},
+                    ))
+                except _RETRYABLE_ERRORS as e:
+                    delay = self._retry_delay(host, attempt, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._retry_delay(host, attempt, response=response)
+                    if delay is None:
+                        yield response
+                        return
+
+            attempt += 1
+            if delay:
+                await asyncio.sleep(delay)
+
+    def rate_limits(self) -> Dict[str, float]:
+        """Débit courant (requêtes/s) des hôtes limités, après adaptation aux refus"""
+        return {host: round(limiter.rate, 2) for host, limiter in list(self._limiters.items()) if limiter}
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Ferme tous les clients (sync et async) et leurs connexions poolées (arrêt du serveur)"""
+        self.close()
+        current = asyncio.get_running_loop()
+        with self._lock:
+            pools = [(loop, list(clients.values())) for loop, clients in self._async_clients.items()]
+            self._async_clients.clear()
+
+        for loop, clients in pools:
+            for client in clients:
+                if loop is current:
+                    await client.aclose()
+                elif loop.is_running():
+                    # Client lié à une autre boucle: fermé sur sa propre boucle
+                    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+                # Boucle déjà fermée: ses connexions ne sont plus utilisables, rien à attendre
+
+
+_transport: Optional[HTTPTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """Retourne le transport HTTP partagé par tout le processus."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HTTPTransport()
+    return _transport
+
+
+def web_page_client(max_connections: int) -> httpx.AsyncClient:
+    """Client async éphémère pour des pages web tierces (hors Wikimedia).
+
+    Contrairement au transport partagé, il n'ajoute pas `maxlag`, n'applique pas les
+    relances MediaWiki ni de limiteur par hôte et ne garde aucun pool au-delà de son
+    usage: l'appelant le ferme (`async with web_page_client(...) as client`).
+    """
+    config = get_http_config()
+    max_connections = max(1, int(max_connections))
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=config["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+        follow_redirects=True,
+    )
+
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> httpx.Response:
+    """Raccourci vers `get_transport().get(...)`."""
+    return get_transport().get(url, params=params, headers=headers, timeout=timeout)
+
+
+async def async_http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> httpx.Response:
+    """Raccourci vers `await get_transport().aget(...)`."""
+    return await get_transport().aget(url, params=params, headers=headers, timeout=timeout)
+
+
+# Fusion des appels identiques en vol, partagée par get_json/async_get_json
+_single_flight = SingleFlight()
+
+
+def _cacheable(data: Any) -> bool:
+    # Les erreurs MediaWiki arrivent avec un statut 200: ne jamais les mettre en cache
+    return not (isinstance(data, dict) and "error" in data)
+
+
+class _StreamingJSONParser:
+    """Parsing JSON incrémental (ijson): le corps brut n'est jamais chargé en entier.
+
+    Reconstruit le document clé par clé de premier niveau, au fil des morceaux reçus.
+    """
+
+    def __init__(self):
+        import ijson
+
+        self._items = ijson.sendable_list()
+        self._coro = ijson.kvitems_coro(self._items, "", use_float=True)
+        self._document: Dict[str, Any] = {}
+        self.size = 0  # Octets reçus
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._coro.send(chunk)
+        self._drain()
+
+    def close(self) -> Dict[str, Any]:
+        self._coro.close()
+        self._drain()
+        return self._document
+
+    def _drain(self) -> None:
+        for key, value in self._items:
+            self._document[key] = value
+        del self._items[:]
+
+
+def _use_streaming(stream: bool) -> bool:
+    if stream and not _ijson_available():
+        logger.debug("Parsing JSON en flux indisponible (paquet 'ijson' absent), lecture complète")
+        return False
+    return stream
+
+
+def get_json(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[str] = None,
+    stream: bool = False,
+) -> Any:
+    """GET + `raise_for_status()` + JSON, via le cache de réponses si `cache` (catégorie de TTL) est fourni.
+
+    Les appels identiques (URL + paramètres normalisés) déjà en vol sont fusionnés:
+    un seul appel amont, résultat partagé. Les valeurs retournées peuvent donc être
+    partagées entre appelants et avec le cache: ne pas les modifier.
+
+    `stream=True` parse la réponse au fil de l'eau (ijson, si installé) pour les gros
+    documents JSON objet; le résultat est identique.
+
+    Un hôte encore surchargé après les reprises (maxlag, 429, 503) lève `UpstreamUnavailableError`.
+    """
+    response_cache = get_response_cache()
+    ttl = response_cache.ttl_for(cache)
+    key = make_cache_key(url, params)
+    if ttl:
+        data = response_cache.get(key)
+        if data is not MISS:
+            return data
+
+    def fetch() -> Any:
+        if _use_streaming(stream):
+            with get_transport().stream(url, params=params, headers=headers, timeout=timeout) as response:
+                raise_for_status(response)
+                parser = _StreamingJSONParser()
+                for chunk in response.iter_bytes():
+                    parser.feed(chunk)
+                data, size = parser.close(), parser.size
+        else:
+            response = http_get(url, params=params, headers=headers, timeout=timeout)
+            raise_for_status(response)
+            data, size = response.json(), len(response.content)
+
+        if ttl and _cacheable(data):
+            response_cache.set(key, data, ttl, size)
+        return data
+
+    return _single_flight.do(key, fetch)
+
+
+async def async_get_json(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[str] = None,
+    stream: bool = False,
+) -> Any:
+    """Version asyncio de `get_json` (le niveau disque du cache est lu hors de la boucle)."""
+    response_cache = get_response_cache()
+    ttl = response_cache.ttl_for(cache)
+    key = make_cache_key(url, params)
+    if ttl:
+        data = await response_cache.aget(key)
+        if data is not MISS:
+            return data
+
+    async def fetch() -> Any:
+        if _use_streaming(stream):
+            async with get_transport().astream(url, params=params, headers=headers, timeout=timeout) as response:
+                raise_for_status(response)
+                parser = _StreamingJSONParser()
+                async for chunk in response.aiter_bytes():
+                    parser.feed(chunk)
+                data, size = parser.close(), parser.size
+        else:
+            response = await async_http_get(url, params=params, headers=headers, timeout=timeout)
+            raise_for_status(response)
+            data, size = response.json(), len(response.content)
+
+        if ttl and _cacheable(data):
+            response_cache.set(key, data, ttl, size)
+        return data
+
+    return await _single_flight.ado(key, fetch)
+
+
+def get_transport_stats() -> Dict[str, Any]:
+    """Compteurs de réutilisation des connexions du transport partagé."""
+    transport = get_transport()
+    return {
+        "http2": transport.http2,
+        **transport.stats.snapshot(),
+        "rate_limits": transport.rate_limits(),
+        "single_flight": _single_flight.stats(),
+    }
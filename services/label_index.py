@@ -0,0 +1,397 @@
+"""Local Wikidata label/alias index for entity resolution (memory-mapped, one per language)
+
+Deux tables de chaînes triées, chacune avec ses listes d'entités (postings):
+- les labels et alias normalisés (casefold, espaces réduits): correspondance exacte et
+  par préfixe par recherche dichotomique, comme un trie, sans structure en mémoire;
+- les mots de ces labels (index inversé): correspondance par mots quand le terme n'est
+  ni un label ni le début d'un label.
+
+Les entités sont numérotées par popularité décroissante (nombre de sitelinks): toute
+liste d'entités, triée par numéro, est donc déjà classée par popularité.
+
+Construire l'index d'une langue depuis le store Wikidata local (voir services.entity_store)
+ou directement depuis un dump JSON:
+
+    python -m services.label_index build fr [--dump latest-all.json.gz] [--output data/label_index]
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from heapq import heappush, heapreplace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.settings import get_label_index_config
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Nombre max de labels parcourus pour une correspondance par préfixe; les entités de
+# tous les labels parcourus sont classées par popularité avant de garder les meilleures
+PREFIX_SCAN_LIMIT = 20000
+# Séparateur label / description dans la table des entités
+_TEXT_SEPARATOR = "\x1f"
+
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize_label(value: str) -> str:
+    """Clé de recherche d'un label: casefold et espaces réduits"""
+    return " ".join(str(value or "").casefold().split())
+
+
+def _tokens(key: str) -> List[str]:
+    return sorted(set(_TOKEN.findall(key)))
+
+
+class _IndexBuilder:
+    """Accumule les labels/alias d'une langue puis écrit les tables triées"""
+
+    def __init__(self, language: str):
+        self.language = language
+        self.qids = array("I")
+        self.popularity = array("I")
+        self.texts: List[str] = []
+        self.labels: Dict[str, List[int]] = {}
+        self.words: Dict[str, List[int]] = {}
+
+    def add(self, entity: Dict[str, Any]) -> None:
+        entity_id = str(entity.get("id") or "")
+        if not entity_id.startswith("Q") or not entity_id[1:].isdigit():
+            return
+
+        label = ((entity.get("labels") or {}).get(self.language) or {}).get("value")
+        aliases = [alias.get("value") for alias in (entity.get("aliases") or {}).get(self.language) or []]
+        names = [name for name in [label] + aliases if name]
+        if not names:
+            return
+
+        description = ((entity.get("descriptions") or {}).get(self.language) or {}).get("value")
+        index = len(self.qids)
+        self.qids.append(int(entity_id[1:]))
+        self.popularity.append(len(entity.get("sitelinks") or {}))
+        self.texts.append(f"{label or names[0]}{_TEXT_SEPARATOR}{description or ''}")
+
+        for name in names:
+            key = normalize_label(name)
+            self.labels.setdefault(key, []).append(index)
+            for word in _tokens(key):
+                self.words.setdefault(word, []).append(index)
+
+    def write(self, directory: str) -> Dict[str, Any]:
+        os.makedirs(directory, exist_ok=True)
+        count = len(self.qids)
+
+        # Rang = position par popularité décroissante (puis QID croissant)
+        order = sorted(range(count), key=lambda i: (-self.popularity[i], self.qids[i]))
+        rank = array("I", bytes(4 * count))
+        for position, i in enumerate(order):
+            rank[i] = position
+
+        _write_array(directory, "qids", array("I", (self.qids[i] for i in order)))
+        _write_array(directory, "popularity", array("I", (self.popularity[i] for i in order)))
+        _write_strings(directory, "texts", (self.texts[i] for i in order))
+        _write_table(directory, "labels", self.labels, rank)
+        _write_table(directory, "words", self.words, rank)
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "language": self.language,
+            "entities": count,
+            "labels": len(self.labels),
+            "words": len(self.words),
+            "built_at": int(time.time()),
+        }
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return meta
+
+
+def _write_array(directory: str, name: str, values: array) -> None:
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+        values.tofile(f)
+
+
+def _write_strings(directory: str, name: str, values: Iterable[str]) -> None:
+    """Chaînes UTF-8 concaténées + positions (uint64, n + 1)"""
+    offsets = array("Q", [0])
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+        for value in values:
+            encoded = value.encode("utf-8")
+            f.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+    _write_array(directory, f"{name}_offsets", offsets)
+
+
+def _write_table(directory: str, name: str, postings: Dict[str, List[int]], rank: array) -> None:
+    """Table de chaînes triées (ordre des octets UTF-8), chacune avec ses entités par rang croissant"""
+    keys = sorted(postings, key=lambda key: key.encode("utf-8"))
+    _write_strings(directory, name, keys)
+
+    offsets = array("Q", [0])
+    values = array("I")
+    for key in keys:
+        values.extend(sorted({rank[i] for i in postings[key]}))
+        offsets.append(len(values))
+    _write_array(directory, f"{name}_postings_offsets", offsets)
+    _write_array(directory, f"{name}_postings", values)
+
+
+def build_label_index(directory: str, language: str, entities: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Construit l'index d'une langue dans `directory` à partir d'entités au format wbgetentities"""
+    builder = _IndexBuilder(language)
+    for entity in entities:
+        builder.add(entity)
+    return builder.write(directory)
+
+
+class _StringTable:
+    """Chaînes triées ouvertes en mmap, avec leurs listes d'entités"""
+
+    def __init__(self, index: "LabelIndex", name: str):
+        self._strings = index._map(f"{name}.bin", None)
+        self._offsets = index._map(f"{name}_offsets.bin", "Q")
+        self._postings_offsets = index._map(f"{name}_postings_offsets.bin", "Q")
+        self._postings = index._map(f"{name}_postings.bin", "I")
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def _key(self, position: int) -> bytes:
+        return bytes(self._strings[self._offsets[position]:self._offsets[position + 1]])
+
+    def _bisect(self, key: bytes) -> int:
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, key: str) -> Optional[int]:
+        encoded = key.encode("utf-8")
+        position = self._bisect(encoded)
+        if position < len(self) and self._key(position) == encoded:
+            return position
+        return None
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Positions [début, fin) des chaînes qui commencent par `prefix`"""
+        encoded = prefix.encode("utf-8")
+        # 0xFF n'apparaît jamais en UTF-8: borne supérieure de toutes les chaînes préfixées
+        return self._bisect(encoded), self._bisect(encoded + b"\xff")
+
+    def postings(self, position: int) -> memoryview:
+        return self._postings[self._postings_offsets[position]:self._postings_offsets[position + 1]]
+
+
+class LabelIndex:
+    """Index de labels d'une langue, ouvert en lecture seule (mmap)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported label index format in {directory}")
+
+        self.language = self.meta.get("language")
+        self._maps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
+        self._qids = self._map("qids.bin", "I")
+        self._popularity = self._map("popularity.bin", "I")
+        self._texts = self._map("texts.bin", None)
+        self._text_offsets = self._map("texts_offsets.bin", "Q")
+        self._labels = _StringTable(self, "labels")
+        self._words = _StringTable(self, "words")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _map(self, filename: str, typecode: Optional[str]) -> memoryview:
+        path = os.path.join(self.directory, filename)
+        if os.path.getsize(path) == 0:
+            view = memoryview(b"")
+        else:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            view = memoryview(mapped)
+        self._views.append(view)
+        if typecode:
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+    def _entity(self, rank: int, match_type: str, query: str) -> Dict[str, Any]:
+        text = bytes(self._texts[self._text_offsets[rank]:self._text_offsets[rank + 1]]).decode("utf-8")
+        label, _, description = text.partition(_TEXT_SEPARATOR)
+        qid = f"Q{self._qids[rank]}"
+        return {
+            "id": qid,
+            "label": label,
+            "description": description or None,
+            "url": f"http://www.wikidata.org/entity/{qid}",
+            "match": {"type": match_type, "language": self.language, "text": query},
+            "sitelinks": self._popularity[rank],
+        }
+
+    def _ranks(self, query: str, limit: int) -> Iterator[Tuple[int, str]]:
+        """Rangs des entités candidates: label exact, puis préfixe, sinon tous les mots"""
+        key = normalize_label(query)
+        if not key:
+            return
+
+        exact = self._labels.find(key)
+        exact_ranks = set(self._labels.postings(exact)) if exact is not None else set()
+        for rank in sorted(exact_ranks):
+            yield rank, "exact"
+
+        lo, hi = self._labels.prefix_range(key)
+        prefixed = self._best_ranks(lo, min(hi, lo + PREFIX_SCAN_LIMIT), exact, exact_ranks, limit)
+        for rank in prefixed:
+            yield rank, "prefix"
+        if exact is not None or prefixed:
+            return
+
+        postings = []
+        for word in _tokens(key):
+            position = self._words.find(word)
+            if position is None:
+                return
+            postings.append(self._words.postings(position))
+        if not postings:
+            return
+        postings.sort(key=len)
+        common = set(postings[0])
+        for other in postings[1:]:
+            common.intersection_update(other)
+        for rank in sorted(common):
+            yield rank, "token"
+
+    def _best_ranks(self, lo: int, hi: int, skip: Optional[int], exclude: set, count: int) -> List[int]:
+        """Les `count` meilleurs rangs des labels [lo, hi), hors position `skip` et rangs `exclude`"""
+        if count <= 0:
+            return []
+        heap: List[int] = []  # Rangs opposés: heap[0] = -(moins bon rang retenu)
+        kept = set()
+        for position in range(lo, hi):
+            if position == skip:
+                continue
+            for rank in self._labels.postings(position):
+                if rank in kept or rank in exclude:
+                    continue
+                if len(heap) < count:
+                    heappush(heap, -rank)
+                elif rank < -heap[0]:
+                    kept.discard(-heapreplace(heap, -rank))
+                else:
+                    # Postings triés par rang: les suivants ne sont pas meilleurs
+                    break
+                kept.add(rank)
+        return sorted(kept)
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Entités dont un label/alias correspond au terme, les plus populaires d'abord"""
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        for rank, match_type in self._ranks(query, limit):
+            if rank in seen:
+                continue
+            seen.add(rank)
+            results.append(self._entity(rank, match_type, query))
+            if len(results) >= limit:
+                break
+        with self._lock:
+            if results:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {key: self.meta.get(key) for key in ("language", "entities", "labels", "words", "built_at")}
+        stats.update({"hits": self.hits, "misses": self.misses})
+        return stats
+
+    def close(self) -> None:
+        # Les vues doivent être libérées avant la fermeture des mmap qu'elles exposent
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+
+_indexes: Dict[str, Optional[LabelIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_label_index(language: str) -> Optional[LabelIndex]:
+    """Index de la langue, ou None si LABEL_INDEX_PATH n'en contient pas (wbsearchentities)"""
+    if language not in _indexes:
+        with _indexes_lock:
+            if language not in _indexes:
+                index = None
+                root = get_label_index_config()["path"]
+                directory = os.path.join(root, language) if root else None
+                if directory and os.path.exists(os.path.join(directory, "meta.json")):
+                    try:
+                        index = LabelIndex(directory)
+                        logger.info(f"Index de labels local ({language}): {index.meta.get('labels')} labels")
+                    except Exception as e:
+                        logger.error(f"Erreur d'ouverture de l'index de labels {directory}: {e}")
+                _indexes[language] = index
+    return _indexes[language]
+
+
+def get_label_index_stats() -> Dict[str, Any]:
+    """Index de labels ouverts (exposé par /stats)."""
+    return {language: index.stats() for language, index in list(_indexes.items()) if index is not None}
+
+
+def _main(argv: List[str]) -> None:
+    import argparse
+
+    from services.entity_store import get_entity_store, iter_dump_entities
+
+    parser = argparse.ArgumentParser(prog="python -m services.label_index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Construire l'index de labels d'une langue")
+    build.add_argument("language")
+    build.add_argument("--dump", help="Dump JSON Wikidata (défaut: store local WIKIDATA_STORE_PATH)")
+    build.add_argument("--output", help="Répertoire racine des index (défaut: LABEL_INDEX_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.dump:
+        entities = iter_dump_entities(args.dump)
+    else:
+        store = get_entity_store()
+        if store is None:
+            parser.error("aucun store Wikidata local: construire le store ou passer --dump")
+        if args.language not in store.languages:
+            parser.error(f"le store local ne contient pas la langue '{args.language}'")
+        entities = store.entities()
+
+    root = args.output or get_label_index_config()["path"]
+    directory = os.path.join(root, args.language)
+    started = time.monotonic()
+    meta = build_label_index(directory, args.language, entities)
+    print(
+        f"Index de labels {args.language}: {meta['entities']} entités, {meta['labels']} labels, "
+        f"{meta['words']} mots -> {directory} en {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -0,0 +1,462 @@
+"""Offline Wikipedia link graph built from `page` / `pagelinks` dumps (memory-mapped CSR)
+
+Les liens internes (et rétroliens) d'une langue entière sont stockés sous forme
+d'adjacence CSR: pour le nœud i, ses cibles sont `targets[offsets[i]:offsets[i + 1]]`.
+Les nœuds sont numérotés dans l'ordre des titres: la recherche d'un titre est une
+recherche dichotomique et les listes de liens sortent dans l'ordre de l'API.
+Tous les fichiers sont ouverts en mmap: l'index n'est pas chargé en mémoire.
+
+Construire l'index d'une langue (dumps SQL de dumps.wikimedia.org, .gz accepté,
+ou TSV avec les mêmes colonnes que les tables):
+
+    python -m services.link_graph build fr \\
+        --page frwiki-latest-page.sql.gz \\
+        --pagelinks frwiki-latest-pagelinks.sql.gz \\
+        [--linktarget frwiki-latest-linktarget.sql.gz] [--output data/link_graph]
+
+Les dumps `pagelinks` récents (MediaWiki >= 1.43) référencent leurs cibles par
+`pl_target_id`: le dump `linktarget` est alors nécessaire.
+
+Limites de taille: la construction se fait en mémoire. Les titres sont gardés dans un
+dict (~150 octets par titre) et les liens dans deux tableaux uint32; le tri CSR est
+vectorisé avec `numpy` s'il est installé (paquet optionnel), sinon il est fait en Python
+pur, ce qui ne convient qu'aux petits dumps (quelques millions de liens). Avec numpy,
+compter ~25 octets par lien au pic (tableaux, paires uint64 triées): ~100 M liens et
+quelques millions de titres tiennent dans ~4 Go. Le dump complet de enwiki (~1,5 G
+liens, ~60 M titres avec les liens rouges) dépasse largement une machine courante: le
+filtrer au préalable (espace de noms, sous-ensemble de pages) ou le construire sur une
+machine dédiée. La lecture de l'index, elle, passe par mmap et ne dépend pas de sa taille.
+"""
+
+import gzip
+import json
+import logging
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import get_link_graph_config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # Optionnel: construction en Python pur (petits dumps uniquement)
+    np = None
+
+FORMAT_VERSION = 1
+ARTICLE_NAMESPACE = 0
+
+# Fichiers d'un index (un répertoire par langue)
+_FILES = {
+    "titles": "titles.bin",              # Titres UTF-8 concaténés (ordre des nœuds)
+    "title_offsets": "title_offsets.bin",  # uint64, n + 1
+    "page_ids": "page_ids.bin",          # uint32, 0 = lien rouge (page inexistante)
+    "out_offsets": "out_offsets.bin",    # uint64, n + 1
+    "out_targets": "out_targets.bin",    # uint32
+    "in_offsets": "in_offsets.bin",      # uint64, n + 1
+    "in_sources": "in_sources.bin",      # uint32
+}
+
+# Tuples d'une instruction `INSERT INTO ... VALUES (...),(...);`
+_SQL_TOKEN = re.compile(r"'((?:[^'\\]|\\.)*)'|(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)|(NULL)|([()])")
+_SQL_ESCAPE = re.compile(r"\\(.)")
+_SQL_ESCAPES = {"0": "\0", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a"}
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _SQL_ESCAPE.sub(lambda m: _SQL_ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _open_dump(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def _int(value: Any) -> Optional[int]:
+    """Colonne entière d'une ligne (les champs TSV restent des chaînes jusqu'ici)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_dump_rows(path: str) -> Iterator[Tuple[Any, ...]]:
+    """Lignes d'une table, en flux, depuis un dump SQL (`INSERT INTO`) ou TSV (.tsv)
+
+    Les valeurs numériques non quotées des dumps SQL sont converties, les champs TSV
+    restent des chaînes: l'appelant convertit les colonnes entières qu'il connaît.
+    """
+    tsv = path.endswith((".tsv", ".tsv.gz"))
+    with _open_dump(path) as f:
+        for line in f:
+            if tsv:
+                line = line.rstrip("\n")
+                if line and not line.startswith("#"):
+                    # Champs gardés en chaînes: un titre comme "1984" n'est pas un entier
+                    yield tuple(line.split("\t"))
+                continue
+
+            if not line.startswith("INSERT INTO"):
+                continue
+            row: Optional[List[Any]] = None
+            for match in _SQL_TOKEN.finditer(line, line.find(" VALUES ")):
+                string, number, null, punct = match.groups()
+                if punct == "(":
+                    row = []
+                elif punct == ")":
+                    if row is not None:
+                        yield tuple(row)
+                    row = None
+                elif row is not None:
+                    if string is not None:
+                        row.append(_unescape(string))
+                    elif number is not None:
+                        row.append(int(number) if number.lstrip("-").isdigit() else float(number))
+                    else:
+                        row.append(None)
+
+
+def normalize_title(title: str) -> str:
+    """Titre au format des dumps: espaces -> `_`, première lettre en majuscule"""
+    title = title.strip().replace(" ", "_")
+    return title[:1].upper() + title[1:]
+
+
+class _GraphBuilder:
+    """Construction en une passe par dump; les nœuds reçoivent un id provisoire à la découverte"""
+
+    def __init__(self):
+        self.titles: List[str] = []
+        self.title_ids: Dict[str, int] = {}
+        self.page_ids = array("I")
+        self.page_nodes: Dict[int, int] = {}
+        self.link_targets: Dict[int, int] = {}
+        self.sources = array("I")
+        self.targets = array("I")
+
+    def node(self, title: str) -> int:
+        node = self.title_ids.get(title)
+        if node is None:
+            node = self.title_ids[title] = len(self.titles)
+            self.titles.append(title)
+            self.page_ids.append(0)
+        return node
+
+    def add_pages(self, path: str) -> None:
+        # page: (page_id, page_namespace, page_title, ...)
+        for row in iter_dump_rows(path):
+            if len(row) < 3 or _int(row[1]) != ARTICLE_NAMESPACE:
+                continue
+            page_id = _int(row[0])
+            if page_id is None:
+                continue
+            node = self.node(str(row[2]))
+            self.page_ids[node] = page_id
+            self.page_nodes[page_id] = node
+
+    def add_link_targets(self, path: str) -> None:
+        # linktarget: (lt_id, lt_namespace, lt_title)
+        for row in iter_dump_rows(path):
+            if len(row) < 3 or _int(row[1]) != ARTICLE_NAMESPACE:
+                continue
+            target_id = _int(row[0])
+            if target_id is not None:
+                self.link_targets[target_id] = self.node(str(row[2]))
+
+    def add_links(self, path: str) -> None:
+        # Schéma déduit du nombre de colonnes, jamais du type des valeurs (titres numériques)
+        for row in iter_dump_rows(path):
+            if len(row) >= 4:
+                # Ancien schéma: (pl_from, pl_namespace, pl_title, pl_from_namespace[, pl_target_id])
+                if _int(row[1]) != ARTICLE_NAMESPACE or _int(row[3]) != ARTICLE_NAMESPACE:
+                    continue
+                target = self.node(str(row[2]))
+            elif len(row) == 3:
+                # Schéma linktarget: (pl_from, pl_from_namespace, pl_target_id)
+                if _int(row[1]) != ARTICLE_NAMESPACE:
+                    continue
+                target = self.link_targets.get(_int(row[2]))
+                if target is None:
+                    continue
+            else:
+                continue
+
+            source = self.page_nodes.get(_int(row[0]))
+            if source is not None:
+                self.sources.append(source)
+                self.targets.append(target)
+
+    def write(self, directory: str, language: str) -> Dict[str, Any]:
+        os.makedirs(directory, exist_ok=True)
+        count = len(self.titles)
+
+        # Numérotation définitive dans l'ordre des titres
+        order = sorted(range(count), key=self.titles.__getitem__)
+        rank = array("I", bytes(4 * count))
+        for final, provisional in enumerate(order):
+            rank[provisional] = final
+
+        title_offsets = array("Q", [0])
+        page_ids = array("I")
+        with open(os.path.join(directory, _FILES["titles"]), "wb") as f:
+            for provisional in order:
+                encoded = self.titles[provisional].encode("utf-8")
+                f.write(encoded)
+                title_offsets.append(title_offsets[-1] + len(encoded))
+                page_ids.append(self.page_ids[provisional])
+        _write_array(directory, "title_offsets", title_offsets)
+        _write_array(directory, "page_ids", page_ids)
+
+        sources = _remap(rank, self.sources)
+        targets = _remap(rank, self.targets)
+        out_offsets, out_targets = _csr(count, sources, targets)
+        in_offsets, in_sources = _csr(count, targets, sources)
+        _write_array(directory, "out_offsets", out_offsets)
+        _write_array(directory, "out_targets", out_targets)
+        _write_array(directory, "in_offsets", in_offsets)
+        _write_array(directory, "in_sources", in_sources)
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "language": language,
+            "nodes": count,
+            "pages": sum(1 for page_id in page_ids if page_id),
+            "links": len(out_targets),
+            "built_at": int(time.time()),
+        }
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return meta
+
+
+def _remap(rank: array, values: array) -> array:
+    """Identifiants provisoires -> définitifs"""
+    if np is not None:
+        remapped = np.frombuffer(rank, dtype=np.uint32)[np.frombuffer(values, dtype=np.uint32)]
+        return array("I", remapped.tobytes())
+    return array("I", (rank[value] for value in values))
+
+
+def _csr(count: int, rows: array, columns: array) -> Tuple[array, array]:
+    """Adjacence CSR, colonnes de chaque ligne triées et dédoublonnées"""
+    if np is not None:
+        return _csr_numpy(count, rows, columns)
+
+    # Repli Python pur: tri par comptage
+    offsets = array("Q", bytes(8 * (count + 1)))
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array("Q", offsets[:-1]) if count else array("Q")
+    values = array("I", bytes(4 * len(columns)))
+    for row, column in zip(rows, columns):
+        values[cursor[row]] = column
+        cursor[row] += 1
+
+    compact_offsets = array("Q", [0])
+    compact = array("I")
+    for i in range(count):
+        segment = sorted(set(values[offsets[i]:offsets[i + 1]]))
+        compact.extend(segment)
+        compact_offsets.append(len(compact))
+    return compact_offsets, compact
+
+
+def _csr_numpy(count: int, rows: array, columns: array) -> Tuple[array, array]:
+    """Comme `_csr`, vectorisé: tri des paires (ligne, colonne) packées en uint64, puis somme préfixe"""
+    pairs = np.frombuffer(rows, dtype=np.uint32).astype(np.uint64) << np.uint64(32)
+    pairs |= np.frombuffer(columns, dtype=np.uint32).astype(np.uint64)
+    pairs.sort()
+    if len(pairs):
+        distinct = np.empty(len(pairs), dtype=bool)
+        distinct[0] = True
+        np.not_equal(pairs[1:], pairs[:-1], out=distinct[1:])
+        pairs = pairs[distinct]
+
+    values = (pairs & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    offsets = np.zeros(count + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum(np.bincount((pairs >> np.uint64(32)).astype(np.int64), minlength=count))
+    return array("Q", offsets.tobytes()), array("I", values.tobytes())
+
+
+def _write_array(directory: str, name: str, values: array) -> None:
+    with open(os.path.join(directory, _FILES[name]), "wb") as f:
+        values.tofile(f)
+
+
+def build_link_graph(
+    directory: str,
+    language: str,
+    page_dump: str,
+    pagelinks_dump: str,
+    linktarget_dump: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Construit l'index d'une langue dans `directory` à partir des dumps (une passe par dump)"""
+    builder = _GraphBuilder()
+    builder.add_pages(page_dump)
+    if linktarget_dump:
+        builder.add_link_targets(linktarget_dump)
+    builder.add_links(pagelinks_dump)
+    return builder.write(directory, language)
+
+
+class LinkGraph:
+    """Index de liens d'une langue, ouvert en lecture seule (mmap)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported link graph format in {directory}")
+
+        self._maps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
+        self._titles = self._map("titles", None)
+        self._title_offsets = self._map("title_offsets", "Q")
+        self._page_ids = self._map("page_ids", "I")
+        self._out_offsets = self._map("out_offsets", "Q")
+        self._out_targets = self._map("out_targets", "I")
+        self._in_offsets = self._map("in_offsets", "Q")
+        self._in_sources = self._map("in_sources", "I")
+        self.language = self.meta.get("language")
+
+    def _map(self, name: str, typecode: Optional[str]) -> memoryview:
+        path = os.path.join(self.directory, _FILES[name])
+        if os.path.getsize(path) == 0:
+            view = memoryview(b"")
+        else:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            view = memoryview(mapped)
+        self._views.append(view)
+        if typecode:
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+    def __len__(self) -> int:
+        return len(self._page_ids)
+
+    def _title_bytes(self, node: int) -> bytes:
+        return bytes(self._titles[self._title_offsets[node]:self._title_offsets[node + 1]])
+
+    def title(self, node: int) -> str:
+        """Titre affichable (espaces) d'un nœud"""
+        return self._title_bytes(node).decode("utf-8").replace("_", " ")
+
+    def page_id(self, node: int) -> Optional[int]:
+        return self._page_ids[node] or None
+
+    def lookup(self, title: str) -> Optional[int]:
+        """Nœud d'un titre (recherche dichotomique), None s'il est absent de l'index"""
+        key = normalize_title(title).encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self._title_bytes(lo) == key:
+            return lo
+        return None
+
+    def links(self, node: int, limit: Optional[int] = None) -> List[int]:
+        """Nœuds cibles des liens de `node`, dans l'ordre des titres"""
+        return self._slice(self._out_offsets, self._out_targets, node, limit)
+
+    def backlinks(self, node: int, limit: Optional[int] = None) -> List[int]:
+        """Nœuds des pages qui lient vers `node`, dans l'ordre des titres"""
+        return self._slice(self._in_offsets, self._in_sources, node, limit)
+
+    def links_count(self, node: int) -> int:
+        return self._out_offsets[node + 1] - self._out_offsets[node]
+
+    def backlinks_count(self, node: int) -> int:
+        return self._in_offsets[node + 1] - self._in_offsets[node]
+
+    @staticmethod
+    def _slice(offsets: memoryview, values: memoryview, node: int, limit: Optional[int]) -> List[int]:
+        start, end = offsets[node], offsets[node + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return values[start:end].tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        return {key: self.meta.get(key) for key in ("language", "nodes", "pages", "links", "built_at")}
+
+    def close(self) -> None:
+        # Les vues doivent être libérées avant la fermeture des mmap qu'elles exposent
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+
+_graphs: Dict[str, Optional[LinkGraph]] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_link_graph(language: str) -> Optional[LinkGraph]:
+    """Index local de la langue, ou None si LINK_GRAPH_PATH n'en contient pas (API en direct)"""
+    if language not in _graphs:
+        with _graphs_lock:
+            if language not in _graphs:
+                graph = None
+                root = get_link_graph_config()["path"]
+                directory = os.path.join(root, language) if root else None
+                if directory and os.path.exists(os.path.join(directory, "meta.json")):
+                    try:
+                        graph = LinkGraph(directory)
+                        logger.info(f"Index de liens local ({language}): {graph.meta.get('links')} liens")
+                    except Exception as e:
+                        logger.error(f"Erreur d'ouverture de l'index de liens {directory}: {e}")
+                _graphs[language] = graph
+    return _graphs[language]
+
+
+def get_link_graph_stats() -> Dict[str, Any]:
+    """Index de liens ouverts (exposé par /stats)."""
+    return {language: graph.stats() for language, graph in list(_graphs.items()) if graph is not None}
+
+
+def _main(argv: List[str]) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m services.link_graph")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Construire l'index d'une langue depuis les dumps")
+    build.add_argument("language")
+    build.add_argument("--page", required=True, help="Dump de la table page (.sql[.gz] ou .tsv[.gz])")
+    build.add_argument("--pagelinks", required=True, help="Dump de la table pagelinks")
+    build.add_argument("--linktarget", help="Dump de la table linktarget (pagelinks au schéma pl_target_id)")
+    build.add_argument("--output", help="Répertoire racine des index (défaut: LINK_GRAPH_PATH)")
+    args = parser.parse_args(argv)
+
+    root = args.output or get_link_graph_config()["path"]
+    directory = os.path.join(root, args.language)
+    started = time.monotonic()
+    meta = build_link_graph(directory, args.language, args.page, args.pagelinks, args.linktarget)
+    print(
+        f"Index {args.language}: {meta['nodes']} nœuds ({meta['pages']} pages), {meta['links']} liens "
+        f"-> {directory} en {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
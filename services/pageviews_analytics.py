@@ -0,0 +1,191 @@
+"""Vectorized pageviews analytics across many pages (NumPy, optional)"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optionnel: l'outil d'analyse renvoie alors une erreur explicite
+    np = None
+
+# Décalage année sur année aligné sur les jours de la semaine (52 semaines)
+YOY_SHIFT_DAYS = 364
+# Fenêtres de comparaison (jours)
+GROWTH_WINDOW_DAYS = 30
+YOY_WINDOW_DAYS = 28
+# Facteur de cohérence MAD -> écart-type pour une loi normale
+MAD_SCALE = 0.6745
+
+
+def numpy_available() -> bool:
+    """L'analyse vectorisée nécessite le paquet optionnel `numpy`."""
+    return np is not None
+
+
+def _stamp(item: Dict[str, Any]) -> int:
+    """Horodatage Pageviews (YYYYMMDDHH) -> YYYYMMDD entier"""
+    return int(str(item.get("timestamp", ""))[:8])
+
+
+def _days(stamps: "np.ndarray") -> "np.ndarray":
+    """Dates YYYYMMDD (entiers) -> datetime64[D], sans conversion date par date"""
+    months = (stamps // 10000 - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+    months = months + (stamps // 100 % 100 - 1).astype("timedelta64[M]")
+    return months.astype("datetime64[D]") + (stamps % 100 - 1).astype("timedelta64[D]")
+
+
+def build_views_matrix(series: List[List[Dict[str, Any]]], start_date: str, days: int) -> "np.ndarray":
+    """Séries quotidiennes Pageviews -> matrice (pages × jours); jours sans données = 0
+
+    Les vues de toutes les pages sont lues en un seul tableau plat; les positions (ligne,
+    jour) sont calculées par tableaux d'indices à partir des bornes de chaque série, et
+    seules les séries à trous sont datées jour par jour. Le placement est une seule
+    affectation vectorisée.
+    """
+    matrix = np.zeros((len(series), days), dtype=np.float64)
+    lengths = np.fromiter((len(items) for items in series), dtype=np.int64, count=len(series))
+    total = int(lengths.sum())
+    if not total:
+        return matrix
+
+    values = np.fromiter(
+        (item.get("views", 0) or 0 for items in series for item in items),
+        dtype=np.float64,
+        count=total,
+    )
+    origin = _days(np.array([int(start_date[:8])]))[0]
+    first = (_days(np.fromiter((_stamp(items[0]) if items else 19700101 for items in series), dtype=np.int64)) - origin).astype(np.int64)
+    last = (_days(np.fromiter((_stamp(items[-1]) if items else 19700101 for items in series), dtype=np.int64)) - origin).astype(np.int64)
+
+    # Série contiguë (cas habituel): jour = premier jour + rang dans la série
+    starts = np.cumsum(lengths) - lengths
+    offsets = np.arange(total) + np.repeat(first - starts, lengths)
+    for row in np.flatnonzero((lengths > 0) & (last - first + 1 != lengths)):
+        # Jours manquants dans la réponse: datation de chaque jour de cette série
+        items = series[row]
+        stamps = np.fromiter((_stamp(item) for item in items), dtype=np.int64, count=len(items))
+        offsets[starts[row]:starts[row] + len(items)] = (_days(stamps) - origin).astype(np.int64)
+
+    rows = np.repeat(np.arange(len(series)), lengths)
+    mask = (offsets >= 0) & (offsets < days)
+    matrix[rows[mask], offsets[mask]] = values[mask]
+    return matrix
+
+
+def _window_sums(cumulative: "np.ndarray", end: int, length: int) -> "np.ndarray":
+    """Somme par page des `length` jours se terminant (exclu) à l'index `end` de la série"""
+    return cumulative[:, end] - cumulative[:, end - length]
+
+
+def _percent_change(current: "np.ndarray", previous: "np.ndarray") -> "np.ndarray":
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous > 0, (current - previous) / previous * 100, np.nan)
+
+
+def _column(values: "np.ndarray", digits: int = 1) -> List[Optional[float]]:
+    """Colonne JSON: NaN -> None"""
+    return [None if v != v else v for v in np.round(values, digits).tolist()]
+
+
+def _ranking(titles: List[str], scores: "np.ndarray", top: int) -> List[str]:
+    """Titres triés par score décroissant (NaN exclus)"""
+    order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind="stable")
+    valid = order[~np.isnan(scores[order])]
+    return [titles[i] for i in valid[:top]]
+
+
+def analyze_views(
+    titles: List[str],
+    matrix: "np.ndarray",
+    start_date: str,
+    window: int = 7,
+    spike_threshold: float = 3.5,
+    top: int = 20,
+) -> Dict[str, Any]:
+    """Indicateurs par page, calculés en une passe vectorisée sur toute la matrice
+
+    - rolling_mean: moyenne mobile des `window` derniers jours
+    - growth_percent: 30 derniers jours vs les 30 précédents
+    - yoy_percent: 28 derniers jours vs les mêmes jours de semaine 52 semaines plus tôt
+      (neutralise la saisonnalité hebdomadaire), None si l'historique est trop court
+    - spikes: jours dont le z-score robuste (médiane/MAD de la page) dépasse `spike_threshold`
+    """
+    # Les derniers jours peuvent ne pas encore être publiés: on s'arrête au dernier jour avec des vues
+    active_days = np.flatnonzero(matrix.any(axis=0))
+    days = int(active_days[-1]) + 1 if active_days.size else 0
+    matrix = matrix[:, :days]
+    pages = matrix.shape[0]
+
+    # Sommes cumulées avec une colonne 0: toute somme de fenêtre = une soustraction
+    cumulative = np.zeros((pages, days + 1), dtype=np.float64)
+    np.cumsum(matrix, axis=1, out=cumulative[:, 1:])
+
+    totals = cumulative[:, days]
+    nan_column = np.full(pages, np.nan)
+
+    window = max(1, min(window, days)) if days else 1
+    rolling_mean = _window_sums(cumulative, days, window) / window if days else nan_column
+
+    if days >= 2 * GROWTH_WINDOW_DAYS:
+        growth = _percent_change(
+            _window_sums(cumulative, days, GROWTH_WINDOW_DAYS),
+            _window_sums(cumulative, days - GROWTH_WINDOW_DAYS, GROWTH_WINDOW_DAYS),
+        )
+    else:
+        growth = nan_column
+
+    if days >= YOY_SHIFT_DAYS + YOY_WINDOW_DAYS:
+        yoy = _percent_change(
+            _window_sums(cumulative, days, YOY_WINDOW_DAYS),
+            _window_sums(cumulative, days - YOY_SHIFT_DAYS, YOY_WINDOW_DAYS),
+        )
+    else:
+        yoy = nan_column
+
+    if days:
+        median = np.median(matrix, axis=1, keepdims=True)
+        mad = np.median(np.abs(matrix - median), axis=1, keepdims=True)
+        # Échelle minimale d'une vue: une page quasi constante ne fait pas de pic à chaque variation
+        z_scores = MAD_SCALE * (matrix - median) / np.maximum(mad, 1.0)
+        spike_counts = (z_scores > spike_threshold).sum(axis=1)
+        peak_days = np.argmax(z_scores, axis=1)
+        peak_z = z_scores[np.arange(pages), peak_days]
+        peak_views = matrix[np.arange(pages), peak_days]
+    else:
+        spike_counts = np.zeros(pages, dtype=np.int64)
+        peak_days = peak_z = peak_views = nan_column
+
+    origin = date(int(start_date[0:4]), int(start_date[4:6]), int(start_date[6:8]))
+    top_spikes = [
+        {
+            "date": (origin + timedelta(days=int(day))).strftime("%Y-%m-%d"),
+            "views": int(views),
+            "z_score": round(float(z), 1),
+        } if count else None
+        for count, day, views, z in zip(spike_counts.tolist(), peak_days.tolist(), peak_views.tolist(), peak_z.tolist())
+    ]
+
+    end = origin + timedelta(days=days - 1) if days else origin
+    return {
+        "start_date": origin.strftime("%Y-%m-%d"),
+        "end_date": end.strftime("%Y-%m-%d"),
+        "days": days,
+        "window": window,
+        "pages_count": pages,
+        "pages": {
+            "titles": titles,
+            "total_views": [int(v) for v in totals.tolist()],
+            "daily_average": _column(totals / days if days else nan_column),
+            "rolling_mean": _column(rolling_mean),
+            "growth_percent": _column(growth),
+            "yoy_percent": _column(yoy),
+            "spike_count": spike_counts.tolist(),
+            "top_spike": top_spikes,
+        },
+        "rankings": {
+            "by_views": _ranking(titles, totals, top),
+            "by_growth": _ranking(titles, growth, top),
+            "by_yoy": _ranking(titles, yoy, top),
+            "by_spikes": _ranking(titles, np.where(spike_counts > 0, peak_z, np.nan), top),
+        },
+    }
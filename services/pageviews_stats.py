@@ -0,0 +1,190 @@
+"""Pageviews statistics engine: every stats window derived from one planned daily/monthly series"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class PageviewsSeries:
+    """Série de vues d'un article par tranches (jours, ou mois entiers), interrogeable par fenêtre de dates
+
+    Stockée en tableaux compacts: bornes des tranches (ordinaux de dates) et sommes cumulées.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]] = None, granularity: str = "daily"):
+        self.starts = array("l")
+        self.ends = array("l")
+        # Sommes cumulées: total d'une fenêtre = 2 recherches dichotomiques
+        self.cumulative = array("q", [0])
+        if items:
+            self.extend(items, granularity)
+
+    @classmethod
+    def from_segments(cls, segments: List[Tuple[str, List[Dict[str, Any]]]]) -> "PageviewsSeries":
+        """Série assemblée à partir de réponses (granularité, items) couvrant des plages disjointes"""
+        series = cls()
+        buckets = sorted(
+            bucket
+            for granularity, items in segments
+            for bucket in _buckets(items or [], granularity)
+        )
+        series._append(buckets)
+        return series
+
+    def extend(self, items: List[Dict[str, Any]], granularity: str = "daily") -> None:
+        """Ajoute des items Pageviews postérieurs aux tranches déjà présentes"""
+        self._append(sorted(_buckets(items, granularity)))
+
+    def _append(self, buckets: List[Tuple[int, int, int]]) -> None:
+        total = self.cumulative[-1]
+        for start, end, views in buckets:
+            total += views
+            self.starts.append(start)
+            self.ends.append(end)
+            self.cumulative.append(total)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def total(self, start_date: str, end_date: str) -> int:
+        """Total des vues entre deux dates incluses (YYYYMMDD)
+
+        Seules les tranches entièrement comprises dans la fenêtre sont comptées: les plages
+        planifiées par `plan_pageviews_requests` sont découpées pour que ce soit exact.
+        """
+        lo = bisect_left(self.starts, _ordinal(start_date))
+        hi = bisect_right(self.ends, _ordinal(end_date))
+        if hi <= lo:
+            return 0
+        return self.cumulative[hi] - self.cumulative[lo]
+
+
+def _date(day: str) -> date:
+    return date(int(day[0:4]), int(day[4:6]), int(day[6:8]))
+
+
+def _ordinal(day: str) -> int:
+    return _date(day).toordinal()
+
+
+def _month_end(day: date) -> date:
+    return date(day.year, day.month, monthrange(day.year, day.month)[1])
+
+
+def _buckets(items: List[Dict[str, Any]], granularity: str) -> Iterator[Tuple[int, int, int]]:
+    """Items Pageviews -> tranches (début, fin, vues) en ordinaux de dates"""
+    for item in items:
+        day = str(item.get("timestamp", ""))[:8]
+        if len(day) < 8:
+            continue
+        start = _date(day)
+        end = _month_end(start) if granularity == "monthly" else start
+        yield start.toordinal(), end.toordinal(), int(item.get("views", 0) or 0)
+
+
+def stats_windows(now: datetime) -> Dict[str, Tuple[str, str]]:
+    """Fenêtres (début, fin) au format YYYYMMDD utilisées par les statistiques complètes"""
+    return {
+        # Dernier mois (30 jours)
+        "past_month": ((now - timedelta(days=30)).strftime("%Y%m%d"), now.strftime("%Y%m%d")),
+        # Année dernière (365 jours)
+        "past_year": ((now - timedelta(days=365)).strftime("%Y%m%d"), now.strftime("%Y%m%d")),
+        # Mois en cours
+        "current_month": (now.replace(day=1).strftime("%Y%m%d"), now.strftime("%Y%m%d")),
+        # Même mois année dernière
+        "last_year_month": (
+            (now.replace(day=1) - timedelta(days=365)).strftime("%Y%m%d"),
+            (now - timedelta(days=365)).strftime("%Y%m%d")
+        ),
+    }
+
+
+def daily_range(days: int, end: Optional[date] = None) -> Tuple[str, str]:
+    """Plage (début, fin) YYYYMMDD de `days` jours se terminant hier (dernier jour publié)"""
+    end = end or date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    return start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+
+
+def series_range(windows: Dict[str, Tuple[str, str]]) -> Tuple[str, str]:
+    """Plage (~13 mois) couvrant toutes les fenêtres"""
+    return (
+        min(start for start, _ in windows.values()),
+        max(end for _, end in windows.values()),
+    )
+
+
+def plan_pageviews_requests(windows: Dict[str, Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+    """Découpe la plage des fenêtres en requêtes Pageviews (granularité, début, fin)
+
+    Les mois qui contiennent une borne de fenêtre non alignée sur un mois entier sont
+    demandés en `daily`, tous les autres mois en `monthly` (un point par mois au lieu
+    d'une trentaine). Les mois consécutifs de même granularité forment une seule requête.
+    Pour les fenêtres par défaut (~13 mois): ~90 points au lieu de ~395.
+    """
+    start_date, end_date = series_range(windows)
+    first, last = _date(start_date), _date(end_date)
+
+    # Le dernier mois (en cours) n'a pas encore de total mensuel publié
+    daily_months = {(last.year, last.month)}
+    for start, end in windows.values():
+        start_day, end_day = _date(start), _date(end)
+        if start_day.day != 1:
+            daily_months.add((start_day.year, start_day.month))
+        if end_day != _month_end(end_day):
+            daily_months.add((end_day.year, end_day.month))
+
+    plan: List[Tuple[str, date, date]] = []
+    month = first.replace(day=1)
+    while month <= last:
+        granularity = "daily" if (month.year, month.month) in daily_months else "monthly"
+        segment_start = max(first, month)
+        segment_end = min(last, _month_end(month))
+        if plan and plan[-1][0] == granularity:
+            plan[-1] = (granularity, plan[-1][1], segment_end)
+        else:
+            plan.append((granularity, segment_start, segment_end))
+        month = _month_end(month) + timedelta(days=1)
+
+    return [(granularity, start.strftime("%Y%m%d"), end.strftime("%Y%m%d")) for granularity, start, end in plan]
+
+
+def _days_between(start_date: str, end_date: str) -> int:
+    return (
+        datetime.strptime(end_date, "%Y%m%d") -
+        datetime.strptime(start_date, "%Y%m%d")
+    ).days + 1
+
+
+def compute_statistics(series: PageviewsSeries, windows: Dict[str, Tuple[str, str]]) -> Dict[str, Any]:
+    """Calcule en mémoire les totaux, moyennes quotidiennes et l'évolution YoY"""
+    totals = {name: series.total(start, end) for name, (start, end) in windows.items()}
+
+    # Calculer les moyennes quotidiennes
+    days_in_current_month = _days_between(*windows["current_month"])
+    daily_views_current = (
+        totals["current_month"] / days_in_current_month
+        if days_in_current_month > 0 else 0
+    )
+
+    days_in_last_year_month = _days_between(*windows["last_year_month"])
+    daily_views_last_year = (
+        totals["last_year_month"] / days_in_last_year_month
+        if days_in_last_year_month > 0 else 0
+    )
+
+    # Calculer le changement YoY
+    if daily_views_last_year > 0:
+        yoy_change = ((daily_views_current - daily_views_last_year) / daily_views_last_year) * 100
+    else:
+        yoy_change = 0 if daily_views_current == 0 else 100
+
+    return {
+        "past_month_total_views": totals["past_month"],
+        "past_year_total_views": totals["past_year"],
+        "daily_views_current_month": round(daily_views_current),
+        "daily_views_last_year_same_month": round(daily_views_last_year),
+        "yoy_change_percent": round(yoy_change, 1)
+    }
@@ -0,0 +1,297 @@
+"""Local Wikidata property catalog (PID -> labels, datatype, formatter URL)
+
+Les métadonnées de propriétés (P1630 notamment) changent très rarement: elles
+sont conservées dans une table SQLite indexée, chargée en mémoire au démarrage
+et complétée à la demande pour les propriétés ou langues manquantes.
+
+Construire le snapshot livré avec le projet (nécessite un accès réseau):
+
+    python -m services.property_catalog build data/wikidata_properties.json
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import get_property_catalog_config
+
+logger = logging.getLogger(__name__)
+
+
+def _pid_to_int(pid: str) -> Optional[int]:
+    if not pid or pid[0] not in "Pp" or not pid[1:].isdigit():
+        return None
+    return int(pid[1:])
+
+
+def property_meta(pid: str, label: Optional[str], datatype: Optional[str], formatter_url: Optional[str]) -> Dict[str, Any]:
+    """Format des métadonnées retournées par `get_properties_metadata`."""
+    return {
+        "id": pid,
+        "label": label,
+        "datatype": datatype,
+        "formatter_url": formatter_url,
+        "url": f"https://www.wikidata.org/wiki/Property:{pid}",
+    }
+
+
+def parse_formatter_url(prop: Dict[str, Any]) -> Optional[str]:
+    """Premier formatter URL (P1630) d'une propriété au format wbgetentities."""
+    claims = prop.get("claims", {}) or {}
+    p1630 = claims.get("P1630")
+    if isinstance(p1630, list) and p1630:
+        mainsnak = (p1630[0] or {}).get("mainsnak", {}) or {}
+        datavalue = (mainsnak.get("datavalue") or {})
+        value = datavalue.get("value")
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+
+class PropertyCatalog:
+    """Catalogue compact des propriétés: table SQLite + index mémoire par PID numérique"""
+
+    def __init__(self, path: str, max_age: float = 0):
+        self.path = path
+        self.max_age = float(max_age or 0)
+        self._lock = threading.Lock()
+
+        # pid numérique -> (datatype, formatter_url, updated_at)
+        self._props: Dict[int, Tuple[Optional[str], Optional[str], float]] = {}
+        # (pid numérique, langue) -> label (None = pas de label dans cette langue)
+        self._labels: Dict[Tuple[int, str], Optional[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS properties (
+                pid INTEGER PRIMARY KEY,
+                datatype TEXT,
+                formatter_url TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS property_labels (
+                pid INTEGER NOT NULL,
+                language TEXT NOT NULL,
+                label TEXT,
+                PRIMARY KEY (pid, language)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self) -> None:
+        with self._lock:
+            for pid, datatype, formatter_url, updated_at in self._conn.execute(
+                "SELECT pid, datatype, formatter_url, updated_at FROM properties"
+            ):
+                self._props[pid] = (datatype, formatter_url, updated_at)
+            for pid, language, label in self._conn.execute(
+                "SELECT pid, language, label FROM property_labels"
+            ):
+                self._labels[(pid, language)] = label
+
+    def __len__(self) -> int:
+        return len(self._props)
+
+    def lookup(self, property_ids: Iterable[str], language: str) -> Tuple[Dict[str, Any], List[str]]:
+        """Retourne (métadonnées connues, PIDs à rafraîchir) pour une langue donnée."""
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        now = time.time()
+
+        with self._lock:
+            for pid in property_ids:
+                num = _pid_to_int(pid)
+                entry = self._props.get(num) if num is not None else None
+                stale = entry is not None and self.max_age and now - entry[2] > self.max_age
+                if entry is None or stale or (num, language) not in self._labels:
+                    missing.append(pid)
+                    continue
+
+                datatype, formatter_url, _ = entry
+                found[pid] = property_meta(pid, self._labels[(num, language)], datatype, formatter_url)
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def store(self, entities: Dict[str, Any], languages: List[str]) -> None:
+        """Ajoute/actualise des propriétés au format wbgetentities (labels|claims|datatype)."""
+        now = time.time()
+        prop_rows = []
+        label_rows = []
+
+        for pid, prop in (entities or {}).items():
+            num = _pid_to_int(pid)
+            if num is None:
+                continue
+            prop = prop or {}
+            prop_rows.append((num, prop.get("datatype"), parse_formatter_url(prop), now))
+
+            labels = prop.get("labels", {}) or {}
+            for language in languages:
+                label_rows.append((num, language, (labels.get(language, {}) or {}).get("value")))
+
+        if not prop_rows:
+            return
+
+        with self._lock:
+            for num, datatype, formatter_url, updated_at in prop_rows:
+                self._props[num] = (datatype, formatter_url, updated_at)
+            for num, language, label in label_rows:
+                self._labels[(num, language)] = label
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO properties (pid, datatype, formatter_url, updated_at) VALUES (?, ?, ?, ?)",
+                prop_rows,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO property_labels (pid, language, label) VALUES (?, ?, ?)",
+                label_rows,
+            )
+            self._conn.commit()
+
+    def load_snapshot(self, snapshot_path: str) -> int:
+        """Importe un snapshot JSON (voir `export_snapshot`). Retourne le nombre de propriétés."""
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+
+        entities: Dict[str, Any] = {}
+        languages = set()
+        for item in snapshot.get("properties", []) or []:
+            pid = item.get("id")
+            if not pid:
+                continue
+            labels = item.get("labels", {}) or {}
+            languages.update(labels.keys())
+            entities[pid] = {
+                "datatype": item.get("datatype"),
+                "labels": {lang: {"value": value} for lang, value in labels.items()},
+                "claims": (
+                    {"P1630": [{"mainsnak": {"datavalue": {"value": item["formatter_url"]}}}]}
+                    if item.get("formatter_url") else {}
+                ),
+            }
+
+        self.store(entities, sorted(languages))
+        return len(entities)
+
+    def export_snapshot(self, snapshot_path: str) -> int:
+        """Écrit le catalogue dans un snapshot JSON compact (une entrée par propriété)."""
+        with self._lock:
+            items: Dict[int, Dict[str, Any]] = {}
+            for num, (datatype, formatter_url, _) in sorted(self._props.items()):
+                items[num] = {
+                    "id": f"P{num}",
+                    "datatype": datatype,
+                    "formatter_url": formatter_url,
+                    "labels": {},
+                }
+            for (num, language), label in self._labels.items():
+                if label is not None and num in items:
+                    items[num]["labels"][language] = label
+
+        with open(snapshot_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "properties": list(items.values())},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        return len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "properties": len(self._props),
+                "labels": len(self._labels),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_catalog: Optional[PropertyCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_property_catalog() -> PropertyCatalog:
+    """Retourne le catalogue partagé, préchargé depuis le snapshot livré si la table est vide."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                config = get_property_catalog_config()
+                catalog = PropertyCatalog(config["path"], max_age=config["max_age"])
+
+                snapshot_path = config.get("snapshot_path")
+                if not len(catalog) and snapshot_path and os.path.exists(snapshot_path):
+                    try:
+                        count = catalog.load_snapshot(snapshot_path)
+                        logger.info(f"Catalogue de propriétés Wikidata préchargé: {count} propriétés")
+                    except Exception as e:
+                        logger.error(f"Erreur de chargement du snapshot de propriétés: {e}")
+
+                _catalog = catalog
+    return _catalog
+
+
+def _build_snapshot(output_path: str) -> None:
+    """Télécharge toutes les propriétés Wikidata dans le catalogue puis exporte le snapshot."""
+    from config.constants import SUPPORTED_LANGUAGES
+    from config.settings import get_headers
+    from services.http_client import get_json
+
+    api_url = "https://www.wikidata.org/w/api.php"
+    headers = get_headers()
+    languages = list(SUPPORTED_LANGUAGES.keys())
+    catalog = get_property_catalog()
+
+    params = {"action": "query", "list": "allpages", "apnamespace": 120, "aplimit": "max", "format": "json"}
+    property_ids: List[str] = []
+    while True:
+        data = get_json(api_url, params=params, headers=headers, timeout=60)
+        for page in data.get("query", {}).get("allpages", []) or []:
+            property_ids.append(page["title"].split(":", 1)[-1])
+        cont = data.get("continue")
+        if not cont:
+            break
+        params.update(cont)
+
+    for i in range(0, len(property_ids), 50):
+        data = get_json(
+            api_url,
+            params={
+                "action": "wbgetentities",
+                "ids": "|".join(property_ids[i : i + 50]),
+                "props": "labels|claims|datatype",
+                "languages": "|".join(languages),
+                "format": "json",
+            },
+            headers=headers,
+            timeout=60,
+        )
+        catalog.store(data.get("entities", {}) or {}, languages)
+
+    count = catalog.export_snapshot(output_path)
+    print(f"{count} propriétés exportées vers {output_path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "build":
+        print("Usage: python -m services.property_catalog build <snapshot.json>")
+        sys.exit(1)
+    _build_snapshot(sys.argv[2])
@@ -0,0 +1,84 @@
+"""Per-host request rate ceilings for upstream Wikimedia APIs"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe, utilisable depuis du code sync comme async.
+
+    `reserve()` ne bloque pas: il réserve un jeton et retourne le délai à attendre
+    avant d'envoyer la requête (`time.sleep` ou `asyncio.sleep` selon l'appelant).
+
+    Le débit est adaptatif: `penalize()` le divise par deux après un refus de l'hôte
+    (429, maxlag) et suspend les envois, `recover()` le remonte progressivement vers
+    le plafond configuré à chaque réponse acceptée.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, min_rate: float = None):
+        self.rate = float(rate)
+        self.max_rate = self.rate
+        self.min_rate = float(min_rate if min_rate is not None else min(self.rate, 1.0))
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Réserve un jeton et retourne le délai d'attente en secondes (0 si disponible)"""
+        with self._lock:
+            self._refill(time.monotonic())
+
+            # Le solde peut devenir négatif: les réservations suivantes attendent leur tour
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def penalize(self, delay: float) -> None:
+        """Refus de l'hôte: débit divisé par deux et aucun envoi pendant `delay` secondes.
+
+        Les refus reçus pendant une pause déjà en cours ne divisent pas à nouveau le débit
+        (les requêtes parties ensemble sont souvent refusées ensemble).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self._paused_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self._paused_until = max(self._paused_until, now + delay)
+            self._tokens = min(self._tokens, -delay * self.rate)
+
+    def recover(self) -> None:
+        """Réponse acceptée: remontée additive du débit vers le plafond"""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Délai exponentiel avec gigue (entre la moitié et la totalité de `base * 2**attempt`)"""
+    delay = min(maximum, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """En-tête `Retry-After` (secondes ou date HTTP) -> secondes, None si absent/invalide"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,90 @@
+"""Single-flight coalescing of identical in-flight upstream calls"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    """Appel en vol partagé par les threads qui demandent la même clé."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Une seule exécution par clé à un instant donné: les appels concurrents
+    identiques attendent le résultat (ou l'exception) du premier.
+
+    `do()` couvre les appelants sync (threads), `ado()` les coroutines; les appels
+    en vol async sont rattachés à leur boucle d'événements.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        # boucle -> {clé: tâche}
+        self._tasks = weakref.WeakKeyDictionary()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = tasks[key] = loop.create_task(fn())
+                task.add_done_callback(lambda _: self._forget(tasks, key, task))
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        # shield: l'annulation d'un appelant n'annule pas l'appel partagé par les autres
+        return await asyncio.shield(task)
+
+    def _forget(self, tasks: Dict[str, "asyncio.Task"], key: str, task: "asyncio.Task") -> None:
+        with self._lock:
+            if tasks.get(key) is task:
+                del tasks[key]
+        # Évite l'avertissement "exception was never retrieved" si tous les appelants ont été annulés
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + sum(len(t) for t in self._tasks.values()),
+            }
@@ -1,15 +1,56 @@
 """Wikidata API service for entity lookup and relations"""
 
 import logging
-from typing import Any, Dict, List, Optional
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 from urllib.parse import quote
 
-import requests
-
-from config.settings import get_headers
+from config.settings import get_headers, get_wikidata_config
+from services.entity_store import get_entity_store
+from services.fanout import fan_out
+from services.http_client import async_get_json, get_json
+from services.label_index import get_label_index
+from services.property_catalog import get_property_catalog
 
 logger = logging.getLogger(__name__)
 
+# Blocs d'une entité demandables à wbgetentities (paramètre `props`)
+ENTITY_PROPS = ("labels", "descriptions", "aliases", "claims", "sitelinks")
+# Blocs d'une entité filtrés par le paramètre `languages`
+LANGUAGE_PROPS = ("labels", "descriptions", "aliases")
+
+
+def _chunks(ids: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(ids), size):
+        yield ids[i : i + size]
+
+
+def _api_error(data: Any) -> Optional[str]:
+    """Erreur d'API MediaWiki d'une réponse (renvoyée avec un statut 200), None sinon"""
+    if not isinstance(data, dict) or "error" not in data:
+        return None
+    error = data["error"] if isinstance(data["error"], dict) else {}
+    return error.get("info") or error.get("code") or "Wikidata API error"
+
+
+def _is_exact(results: List[Dict[str, Any]]) -> bool:
+    """Un label/alias local correspond exactement au terme: wbsearchentities n'est pas interrogé"""
+    return bool(results) and (results[0].get("match") or {}).get("type") == "exact"
+
+
+def _filter_entity(
+    entity: Dict[str, Any],
+    props: Optional[List[str]],
+    languages: Optional[List[str]],
+) -> Dict[str, Any]:
+    """Applique localement les filtres `props`/`languages` de wbgetentities."""
+    if props:
+        entity = {key: value for key, value in entity.items() if key in ("id", "type", "datatype") or key in props}
+    for block in LANGUAGE_PROPS:
+        if languages and block in entity:
+            entity[block] = {lang: value for lang, value in entity[block].items() if lang in languages}
+    return entity
+
 
 class WikidataAPIService:
     """Service pour interagir avec l'API Wikidata (MediaWiki)."""
@@ -24,54 +65,85 @@ class WikidataAPIService:
         language: str = "fr",
         limit: int = 5,
     ) -> Dict[str, Any]:
-        """Recherche des entités Wikidata via wbsearchentities."""
+        """Recherche des entités Wikidata (index de labels local, sinon wbsearchentities)."""
         try:
-            params = {
-                "action": "wbsearchentities",
-                "search": query,
-                "language": language,
-                "uselang": language,
-                "format": "json",
-                "limit": limit,
-            }
-
-            response = requests.get(
-                self.api_url,
-                params=params,
-                headers=self.headers,
-                timeout=30,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            results = []
-            for item in data.get("search", []) or []:
-                entity_id = item.get("id")
-                if not entity_id:
-                    continue
+            local = self._local_search(query, language, limit)
+            if _is_exact(local):
+                return self._search_response(query, language, local, "local")
 
-                results.append(
-                    {
-                        "id": entity_id,
-                        "label": item.get("label"),
-                        "description": item.get("description"),
-                        "url": item.get("concepturi")
-                        or f"https://www.wikidata.org/wiki/{entity_id}",
-                        "match": item.get("match"),
-                    }
+            try:
+                data = get_json(
+                    self.api_url,
+                    params=self._search_params(query, language, limit),
+                    headers=self.headers,
+                    timeout=30,
+                    cache="search",
                 )
-
-            return {
-                "success": True,
-                "query": query,
-                "language": language,
-                "total_results": len(results),
-                "results": results,
-            }
+            except Exception as e:
+                if not local:
+                    raise
+                logger.warning(f"wbsearchentities unavailable, using local prefix matches: {e}")
+                return self._search_response(query, language, local, "local")
+            return self._merge_search(self._parse_search(query, language, data), local, limit)
         except Exception as e:
             logger.error(f"Error searching Wikidata entities: {e}")
             return {"success": False, "error": str(e)}
 
+    def _local_search(self, query: str, language: str, limit: int) -> List[Dict[str, Any]]:
+        """Résultats de l'index de labels local (vide si la langue n'est pas indexée), correspondances exactes d'abord."""
+        index = get_label_index(language)
+        return index.search(query, limit) if index is not None else []
+
+    def _search_response(self, query: str, language: str, results: List[Dict[str, Any]], source: str) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "query": query,
+            "language": language,
+            "total_results": len(results),
+            "results": results,
+            "source": source,
+        }
+
+    def _merge_search(self, response: Dict[str, Any], local: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+        """Complète les résultats wbsearchentities par les correspondances locales (préfixe, mots) absentes."""
+        seen = {item["id"] for item in response["results"]}
+        extra = [item for item in local if item["id"] not in seen][: max(limit - len(response["results"]), 0)]
+        if extra:
+            response["results"].extend(extra)
+            response["total_results"] = len(response["results"])
+            response["source"] = "api+local"
+        return response
+
+    def _search_params(self, query: str, language: str, limit: int) -> Dict[str, Any]:
+        return {
+            "action": "wbsearchentities",
+            "search": query,
+            "language": language,
+            "uselang": language,
+            "format": "json",
+            "limit": limit,
+        }
+
+    def _parse_search(self, query: str, language: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        results = []
+        for item in data.get("search", []) or []:
+            entity_id = item.get("id")
+            if not entity_id:
+                continue
+
+            results.append(
+                {
+                    "id": entity_id,
+                    "label": item.get("label"),
+                    "description": item.get("description"),
+                    "url": item.get("concepturi")
+                    or f"https://www.wikidata.org/wiki/{entity_id}",
+                    "match": item.get("match"),
+                }
+            )
+
+        return self._search_response(query, language, results, "api")
+
     def get_properties_metadata(
         self,
         property_ids: List[str],
@@ -83,54 +155,83 @@ class WikidataAPIService:
             if not property_ids:
                 return {"success": True, "properties": {}}
 
-            properties_out: Dict[str, Any] = {}
-            for i in range(0, len(property_ids), batch_size):
-                chunk = property_ids[i : i + batch_size]
-                params = {
-                    "action": "wbgetentities",
-                    "ids": "|".join(chunk),
-                    "props": "labels|claims|datatype",
-                    "languages": language,
-                    "format": "json",
-                }
-
-                response = requests.get(
-                    self.api_url,
-                    params=params,
-                    headers=self.headers,
-                    timeout=30,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                for pid, prop in (data.get("entities", {}) or {}).items():
-                    label = (
-                        (prop.get("labels", {}) or {}).get(language, {}) or {}
-                    ).get("value")
-
-                    formatter_url = None
-                    claims = prop.get("claims", {}) or {}
-                    p1630 = claims.get("P1630")
-                    if isinstance(p1630, list) and p1630:
-                        mainsnak = (p1630[0] or {}).get("mainsnak", {}) or {}
-                        datavalue = (mainsnak.get("datavalue") or {})
-                        value = datavalue.get("value")
-                        if isinstance(value, str) and value.strip():
-                            formatter_url = value.strip()
-
-                    properties_out[pid] = {
-                        "id": pid,
-                        "label": label,
-                        "datatype": prop.get("datatype"),
-                        "formatter_url": formatter_url,
-                        "url": f"https://www.wikidata.org/wiki/Property:{pid}",
-                    }
-
-            return {"success": True, "properties": properties_out}
+            # Catalogue local d'abord: seuls les PIDs inconnus (ou sans label dans la langue) partent sur le réseau
+            catalog = get_property_catalog()
+            properties_out, missing = catalog.lookup(property_ids, language)
+            local, missing = self._local_properties(catalog, missing, language)
+            properties_out.update(local)
+            responses, failed_ids, error = self._fetch_batches(
+                missing, batch_size, lambda chunk: self._properties_params(chunk, language)
+            )
+            return self._merge_properties(catalog, properties_out, missing, language, responses, failed_ids, error)
         except Exception as e:
             logger.error(f"Error getting Wikidata properties metadata: {e}")
             return {"success": False, "error": str(e)}
 
+    def _properties_params(self, chunk: List[str], language: str) -> Dict[str, Any]:
+        return {
+            "action": "wbgetentities",
+            "ids": "|".join(chunk),
+            "props": "labels|claims|datatype",
+            "languages": language,
+            "format": "json",
+        }
+
+    def _merge_properties(
+        self,
+        catalog,
+        properties_out: Dict[str, Any],
+        missing: List[str],
+        language: str,
+        responses: List[Dict[str, Any]],
+        failed_ids: List[str],
+        error: Optional[str],
+    ) -> Dict[str, Any]:
+        if missing and not responses and not properties_out:
+            return {"success": False, "error": error}
+
+        for data in responses:
+            catalog.store(data.get("entities", {}) or {}, [language])
+        if responses:
+            fetched, _ = catalog.lookup(missing, language)
+            properties_out.update(fetched)
+
+        return {"success": True, "properties": properties_out, "failed_ids": failed_ids}
+
+    def _fetch_batches(
+        self,
+        ids: List[str],
+        batch_size: int,
+        params_for: Callable[[List[str]], Dict[str, Any]],
+        cache: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[str], Optional[str]]:
+        """Envoie les lots wbgetentities et retourne (réponses, ids en échec, dernière erreur).
+
+        Les reprises (429/503/maxlag, erreurs réseau) sont faites par le transport HTTP.
+        Un lot en échec, y compris une erreur d'API renvoyée avec un statut 200, n'invalide
+        pas les autres: l'appelant fusionne les réponses obtenues et signale les
+        identifiants manquants.
+        """
+        responses: List[Dict[str, Any]] = []
+        failed_ids: List[str] = []
+        error = None
+
+        for chunk in _chunks(ids, batch_size):
+            try:
+                data = get_json(self.api_url, params=params_for(chunk), headers=self.headers, timeout=30, cache=cache)
+                batch_error = _api_error(data)
+            except Exception as e:
+                batch_error = str(e)
+            if batch_error is None:
+                responses.append(data)
+                continue
+            error = batch_error
+            logger.warning(f"Wikidata batch failed ({len(chunk)} ids): {error}")
+            failed_ids.extend(chunk)
+
+        return responses, failed_ids, error
+
     def extract_sitelinks(self, entity: Dict[str, Any]) -> Dict[str, Any]:
         """Extrait les sitelinks (Wikipedia, Wikibooks, etc.) en URLs cliquables."""
         try:
@@ -193,86 +294,237 @@ class WikidataAPIService:
             prop_meta_resp = self.get_properties_metadata(property_ids, language=language)
             if not prop_meta_resp.get("success"):
                 return prop_meta_resp
-            prop_meta = prop_meta_resp.get("properties", {})
 
-            identifiers: Dict[str, Any] = {}
-            for pid in property_ids:
-                statements = claims.get(pid)
-                if not isinstance(statements, list) or not statements:
+            return self._build_identifiers(
+                claims,
+                property_ids,
+                prop_meta_resp.get("properties", {}),
+                max_values_per_property,
+            )
+        except Exception as e:
+            logger.error(f"Error extracting external identifiers: {e}")
+            return {"success": False, "error": str(e)}
+
+    def _build_identifiers(
+        self,
+        claims: Dict[str, Any],
+        property_ids: List[str],
+        prop_meta: Dict[str, Any],
+        max_values_per_property: int,
+    ) -> Dict[str, Any]:
+        identifiers: Dict[str, Any] = {}
+        for pid in property_ids:
+            statements = claims.get(pid)
+            if not isinstance(statements, list) or not statements:
+                continue
+
+            meta = prop_meta.get(pid, {})
+            formatter_url = meta.get("formatter_url")
+            values: List[Dict[str, Any]] = []
+
+            for st in statements:
+                mainsnak = (st or {}).get("mainsnak", {}) or {}
+                datavalue = (mainsnak.get("datavalue") or {})
+                if not datavalue:
                     continue
 
-                meta = prop_meta.get(pid, {})
-                formatter_url = meta.get("formatter_url")
-                values: List[Dict[str, Any]] = []
+                raw_value = datavalue.get("value")
+                if not isinstance(raw_value, str):
+                    continue
 
-                for st in statements:
-                    mainsnak = (st or {}).get("mainsnak", {}) or {}
-                    datavalue = (mainsnak.get("datavalue") or {})
-                    if not datavalue:
-                        continue
+                raw_value = raw_value.strip()
+                if not raw_value:
+                    continue
 
-                    raw_value = datavalue.get("value")
-                    if not isinstance(raw_value, str):
-                        continue
+                url = None
 
-                    raw_value = raw_value.strip()
-                    if not raw_value:
-                        continue
+                # Special-case: Freebase ID -> Google KG mid
+                if pid == "P646":
+                    url = f"https://www.google.com/search?kgmid={quote(raw_value, safe='') }"
+                elif formatter_url and "$1" in formatter_url:
+                    url = formatter_url.replace("$1", quote(raw_value, safe=""))
 
-                    url = None
-
-                    # Special-case: Freebase ID -> Google KG mid
-                    if pid == "P646":
-                        url = f"https://www.google.com/search?kgmid={quote(raw_value, safe='') }"
-                    elif formatter_url and "$1" in formatter_url:
-                        url = formatter_url.replace("$1", quote(raw_value, safe=""))
-
-                    values.append({"value": raw_value, "url": url})
-                    if len(values) >= max_values_per_property:
-                        break
-
-                # Ne garder que les propriétés qui ont des valeurs string
-                if values:
-                    identifiers[pid] = {
-                        "property": pid,
-                        "property_label": meta.get("label"),
-                        "property_url": meta.get("url"),
-                        "formatter_url": formatter_url,
-                        "values": values,
-                        "count": len(values),
-                    }
+                values.append({"value": raw_value, "url": url})
+                if len(values) >= max_values_per_property:
+                    break
 
-            return {
-                "success": True,
-                "identifiers": identifiers,
-                "identifiers_count": len(identifiers),
-            }
-        except Exception as e:
-            logger.error(f"Error extracting external identifiers: {e}")
-            return {"success": False, "error": str(e)}
+            # Ne garder que les propriétés qui ont des valeurs string
+            if values:
+                identifiers[pid] = {
+                    "property": pid,
+                    "property_label": meta.get("label"),
+                    "property_url": meta.get("url"),
+                    "formatter_url": formatter_url,
+                    "values": values,
+                    "count": len(values),
+                }
 
-    def get_entity_data(self, entity_id: str) -> Dict[str, Any]:
-        """Récupère les données d'une entité via Special:EntityData/{id}.json."""
+        return {
+            "success": True,
+            "identifiers": identifiers,
+            "identifiers_count": len(identifiers),
+        }
+
+    def _local_entities(
+        self,
+        entity_ids: List[str],
+        props: Optional[List[str]],
+        languages: Optional[List[str]],
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Entités servies par le store local (dump), et identifiants à demander à l'API.
+
+        Le store ne contient que les langues choisies à sa construction: les documents
+        complets (sans `languages`) et les autres langues passent par l'API.
+        """
+        store = get_entity_store()
+        if store is None or not languages or not store.covers(languages):
+            return {}, list(entity_ids)
+
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        for entity_id in entity_ids:
+            entity = store.get(entity_id)
+            if entity is None:
+                missing.append(entity_id)
+            else:
+                found[entity_id] = _filter_entity(entity, props, languages)
+        return found, missing
+
+    def _local_properties(self, catalog, missing: List[str], language: str) -> Tuple[Dict[str, Any], List[str]]:
+        """Complète le catalogue de propriétés depuis le store local; retourne (trouvées, restantes)."""
+        found, remaining = self._local_entities(missing, ["labels", "claims", "datatype"], [language])
+        if not found:
+            return {}, missing
+        catalog.store(found, [language])
+        fetched, unresolved = catalog.lookup(list(found), language)
+        return fetched, remaining + unresolved
+
+    def get_entity_data(
+        self,
+        entity_id: str,
+        props: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+        stream: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """Récupère les données d'une entité.
+
+        Sans `props` ni `languages`: document complet via Special:EntityData/{id}.json
+        (labels/alias dans toutes les langues, tous les sitelinks: plusieurs Mo pour
+        les grosses entités). Sinon: wbgetentities filtré côté serveur, par ex.
+        `props=["labels", "descriptions", "claims"]`, `languages=["fr"]`.
+
+        `stream` (défaut: WIKIDATA_ENTITY_STREAMING) parse la réponse en flux.
+        Les requêtes filtrées par langue sont servies par le store local s'il existe.
+        """
         try:
             if not entity_id or not str(entity_id).strip():
                 return {"success": False, "error": "entity_id is required"}
 
             entity_id = str(entity_id).strip()
-            url = f"https://www.wikidata.org/wiki/Special:EntityData/{entity_id}.json"
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            entities = data.get("entities", {}) or {}
-            entity = entities.get(entity_id)
-            if not entity:
-                return {"success": False, "error": f"Entity '{entity_id}' not found"}
+            local, _ = self._local_entities([entity_id], props, languages)
+            if local:
+                return {"success": True, "entity": local[entity_id]}
 
-            return {"success": True, "entity": entity}
+            url, params = self._entity_request(entity_id, props, languages)
+            data = get_json(
+                url,
+                params=params,
+                headers=self.headers,
+                timeout=30,
+                cache="entity",
+                stream=self._entity_streaming(stream),
+            )
+            return self._parse_entity_data(entity_id, data)
         except Exception as e:
             logger.error(f"Error getting Wikidata entity data for {entity_id}: {e}")
             return {"success": False, "error": str(e)}
 
+    def _entity_data_url(self, entity_id: str) -> str:
+        return f"https://www.wikidata.org/wiki/Special:EntityData/{entity_id}.json"
+
+    def _entity_request(
+        self,
+        entity_id: str,
+        props: Optional[List[str]],
+        languages: Optional[List[str]],
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if not props and not languages:
+            return self._entity_data_url(entity_id), None
+        return self.api_url, self._entities_params([entity_id], props, languages)
+
+    def _entities_params(
+        self,
+        chunk: List[str],
+        props: Optional[List[str]],
+        languages: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        params = {
+            "action": "wbgetentities",
+            "ids": "|".join(chunk),
+            "props": "|".join(props or ENTITY_PROPS),
+            "format": "json",
+        }
+        if languages:
+            params["languages"] = "|".join(languages)
+        return params
+
+    def _entity_streaming(self, stream: Optional[bool]) -> bool:
+        return get_wikidata_config()["entity_streaming"] if stream is None else bool(stream)
+
+    def _parse_entity_data(self, entity_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        entities = data.get("entities", {}) or {}
+        entity = entities.get(entity_id)
+        if entity is None and len(entities) == 1:
+            # Entité redirigée (fusion): la réponse est indexée par l'identifiant cible
+            entity = next(iter(entities.values()))
+        if not entity or "missing" in entity:
+            return {"success": False, "error": f"Entity '{entity_id}' not found"}
+
+        return {"success": True, "entity": entity}
+
+    def get_entities(
+        self,
+        entity_ids: List[str],
+        props: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+        batch_size: int = 50,
+    ) -> Dict[str, Any]:
+        """Récupère plusieurs entités par lots (wbgetentities filtré par props/langues)."""
+        try:
+            if not entity_ids:
+                return {"success": True, "entities": {}, "failed_ids": []}
+
+            local, missing = self._local_entities(entity_ids, props, languages)
+            responses, failed_ids, error = self._fetch_batches(
+                missing, batch_size, lambda chunk: self._entities_params(chunk, props, languages), cache="entity"
+            )
+            return self._merge_entities(responses, failed_ids, error, local)
+        except Exception as e:
+            logger.error(f"Error getting Wikidata entities: {e}")
+            return {"success": False, "error": str(e)}
+
+    def _parse_entities(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            qid: entity
+            for qid, entity in (data.get("entities", {}) or {}).items()
+            if entity and "missing" not in entity
+        }
+
+    def _merge_entities(
+        self,
+        responses: List[Dict[str, Any]],
+        failed_ids: List[str],
+        error: Optional[str],
+        local: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        if failed_ids and not responses and not local:
+            return {"success": False, "error": error}
+
+        entities_out: Dict[str, Any] = dict(local or {})
+        for data in responses:
+            entities_out.update(self._parse_entities(data))
+        return {"success": True, "entities": entities_out, "failed_ids": failed_ids}
+
     def get_entities_labels(
         self,
         entity_ids: List[str],
@@ -282,65 +534,90 @@ class WikidataAPIService:
         """Récupère les labels/descriptions pour une liste d'entités (wbgetentities)."""
         try:
             if not entity_ids:
-                return {"success": True, "entities": {}}
-
-            entities_out: Dict[str, Any] = {}
-            for i in range(0, len(entity_ids), batch_size):
-                chunk = entity_ids[i : i + batch_size]
-                params = {
-                    "action": "wbgetentities",
-                    "ids": "|".join(chunk),
-                    "props": "labels|descriptions",
-                    "languages": language,
-                    "format": "json",
-                }
+                return {"success": True, "entities": {}, "failed_ids": []}
 
-                response = requests.get(
-                    self.api_url,
-                    params=params,
-                    headers=self.headers,
-                    timeout=30,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                for ent_id, ent in (data.get("entities", {}) or {}).items():
-                    label = (
-                        (ent.get("labels", {}) or {}).get(language, {}) or {}
-                    ).get("value")
-                    description = (
-                        (ent.get("descriptions", {}) or {}).get(language, {}) or {}
-                    ).get("value")
-
-                    entities_out[ent_id] = {
-                        "id": ent_id,
-                        "label": label,
-                        "description": description,
-                        "url": f"https://www.wikidata.org/wiki/{ent_id}",
-                    }
-
-            return {"success": True, "entities": entities_out}
+            entities_out, missing = self._local_labels(entity_ids, language)
+            responses, failed_ids, error = self._fetch_batches(
+                missing, batch_size, lambda chunk: self._labels_params(chunk, language), cache="labels"
+            )
+            if failed_ids and not responses and not entities_out:
+                return {"success": False, "error": error}
+
+            for data in responses:
+                entities_out.update(self._parse_labels(data, language))
+
+            return {"success": True, "entities": entities_out, "failed_ids": failed_ids}
         except Exception as e:
             logger.error(f"Error getting Wikidata labels: {e}")
             return {"success": False, "error": str(e)}
 
+    def _local_labels(self, entity_ids: List[str], language: str) -> Tuple[Dict[str, Any], List[str]]:
+        """Labels servis par le store local, et identifiants à demander à l'API."""
+        found, missing = self._local_entities(entity_ids, ["labels", "descriptions"], [language])
+        return self._parse_labels({"entities": found}, language), missing
+
+    def _labels_params(self, chunk: List[str], language: str) -> Dict[str, Any]:
+        return {
+            "action": "wbgetentities",
+            "ids": "|".join(chunk),
+            "props": "labels|descriptions",
+            "languages": language,
+            "format": "json",
+        }
+
+    def _parse_labels(self, data: Dict[str, Any], language: str) -> Dict[str, Any]:
+        entities_out: Dict[str, Any] = {}
+        for ent_id, ent in (data.get("entities", {}) or {}).items():
+            label = (
+                (ent.get("labels", {}) or {}).get(language, {}) or {}
+            ).get("value")
+            description = (
+                (ent.get("descriptions", {}) or {}).get(language, {}) or {}
+            ).get("value")
+
+            entities_out[ent_id] = {
+                "id": ent_id,
+                "label": label,
+                "description": description,
+                "url": f"https://www.wikidata.org/wiki/{ent_id}",
+            }
+        return entities_out
+
     def extract_linked_entities(
         self,
         entity: Dict[str, Any],
         max_entities: int = 200,
+        properties: Optional[Set[str]] = None,
+        exclude_properties: Optional[Set[str]] = None,
+        int_ids: bool = False,
     ) -> Dict[str, Any]:
-        """Extrait les entités Qxxx référencées dans les claims d'une entité."""
+        """Extrait les entités Qxxx référencées dans les claims d'une entité (un seul passage).
+
+        `properties` / `exclude_properties` limitent les propriétés suivies (ex: {"P31", "P279"}).
+
+        Retourne, en plus de `relations` et `linked_entity_ids`, `edges`: couples
+        `(propriété, entité)` limités aux entités retenues, dans l'ordre des claims, pour
+        les étapes suivantes (labels, parcours du graphe) sans relire les claims.
+        Avec `int_ids=True`, `linked_entity_ids` est un `array("L")` des numéros (Q42 -> 42)
+        et les entités de `edges` sont des entiers.
+        """
         try:
             claims = entity.get("claims", {}) or {}
 
-            linked: List[str] = []
+            # dict = ensemble ordonné: appartenance en O(1), ordre d'insertion conservé
+            linked: Dict[str, None] = {}
             relations: Dict[str, Any] = {}
+            edges: List[Tuple[str, Any]] = []
 
             for prop, statements in claims.items():
                 if not isinstance(statements, list):
                     continue
+                if properties is not None and prop not in properties:
+                    continue
+                if exclude_properties and prop in exclude_properties:
+                    continue
 
-                prop_entities: List[str] = []
+                prop_entities: Dict[str, None] = {}
                 for st in statements:
                     mainsnak = (st or {}).get("mainsnak", {}) or {}
                     datavalue = (mainsnak.get("datavalue") or {})
@@ -351,38 +628,259 @@ class WikidataAPIService:
                     if isinstance(value, dict) and value.get("entity-type") == "item":
                         qid = value.get("id")
                         if qid and qid.startswith("Q"):
-                            prop_entities.append(qid)
-
-                if prop_entities:
-                    # Dé-doublonnage tout en gardant un ordre stable
-                    seen = set()
-                    unique_prop_entities = []
-                    for qid in prop_entities:
-                        if qid in seen:
+                            prop_entities[qid] = None
+
+                if not prop_entities:
+                    continue
+
+                unique_prop_entities = list(prop_entities)
+                relations[prop] = {
+                    "property": prop,
+                    "linked_entities": unique_prop_entities,
+                    "count": len(unique_prop_entities),
+                }
+
+                full = len(linked) >= max_entities
+                for qid in unique_prop_entities:
+                    if qid not in linked:
+                        if full:
                             continue
-                        seen.add(qid)
-                        unique_prop_entities.append(qid)
-
-                    relations[prop] = {
-                        "property": prop,
-                        "linked_entities": unique_prop_entities,
-                        "count": len(unique_prop_entities),
-                    }
-
-                    for qid in unique_prop_entities:
-                        if qid not in linked:
-                            linked.append(qid)
-                            if len(linked) >= max_entities:
-                                break
-
-                if len(linked) >= max_entities:
+                        linked[qid] = None
+                        full = len(linked) >= max_entities
+                    edges.append((prop, int(qid[1:]) if int_ids else qid))
+
+                if full:
                     break
 
             return {
                 "success": True,
                 "relations": relations,
-                "linked_entity_ids": linked,
+                "linked_entity_ids": array("L", (int(qid[1:]) for qid in linked)) if int_ids else list(linked),
+                "edges": edges,
             }
         except Exception as e:
             logger.error(f"Error extracting linked entities: {e}")
             return {"success": False, "error": str(e)}
+
+
+class AsyncWikidataAPIService(WikidataAPIService):
+    """Version asyncio du service Wikidata (mêmes méthodes réseau, à utiliser avec `await`).
+
+    Les paramètres de requêtes et le parsing sont partagés avec `WikidataAPIService`;
+    les méthodes purement locales (`extract_sitelinks`, `extract_linked_entities`) restent synchrones.
+    """
+
+    async def search_entities(
+        self,
+        query: str,
+        language: str = "fr",
+        limit: int = 5,
+    ) -> Dict[str, Any]:
+        """Recherche des entités Wikidata (index de labels local, sinon wbsearchentities)."""
+        try:
+            local = self._local_search(query, language, limit)
+            if _is_exact(local):
+                return self._search_response(query, language, local, "local")
+
+            try:
+                data = await async_get_json(
+                    self.api_url,
+                    params=self._search_params(query, language, limit),
+                    headers=self.headers,
+                    timeout=30,
+                    cache="search",
+                )
+            except Exception as e:
+                if not local:
+                    raise
+                logger.warning(f"wbsearchentities unavailable, using local prefix matches: {e}")
+                return self._search_response(query, language, local, "local")
+            return self._merge_search(self._parse_search(query, language, data), local, limit)
+        except Exception as e:
+            logger.error(f"Error searching Wikidata entities: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def _fetch_batches(
+        self,
+        ids: List[str],
+        batch_size: int,
+        params_for: Callable[[List[str]], Dict[str, Any]],
+        cache: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[str], Optional[str]]:
+        """Version asyncio de `_fetch_batches`: lots envoyés en parallèle (WIKIDATA_BATCH_CONCURRENCY).
+
+        `on_progress(lots terminés, nombre de lots)` est appelé à la fin de chaque lot.
+        """
+        config = get_wikidata_config()
+        chunks = list(_chunks(ids, batch_size))
+        completed = 0
+
+        async def fetch(chunk: List[str]) -> Dict[str, Any]:
+            nonlocal completed
+            try:
+                return await async_get_json(
+                    self.api_url, params=params_for(chunk), headers=self.headers, timeout=30, cache=cache
+                )
+            finally:
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed, len(chunks))
+
+        results = await fan_out(chunks, fetch, max_concurrency=max_concurrency or config["batch_concurrency"])
+
+        responses: List[Dict[str, Any]] = []
+        failed_ids: List[str] = []
+        error = None
+        for chunk, data in zip(chunks, results):
+            batch_error = str(data) if isinstance(data, Exception) else _api_error(data)
+            if batch_error is not None:
+                error = batch_error
+                logger.warning(f"Wikidata batch failed ({len(chunk)} ids): {error}")
+                failed_ids.extend(chunk)
+                continue
+            responses.append(data)
+
+        return responses, failed_ids, error
+
+    async def get_properties_metadata(
+        self,
+        property_ids: List[str],
+        language: str = "fr",
+        batch_size: int = 50,
+    ) -> Dict[str, Any]:
+        """Récupère les métadonnées des propriétés (labels + formatter URL P1630)."""
+        try:
+            if not property_ids:
+                return {"success": True, "properties": {}}
+
+            # Catalogue local d'abord: seuls les PIDs inconnus (ou sans label dans la langue) partent sur le réseau
+            catalog = get_property_catalog()
+            properties_out, missing = catalog.lookup(property_ids, language)
+            local, missing = self._local_properties(catalog, missing, language)
+            properties_out.update(local)
+            responses, failed_ids, error = await self._fetch_batches(
+                missing, batch_size, lambda chunk: self._properties_params(chunk, language)
+            )
+            return self._merge_properties(catalog, properties_out, missing, language, responses, failed_ids, error)
+        except Exception as e:
+            logger.error(f"Error getting Wikidata properties metadata: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def extract_external_identifiers(
+        self,
+        entity: Dict[str, Any],
+        language: str = "fr",
+        max_properties: int = 200,
+        max_values_per_property: int = 5,
+    ) -> Dict[str, Any]:
+        """Extrait des identifiants externes et construit des URLs via formatter URL (P1630)."""
+        try:
+            claims = entity.get("claims", {}) or {}
+            property_ids = list(claims.keys())[:max_properties]
+
+            prop_meta_resp = await self.get_properties_metadata(property_ids, language=language)
+            if not prop_meta_resp.get("success"):
+                return prop_meta_resp
+
+            return self._build_identifiers(
+                claims,
+                property_ids,
+                prop_meta_resp.get("properties", {}),
+                max_values_per_property,
+            )
+        except Exception as e:
+            logger.error(f"Error extracting external identifiers: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def get_entity_data(
+        self,
+        entity_id: str,
+        props: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+        stream: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """Récupère les données d'une entité (voir `WikidataAPIService.get_entity_data`)."""
+        try:
+            if not entity_id or not str(entity_id).strip():
+                return {"success": False, "error": "entity_id is required"}
+
+            entity_id = str(entity_id).strip()
+            local, _ = self._local_entities([entity_id], props, languages)
+            if local:
+                return {"success": True, "entity": local[entity_id]}
+
+            url, params = self._entity_request(entity_id, props, languages)
+            data = await async_get_json(
+                url,
+                params=params,
+                headers=self.headers,
+                timeout=30,
+                cache="entity",
+                stream=self._entity_streaming(stream),
+            )
+            return self._parse_entity_data(entity_id, data)
+        except Exception as e:
+            logger.error(f"Error getting Wikidata entity data for {entity_id}: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def get_entities(
+        self,
+        entity_ids: List[str],
+        props: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+        batch_size: int = 50,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Récupère plusieurs entités par lots de `batch_size`, lots envoyés en parallèle."""
+        try:
+            if not entity_ids:
+                return {"success": True, "entities": {}, "failed_ids": []}
+
+            local, missing = self._local_entities(entity_ids, props, languages)
+            responses, failed_ids, error = await self._fetch_batches(
+                missing,
+                batch_size,
+                lambda chunk: self._entities_params(chunk, props, languages),
+                cache="entity",
+                max_concurrency=max_concurrency,
+            )
+            return self._merge_entities(responses, failed_ids, error, local)
+        except Exception as e:
+            logger.error(f"Error getting Wikidata entities: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def get_entities_labels(
+        self,
+        entity_ids: List[str],
+        language: str = "fr",
+        batch_size: int = 50,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """Récupère les labels/descriptions pour une liste d'entités (wbgetentities).
+
+        `on_progress(lots terminés, nombre de lots)` permet de suivre l'avancement.
+        """
+        try:
+            if not entity_ids:
+                return {"success": True, "entities": {}, "failed_ids": []}
+
+            entities_out, missing = self._local_labels(entity_ids, language)
+            responses, failed_ids, error = await self._fetch_batches(
+                missing,
+                batch_size,
+                lambda chunk: self._labels_params(chunk, language),
+                cache="labels",
+                on_progress=on_progress,
+            )
+            if failed_ids and not responses and not entities_out:
+                return {"success": False, "error": error}
+
+            for data in responses:
+                entities_out.update(self._parse_labels(data, language))
+
+            return {"success": True, "entities": entities_out, "failed_ids": failed_ids}
+        except Exception as e:
+            logger.error(f"Error getting Wikidata labels: {e}")
+            return {"success": False, "error": str(e)}
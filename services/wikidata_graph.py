@@ -0,0 +1,168 @@
+"""Multi-hop Wikidata relation graph (BFS over claims, batched frontier expansion)"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Blocs nécessaires pour développer un nœud: ses termes et ses relations
+GRAPH_ENTITY_PROPS = ["labels", "descriptions", "claims"]
+
+
+class RelationGraph:
+    """Graphe compact: nœuds et propriétés indexés, arêtes `[source, propriété, cible]`."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.levels: List[int] = []
+        self.labels: List[Optional[str]] = []
+        self.descriptions: List[Optional[str]] = []
+        self.properties: List[str] = []
+        self.edges: List[List[int]] = []
+        self._nodes: Dict[str, int] = {}
+        self._props: Dict[str, int] = {}
+
+    def __contains__(self, qid: str) -> bool:
+        return qid in self._nodes
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add_node(self, qid: str, level: int) -> int:
+        index = self._nodes.get(qid)
+        if index is None:
+            index = self._nodes[qid] = len(self.ids)
+            self.ids.append(qid)
+            self.levels.append(level)
+            self.labels.append(None)
+            self.descriptions.append(None)
+        return index
+
+    def add_edge(self, source: str, prop: str, target: str) -> None:
+        prop_index = self._props.get(prop)
+        if prop_index is None:
+            prop_index = self._props[prop] = len(self.properties)
+            self.properties.append(prop)
+        self.edges.append([self._nodes[source], prop_index, self._nodes[target]])
+
+    def set_terms(self, qid: str, label: Optional[str], description: Optional[str]) -> None:
+        index = self._nodes.get(qid)
+        if index is not None:
+            self.labels[index] = label
+            self.descriptions[index] = description
+
+    def to_dict(self, property_labels: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        property_labels = property_labels or {}
+        return {
+            "nodes_count": len(self.ids),
+            "edges_count": len(self.edges),
+            "nodes": {
+                "ids": self.ids,
+                "labels": self.labels,
+                "descriptions": self.descriptions,
+                "levels": self.levels,
+            },
+            "properties": {
+                "ids": self.properties,
+                "labels": [(property_labels.get(pid) or {}).get("label") for pid in self.properties],
+            },
+            "edges": self.edges,
+        }
+
+
+def _term(entity: Dict[str, Any], key: str, language: str) -> Optional[str]:
+    return (((entity.get(key, {}) or {}).get(language, {}) or {}).get("value"))
+
+
+async def crawl_relation_graph(
+    service,
+    root_id: str,
+    language: str = "fr",
+    depth: int = 2,
+    max_nodes_per_level: int = 100,
+    max_links_per_node: int = 50,
+    properties: Optional[Set[str]] = None,
+    exclude_properties: Optional[Set[str]] = None,
+    on_level: Optional[Callable[[int, int, int], None]] = None,
+) -> Dict[str, Any]:
+    """Parcours en largeur du graphe de relations à partir de `root_id`.
+
+    Chaque niveau est récupéré en lots wbgetentities envoyés en parallèle
+    (`service.get_entities`), chaque entité n'est visitée qu'une fois, et au plus
+    `max_nodes_per_level` nouveaux nœuds sont retenus par niveau. Les arêtes vers des
+    nœuds hors budget sont comptées dans `truncated_edges`.
+
+    Args:
+        service: Instance de `AsyncWikidataAPIService`
+        on_level: Appelé après chaque niveau avec (niveau, nœuds au total, nœuds du nouveau niveau)
+    """
+    graph = RelationGraph()
+    graph.add_node(root_id, 0)
+
+    frontier = [root_id]
+    failed_ids: List[str] = []
+    truncated_edges = 0
+
+    for level in range(1, depth + 1):
+        resp = await service.get_entities(frontier, props=GRAPH_ENTITY_PROPS, languages=[language])
+        if not resp.get("success"):
+            if level == 1:
+                return resp
+            logger.warning(f"Wikidata graph expansion stopped at level {level}: {resp.get('error')}")
+            break
+
+        entities = resp.get("entities", {})
+        failed_ids.extend(resp.get("failed_ids", []))
+        if level == 1 and root_id not in entities:
+            return {"success": False, "error": f"Entity '{root_id}' not found"}
+
+        next_frontier: List[str] = []
+        for qid in frontier:
+            entity = entities.get(qid)
+            if entity is None:
+                continue
+            graph.set_terms(qid, _term(entity, "labels", language), _term(entity, "descriptions", language))
+
+            extracted = service.extract_linked_entities(
+                entity,
+                max_entities=max_links_per_node,
+                properties=properties,
+                exclude_properties=exclude_properties,
+            )
+            if not extracted.get("success"):
+                continue
+
+            for prop, target in extracted.get("edges", []):
+                if target not in graph:
+                    if len(next_frontier) >= max_nodes_per_level:
+                        truncated_edges += 1
+                        continue
+                    graph.add_node(target, level)
+                    next_frontier.append(target)
+                graph.add_edge(qid, prop, target)
+
+        frontier = next_frontier
+        if on_level is not None:
+            on_level(level, len(graph), len(frontier))
+        if not frontier:
+            break
+
+    # Les nœuds du dernier niveau ne sont pas développés: seuls leurs labels sont nécessaires
+    labels_resp, props_resp = await asyncio.gather(
+        service.get_entities_labels(frontier, language=language),
+        service.get_properties_metadata(graph.properties, language=language),
+    )
+    if labels_resp.get("success"):
+        for qid, info in labels_resp.get("entities", {}).items():
+            graph.set_terms(qid, info.get("label"), info.get("description"))
+
+    return {
+        "success": True,
+        "root": root_id,
+        "language": language,
+        "depth": depth,
+        **graph.to_dict(props_resp.get("properties", {}) if props_resp.get("success") else {}),
+        "truncated_edges": truncated_edges,
+        "failed_ids": failed_ids,
+    }
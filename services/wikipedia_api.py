@@ -1,147 +1,401 @@
 """Wikipedia API service for fetching pages and statistics"""
 
+import asyncio
+import heapq
 import logging
-import requests
+import time
+import httpx
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Any, Optional
 from bs4 import BeautifulSoup
 from config.settings import get_wikipedia_config, get_headers
+from services.fanout import fan_out
+from services.http_client import UpstreamUnavailableError, get_json, async_get_json
+from services.link_graph import get_link_graph
+from services.pageviews_stats import PageviewsSeries, compute_statistics, plan_pageviews_requests, stats_windows
 
 logger = logging.getLogger(__name__)
 
+# Limite de l'API MediaWiki pour `titles=A|B|C` (utilisateurs non-bot)
+MAX_TITLES_PER_QUERY = 50
+MAX_REDIRECT_HOPS = 5
+
+
+def _unique_titles(titles: List[str]) -> List[str]:
+    seen = set()
+    out = []
+    for title in titles or []:
+        if not title or title in seen:
+            continue
+        seen.add(title)
+        out.append(title)
+    return out
+
+
+def _chunks(items: List[Any], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class _InternalLinksCollector:
+    """Accumule les pages de résultats `prop=links` (pagination plcontinue) d'une page"""
+
+    def __init__(self, language: str, page_title: str, max_links: int):
+        self.language = language
+        self.page_title = page_title
+        self.max_links = max_links
+        self.internal_links: List[Dict[str, Any]] = []
+        self.seen_titles = set()
+        self.plcontinue = None
+        self.page_id = None
+        self.title = page_title
+        self.partial = False
+        self.missing = False
+        self.done = False
+        self.source = "api"
+
+    def params(self) -> Dict[str, Any]:
+        params = {
+            "action": "query",
+            "titles": self.page_title,
+            "prop": "links",
+            "plnamespace": 0,
+            "pllimit": "max",
+            "format": "json",
+        }
+        if self.plcontinue:
+            params["plcontinue"] = self.plcontinue
+        return params
+
+    def feed(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Intègre une page de résultats et retourne les nouveaux liens"""
+        pages = data.get("query", {}).get("pages", {}) or {}
+        if not pages:
+            self.missing = True
+            self.done = True
+            return []
+
+        page = list(pages.values())[0]
+        if page.get("missing") is not None:
+            self.missing = True
+            self.done = True
+            return []
+
+        self.page_id = page.get("pageid")
+        self.title = page.get("title") or self.title
+
+        new_links = self.add_titles((l or {}).get("title") for l in page.get("links", []) or [])
+        if self.done:
+            return new_links
+
+        cont = data.get("continue", {}) or {}
+        self.plcontinue = cont.get("plcontinue")
+        if not self.plcontinue:
+            self.done = True
+
+        return new_links
+
+    def add_titles(self, titles: Iterable[Optional[str]]) -> List[Dict[str, Any]]:
+        """Ajoute des titres de pages liées (dédoublonnés) et retourne les nouveaux liens"""
+        new_links = []
+        for linked_title in titles:
+            if not linked_title:
+                continue
+            if linked_title in self.seen_titles:
+                continue
+            self.seen_titles.add(linked_title)
+            link = {
+                "anchor_text": linked_title,
+                "linked_page_title": linked_title,
+                "url": f"https://{self.language}.wikipedia.org/wiki/{linked_title.replace(' ', '_')}"
+            }
+            self.internal_links.append(link)
+            new_links.append(link)
+
+            if len(self.internal_links) >= self.max_links:
+                self.partial = True
+                break
+
+        if len(self.internal_links) >= self.max_links:
+            self.done = True
+        return new_links
+
+    def not_found(self) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": f"Page '{self.page_title}' not found"
+        }
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "page_title": self.title,
+            "page_id": self.page_id,
+            "total_internal_links": len(self.internal_links),
+            "internal_links": self.internal_links,
+            "partial": self.partial,
+            "max_links": self.max_links,
+            "source": self.source,
+        }
+
+
+class _TopViews:
+    """Top-K des pages par vues: tas min de taille K, O(log K) par page"""
+
+    def __init__(self, top: int):
+        self.top = max(1, top)
+        self.heap: List[tuple] = []
+        self.ranked = 0
+        self.failed: List[Dict[str, Any]] = []
+
+    def add(self, index: int, title: str, views: Dict[str, Any]) -> None:
+        if not views.get("success"):
+            self.failed.append({"title": title, "error": views.get("error", "Unknown error")})
+            return
+        self.ranked += 1
+        # À vues égales, la page la plus tôt dans la liste l'emporte
+        entry = (views.get("total_views", 0), -index, title)
+        if len(self.heap) < self.top:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"rank": rank, "title": title, "views": total}
+            for rank, (total, _, title) in enumerate(sorted(self.heap, reverse=True), start=1)
+        ]
+
+    def result(self, total_pages: int, start_date: str, end_date: str) -> Dict[str, Any]:
+        processed = self.ranked + len(self.failed)
+        return {
+            "success": True,
+            "start_date": start_date,
+            "end_date": end_date,
+            "top": self.snapshot(),
+            "total_pages": total_pages,
+            "ranked_pages": self.ranked,
+            "failed_pages": self.failed,
+            # False: budget de temps atteint, classement approché sur les pages déjà traitées
+            "complete": processed == total_pages,
+        }
+
+
 class WikipediaAPIService:
     """Service pour interagir avec les APIs Wikipedia et Pageviews"""
-    
+
     def __init__(self, language: str = "en"):
         self.config = get_wikipedia_config()
         self.language = language
         self.api_url = f"https://{language}.wikipedia.org/w/api.php"
         self.pageviews_api_url = self.config["pageviews_api_url"]
         self.headers = get_headers()
-    
+
     def search_pages(self, keyword: str, limit: int = 20) -> Dict[str, Any]:
         """
         Recherche des pages Wikipedia liées à un mot-clé
-        
+
         Args:
             keyword: Le terme de recherche
             limit: Nombre maximum de résultats
-            
+
         Returns:
             Dictionnaire avec les résultats de recherche
         """
         try:
-            params = {
-                "action": "opensearch",
-                "search": keyword,
-                "limit": limit,
-                "namespace": 0,  # Articles principaux uniquement
-                "format": "json"
-            }
-            
-            response = requests.get(
+            data = get_json(
                 self.api_url,
-                params=params,
+                params=self._search_params(keyword, limit),
                 headers=self.headers,
-                timeout=30
+                timeout=30,
+                cache="search"
             )
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Format OpenSearch: [query, [titles], [descriptions], [urls]]
-            if len(data) >= 4:
-                titles = data[1]
-                descriptions = data[2]
-                urls = data[3]
-                
-                results = []
-                for i in range(len(titles)):
-                    results.append({
-                        "title": titles[i],
-                        "description": descriptions[i] if i < len(descriptions) else "",
-                        "url": urls[i] if i < len(urls) else "",
-                        "page_name": titles[i].replace(" ", "_")
-                    })
-                
-                return {
-                    "success": True,
-                    "keyword": keyword,
-                    "language": self.language,
-                    "total_results": len(results),
-                    "results": results
-                }
-            
-            return {
-                "success": False,
-                "error": "Invalid response format from Wikipedia API"
-            }
-            
+
+            return self._parse_search_results(keyword, data)
+
         except Exception as e:
             logger.error(f"Error searching Wikipedia pages: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
-    
+
+    def _search_params(self, keyword: str, limit: int) -> Dict[str, Any]:
+        return {
+            "action": "opensearch",
+            "search": keyword,
+            "limit": limit,
+            "namespace": 0,  # Articles principaux uniquement
+            "format": "json"
+        }
+
+    def _parse_search_results(self, keyword: str, data: Any) -> Dict[str, Any]:
+        # Format OpenSearch: [query, [titles], [descriptions], [urls]]
+        if len(data) >= 4:
+            titles = data[1]
+            descriptions = data[2]
+            urls = data[3]
+
+            results = []
+            for i in range(len(titles)):
+                results.append({
+                    "title": titles[i],
+                    "description": descriptions[i] if i < len(descriptions) else "",
+                    "url": urls[i] if i < len(urls) else "",
+                    "page_name": titles[i].replace(" ", "_")
+                })
+
+            return {
+                "success": True,
+                "keyword": keyword,
+                "language": self.language,
+                "total_results": len(results),
+                "results": results
+            }
+
+        return {
+            "success": False,
+            "error": "Invalid response format from Wikipedia API"
+        }
+
     def get_page_info(self, page_title: str) -> Dict[str, Any]:
         """
         Récupère les informations détaillées d'une page Wikipedia
-        
+
         Args:
             page_title: Titre de la page
-            
+
         Returns:
             Informations sur la page
         """
         try:
-            params = {
-                "action": "query",
-                "titles": page_title,
-                "prop": "info|pageprops",
-                "inprop": "url|created",
-                "format": "json"
-            }
-            
-            response = requests.get(
+            data = get_json(
                 self.api_url,
-                params=params,
+                params=self._page_info_params(page_title),
                 headers=self.headers,
-                timeout=30
+                timeout=30,
+                cache="page_info"
             )
-            response.raise_for_status()
-            
-            data = response.json()
-            pages = data.get("query", {}).get("pages", {})
-            
-            if pages:
-                page = list(pages.values())[0]
-                
-                # Extraire les informations
-                page_info = {
-                    "page_id": page.get("pageid"),
-                    "title": page.get("title"),
-                    "url": page.get("fullurl"),
-                    "created": page.get("touched", "Unknown")
-                }
-                
-                # Parser la date de création si disponible
-                if "touched" in page:
-                    try:
-                        touched = page["touched"]
-                        created_date = datetime.strptime(touched, "%Y-%m-%dT%H:%M:%SZ")
-                        page_info["created_formatted"] = created_date.strftime("%B %d, %Y")
-                    except:
-                        page_info["created_formatted"] = "Unknown"
-                
-                return page_info
-            
-            return None
-            
+
+            return self._parse_page_info(data)
+
+        except UpstreamUnavailableError:
+            # Indisponibilité temporaire: ne pas la confondre avec une page absente
+            raise
         except Exception as e:
             logger.error(f"Error getting page info: {e}")
             return None
-    
+
+    def _page_info_params(self, page_title: str) -> Dict[str, Any]:
+        return {
+            "action": "query",
+            "titles": page_title,
+            "prop": "info|pageprops",
+            "inprop": "url|created",
+            "format": "json"
+        }
+
+    def _parse_page_info(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        pages = data.get("query", {}).get("pages", {})
+
+        if pages:
+            return self._page_info_from_page(list(pages.values())[0])
+
+        return None
+
+    def _page_info_from_page(self, page: Dict[str, Any]) -> Dict[str, Any]:
+        # Extraire les informations
+        page_info = {
+            "page_id": page.get("pageid"),
+            "title": page.get("title"),
+            "url": page.get("fullurl"),
+            "created": page.get("touched", "Unknown")
+        }
+
+        # Parser la date de création si disponible
+        if "touched" in page:
+            try:
+                touched = page["touched"]
+                created_date = datetime.strptime(touched, "%Y-%m-%dT%H:%M:%SZ")
+                page_info["created_formatted"] = created_date.strftime("%B %d, %Y")
+            except:
+                page_info["created_formatted"] = "Unknown"
+
+        return page_info
+
+    def get_pages_info(
+        self,
+        page_titles: List[str],
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Récupère les informations de plusieurs pages en lots (`titles=A|B|C`)
+
+        Coûte ceil(N / 50) requêtes au lieu de N appels à `get_page_info`.
+
+        Args:
+            page_titles: Titres des pages
+            errors: Complété avec titre -> erreur pour les lots dont l'API était
+                indisponible (maxlag, 429, 503), à distinguer des pages absentes
+
+        Returns:
+            Dictionnaire titre demandé -> informations (None si la page n'existe pas)
+        """
+        titles = _unique_titles(page_titles)
+        pages_info: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        for chunk in _chunks(titles, MAX_TITLES_PER_QUERY):
+            try:
+                data = get_json(
+                    self.api_url,
+                    params=self._pages_info_params(chunk),
+                    headers=self.headers,
+                    timeout=30,
+                    cache="page_info"
+                )
+                pages_info.update(self._parse_pages_info(chunk, data))
+            except Exception as e:
+                logger.error(f"Error getting pages info: {e}")
+                pages_info.update({title: None for title in chunk})
+                if errors is not None and isinstance(e, UpstreamUnavailableError):
+                    errors.update({title: str(e) for title in chunk})
+
+        return pages_info
+
+    def _pages_info_params(self, titles: List[str]) -> Dict[str, Any]:
+        params = self._page_info_params("|".join(titles))
+        params["redirects"] = 1
+        return params
+
+    def _parse_pages_info(
+        self,
+        titles: List[str],
+        data: Dict[str, Any]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Associe chaque titre demandé à sa page (après normalisation et redirections)"""
+        query = data.get("query", {}) or {}
+        normalized = {n.get("from"): n.get("to") for n in query.get("normalized", []) or []}
+        redirects = {r.get("from"): r.get("to") for r in query.get("redirects", []) or []}
+
+        pages_by_title = {}
+        for page in (query.get("pages", {}) or {}).values():
+            if page.get("missing") is not None or page.get("invalid") is not None:
+                continue
+            pages_by_title[page.get("title")] = page
+
+        out: Dict[str, Optional[Dict[str, Any]]] = {}
+        for title in titles:
+            resolved = normalized.get(title, title)
+            # Une redirection peut elle-même pointer vers une redirection
+            for _ in range(MAX_REDIRECT_HOPS):
+                if resolved not in redirects:
+                    break
+                resolved = redirects[resolved]
+
+            page = pages_by_title.get(resolved)
+            out[title] = self._page_info_from_page(page) if page else None
+        return out
+
     def get_pageviews(
         self,
         page_title: str,
@@ -151,266 +405,772 @@ class WikipediaAPIService:
     ) -> Dict[str, Any]:
         """
         Récupère les statistiques de vues pour une page
-        
+
         Args:
             page_title: Titre de la page
             start_date: Date de début (YYYYMMDD)
             end_date: Date de fin (YYYYMMDD)
             granularity: daily ou monthly
-            
+
         Returns:
             Statistiques de vues
         """
         try:
-            # Dates par défaut: 1 an
-            if not end_date:
-                end_date = datetime.now().strftime("%Y%m%d")
-            if not start_date:
-                start = datetime.now() - timedelta(days=365)
-                start_date = start.strftime("%Y%m%d")
-            
-            # Nettoyer le titre pour l'URL
-            page_title_encoded = page_title.replace(" ", "_")
-            
-            url = f"{self.pageviews_api_url}/metrics/pageviews/per-article/{self.language}.wikipedia/all-access/all-agents/{page_title_encoded}/{granularity}/{start_date}/{end_date}"
-            
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=30
-            )
-            
-            if response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "Page not found in pageviews data"
-                }
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            items = data.get("items", [])
-            
-            if not items:
-                return {
-                    "success": True,
-                    "page_title": page_title,
-                    "total_views": 0,
-                    "data_points": 0,
-                    "views": []
-                }
-            
-            # Calculer les statistiques
-            total_views = sum(item.get("views", 0) for item in items)
-            
-            return {
-                "success": True,
-                "page_title": page_title,
-                "total_views": total_views,
-                "data_points": len(items),
-                "start_date": start_date,
-                "end_date": end_date,
-                "granularity": granularity,
-                "views": items
-            }
-            
+            start_date, end_date = self._default_pageviews_range(start_date, end_date)
+            url = self._pageviews_url(page_title, start_date, end_date, granularity)
+
+            try:
+                data = get_json(
+                    url,
+                    headers=self.headers,
+                    timeout=30,
+                    cache="pageviews"
+                )
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return {
+                        "success": False,
+                        "error": "Page not found in pageviews data"
+                    }
+                raise
+
+            return self._parse_pageviews(page_title, data, start_date, end_date, granularity)
+
         except Exception as e:
             logger.error(f"Error getting pageviews for {page_title}: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
-    
-    def get_comprehensive_stats(self, page_title: str) -> Dict[str, Any]:
+
+    def get_pageviews_series(self, page_title: str, windows: Dict[str, tuple]) -> PageviewsSeries:
+        """
+        Série de vues couvrant les fenêtres de statistiques, par requêtes daily/monthly planifiées
+
+        Args:
+            page_title: Titre de la page
+            windows: Fenêtres (début, fin) YYYYMMDD, cf. `stats_windows`
+
+        Returns:
+            Série compacte (vide pour les plages sans données Pageviews)
+        """
+        segments = [
+            (granularity, self.get_pageviews(page_title, start, end, granularity))
+            for granularity, start, end in plan_pageviews_requests(windows)
+        ]
+        return self._series_from_segments(segments)
+
+    def _series_from_segments(self, segments: List[tuple]) -> PageviewsSeries:
+        # Une plage sans données Pageviews (page récente, 404) ne compte simplement pas
+        return PageviewsSeries.from_segments([
+            (granularity, views.get("views", []))
+            for granularity, views in segments
+            if views.get("success")
+        ])
+
+    def _default_pageviews_range(self, start_date: Optional[str], end_date: Optional[str]):
+        # Dates par défaut: 1 an
+        if not end_date:
+            end_date = datetime.now().strftime("%Y%m%d")
+        if not start_date:
+            start = datetime.now() - timedelta(days=365)
+            start_date = start.strftime("%Y%m%d")
+        return start_date, end_date
+
+    def _pageviews_url(self, page_title: str, start_date: str, end_date: str, granularity: str) -> str:
+        # Nettoyer le titre pour l'URL
+        page_title_encoded = page_title.replace(" ", "_")
+
+        return f"{self.pageviews_api_url}/metrics/pageviews/per-article/{self.language}.wikipedia/all-access/all-agents/{page_title_encoded}/{granularity}/{start_date}/{end_date}"
+
+    def _parse_pageviews(
+        self,
+        page_title: str,
+        data: Dict[str, Any],
+        start_date: str,
+        end_date: str,
+        granularity: str
+    ) -> Dict[str, Any]:
+        items = data.get("items", [])
+
+        if not items:
+            return {
+                "success": True,
+                "page_title": page_title,
+                "total_views": 0,
+                "data_points": 0,
+                "views": []
+            }
+
+        # Calculer les statistiques
+        total_views = sum(item.get("views", 0) for item in items)
+
+        return {
+            "success": True,
+            "page_title": page_title,
+            "total_views": total_views,
+            "data_points": len(items),
+            "start_date": start_date,
+            "end_date": end_date,
+            "granularity": granularity,
+            "views": items
+        }
+
+    def get_comprehensive_stats(
+        self,
+        page_title: str,
+        page_info: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Récupère toutes les statistiques pour une page (comme detailed.com)
-        
+
+        Toutes les fenêtres (dernier mois, année passée, mois en cours, même mois
+        l'an dernier) sont calculées à partir d'une seule série: jours aux bords des
+        fenêtres, mois entiers ailleurs (`plan_pageviews_requests`).
+
         Args:
             page_title: Titre de la page
-            
+            page_info: Informations déjà récupérées (ex: via `get_pages_info`), évite un appel
+
         Returns:
             Statistiques complètes
         """
         try:
             # Obtenir les infos de base
-            page_info = self.get_page_info(page_title)
-            
+            if page_info is None:
+                page_info = self.get_page_info(page_title)
+
             if not page_info:
                 return {
                     "success": False,
                     "error": f"Page '{page_title}' not found"
                 }
-            
-            # Dates pour les différentes périodes
-            now = datetime.now()
-            
-            # Dernier mois (30 jours)
-            past_month_start = (now - timedelta(days=30)).strftime("%Y%m%d")
-            past_month_end = now.strftime("%Y%m%d")
-            
-            # Année dernière (365 jours)
-            past_year_start = (now - timedelta(days=365)).strftime("%Y%m%d")
-            past_year_end = now.strftime("%Y%m%d")
-            
-            # Mois en cours
-            current_month_start = now.replace(day=1).strftime("%Y%m%d")
-            current_month_end = now.strftime("%Y%m%d")
-            
-            # Même mois année dernière
-            last_year_same_month_start = (now.replace(day=1) - timedelta(days=365)).strftime("%Y%m%d")
-            last_year_same_month_end = (now - timedelta(days=365)).strftime("%Y%m%d")
-            
-            # Récupérer les stats
-            past_month_views = self.get_pageviews(page_title, past_month_start, past_month_end)
-            past_year_views = self.get_pageviews(page_title, past_year_start, past_year_end)
-            current_month_views = self.get_pageviews(page_title, current_month_start, current_month_end)
-            last_year_month_views = self.get_pageviews(page_title, last_year_same_month_start, last_year_same_month_end)
-            
-            # Calculer les moyennes quotidiennes
-            days_in_current_month = (now - now.replace(day=1)).days + 1
-            daily_views_current = (
-                current_month_views.get("total_views", 0) / days_in_current_month
-                if days_in_current_month > 0 else 0
-            )
-            
-            days_in_last_year_month = (
-                datetime.strptime(last_year_same_month_end, "%Y%m%d") -
-                datetime.strptime(last_year_same_month_start, "%Y%m%d")
-            ).days + 1
-            daily_views_last_year = (
-                last_year_month_views.get("total_views", 0) / days_in_last_year_month
-                if days_in_last_year_month > 0 else 0
-            )
-            
-            # Calculer le changement YoY
-            if daily_views_last_year > 0:
-                yoy_change = ((daily_views_current - daily_views_last_year) / daily_views_last_year) * 100
-            else:
-                yoy_change = 0 if daily_views_current == 0 else 100
-            
+
+            windows = stats_windows(datetime.now())
+            series = self.get_pageviews_series(page_title, windows)
+
+            return self._build_comprehensive_stats(page_info, windows, series)
+
+        except Exception as e:
+            logger.error(f"Error getting comprehensive stats: {e}")
             return {
-                "success": True,
-                "page_info": page_info,
-                "statistics": {
-                    "past_month_total_views": past_month_views.get("total_views", 0),
-                    "past_year_total_views": past_year_views.get("total_views", 0),
-                    "daily_views_current_month": round(daily_views_current),
-                    "daily_views_last_year_same_month": round(daily_views_last_year),
-                    "yoy_change_percent": round(yoy_change, 1)
-                }
+                "success": False,
+                "error": str(e)
             }
-            
+
+    def _build_comprehensive_stats(
+        self,
+        page_info: Dict[str, Any],
+        windows: Dict[str, tuple],
+        series: PageviewsSeries
+    ) -> Dict[str, Any]:
+        # Une page sans données Pageviews garde des statistiques à 0
+        return {
+            "success": True,
+            "page_info": page_info,
+            "statistics": compute_statistics(series, windows)
+        }
+
+    def get_comprehensive_stats_bulk(self, page_titles: List[str]) -> List[Dict[str, Any]]:
+        """
+        Statistiques complètes de plusieurs pages, dans l'ordre des titres demandés
+
+        Les infos de pages sont récupérées en lots (`get_pages_info`), puis une
+        série de vues par page.
+
+        Args:
+            page_titles: Titres des pages
+
+        Returns:
+            Liste de résultats de `get_comprehensive_stats` (un par titre)
+        """
+        errors: Dict[str, str] = {}
+        pages_info = self.get_pages_info(page_titles, errors)
+        return [
+            self._stats_for_page(title, pages_info.get(title), errors.get(title))
+            for title in page_titles
+        ]
+
+    def get_daily_views_bulk(self, page_titles: List[str], start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """
+        Séries quotidiennes de vues de plusieurs pages, dans l'ordre des titres demandés
+
+        Args:
+            page_titles: Titres des pages
+            start_date: Date de début (YYYYMMDD)
+            end_date: Date de fin (YYYYMMDD)
+
+        Returns:
+            Liste de résultats de `get_pageviews` (un par titre)
+        """
+        return [self.get_pageviews(title, start_date, end_date) for title in page_titles]
+
+    def top_pages_by_views(
+        self,
+        page_titles: List[str],
+        start_date: str,
+        end_date: str,
+        top: int = 20,
+        time_budget: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Classe des pages par vues sur une période, en ne gardant que les `top` premières (tas)
+
+        Args:
+            page_titles: Titres des pages
+            start_date: Date de début (YYYYMMDD)
+            end_date: Date de fin (YYYYMMDD)
+            top: Nombre de pages retenues
+            time_budget: Durée max en secondes; une fois atteinte, le classement est
+                rendu sur les pages déjà traitées (`complete: False`)
+
+        Returns:
+            Classement (`top`), nombre de pages classées et en échec
+        """
+        ranking = _TopViews(top)
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+        for index, title in enumerate(page_titles):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            ranking.add(index, title, self.get_pageviews(title, start_date, end_date))
+
+        return ranking.result(len(page_titles), start_date, end_date)
+
+    def _stats_for_page(
+        self,
+        page_title: str,
+        page_info: Optional[Dict[str, Any]],
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if error:
+            return {"success": False, "error": error}
+        if not page_info:
+            return {
+                "success": False,
+                "error": f"Page '{page_title}' not found"
+            }
+        return self.get_comprehensive_stats(page_title, page_info=page_info)
+
+    def _local_internal_links(self, page_title: str, max_links: int) -> Optional[_InternalLinksCollector]:
+        """Liens internes depuis l'index local (dumps), None si la langue ou la page n'y figure pas"""
+        graph = get_link_graph(self.language)
+        node = graph.lookup(page_title) if graph is not None else None
+        if node is None or graph.page_id(node) is None:
+            return None
+
+        collector = _InternalLinksCollector(self.language, page_title, max_links)
+        collector.source = "local"
+        collector.page_id = graph.page_id(node)
+        collector.title = graph.title(node)
+        collector.add_titles(graph.title(target) for target in graph.links(node, limit=max_links + 1))
+        return collector
+
+    def _local_backlinks(self, page_title: str, max_links: int) -> Optional[Dict[str, Any]]:
+        """Rétroliens depuis l'index local (dumps), None si la langue ou la page n'y figure pas"""
+        graph = get_link_graph(self.language)
+        node = graph.lookup(page_title) if graph is not None else None
+        if node is None:
+            return None
+
+        titles = [graph.title(source) for source in graph.backlinks(node, limit=max_links)]
+        return self._backlinks_result(graph.title(node), titles, graph.backlinks_count(node) > len(titles), "local")
+
+    def _backlinks_result(self, page_title: str, titles: List[str], partial: bool, source: str) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "page_title": page_title,
+            "total_backlinks": len(titles),
+            "backlinks": [
+                {
+                    "page_title": title,
+                    "url": f"https://{self.language}.wikipedia.org/wiki/{title.replace(' ', '_')}"
+                }
+                for title in titles
+            ],
+            "partial": partial,
+            "source": source,
+        }
+
+    def _backlinks_params(self, page_title: str, max_links: int, blcontinue: Optional[str]) -> Dict[str, Any]:
+        params = {
+            "action": "query",
+            "list": "backlinks",
+            "bltitle": page_title,
+            "blnamespace": 0,
+            "bllimit": min(max_links, 500),
+            "format": "json",
+        }
+        if blcontinue:
+            params["blcontinue"] = blcontinue
+        return params
+
+    def get_backlinks(self, page_title: str, max_links: int = 200) -> Dict[str, Any]:
+        """
+        Récupère les pages (articles) qui lient vers une page Wikipedia
+
+        Répondu depuis l'index local de la langue s'il existe, sinon via `list=backlinks`.
+
+        Args:
+            page_title: Titre de la page Wikipedia
+            max_links: Nombre maximum de rétroliens
+
+        Returns:
+            Dictionnaire avec la liste des rétroliens
+        """
+        try:
+            local = self._local_backlinks(page_title, max_links)
+            if local is not None:
+                return local
+
+            titles: List[str] = []
+            blcontinue = None
+            while True:
+                data = get_json(
+                    self.api_url,
+                    params=self._backlinks_params(page_title, max_links - len(titles), blcontinue),
+                    headers=self.headers,
+                    timeout=20,
+                    cache="links",
+                )
+                if "error" in data:
+                    return {"success": False, "error": data["error"].get("info", f"Page '{page_title}' not found")}
+                titles.extend(b["title"] for b in data.get("query", {}).get("backlinks", []) or [])
+                blcontinue = (data.get("continue") or {}).get("blcontinue")
+                if not blcontinue or len(titles) >= max_links:
+                    break
+
+            return self._backlinks_result(page_title, titles[:max_links], bool(blcontinue), "api")
+
         except Exception as e:
-            logger.error(f"Error getting comprehensive stats: {e}")
+            logger.error(f"Error getting backlinks: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
-    
+
     def get_internal_links(self, page_title: str, max_links: int = 200) -> Dict[str, Any]:
         """
         Récupère tous les liens internes (ancres) d'une page Wikipedia
-        
+
         Args:
             page_title: Titre de la page Wikipedia
-            
+
         Returns:
             Dictionnaire avec la liste des liens internes
         """
+        result = None
+        for event in self.stream_internal_links(page_title, max_links=max_links):
+            if event["type"] == "result":
+                result = event["result"]
+        return result
+
+    def stream_internal_links(self, page_title: str, max_links: int = 200) -> Iterator[Dict[str, Any]]:
+        """
+        Itère sur les liens internes au fil de la pagination (un lot par page plcontinue)
+
+        Événements produits:
+            {"type": "links", "batch": n, "links": [...nouveaux liens], "total_links": k}
+            {"type": "result", "result": <même dictionnaire que get_internal_links>} (toujours en dernier)
+        """
         try:
             if max_links < 1:
                 max_links = 200
 
-            internal_links = []
-            seen_titles = set()
-
-            plcontinue = None
-            page_id = None
-            title = page_title
+            local = self._local_internal_links(page_title, max_links)
+            if local is not None:
+                yield {"type": "links", "batch": 1, "links": local.internal_links, "total_links": len(local.internal_links)}
+                yield {"type": "result", "result": local.result()}
+                return
 
-            partial = False
-
-            while True:
-                params = {
-                    "action": "query",
-                    "titles": page_title,
-                    "prop": "links",
-                    "plnamespace": 0,
-                    "pllimit": "max",
-                    "format": "json",
-                }
-                if plcontinue:
-                    params["plcontinue"] = plcontinue
+            collector = _InternalLinksCollector(self.language, page_title, max_links)
+            batch = 0
 
+            while not collector.done:
                 try:
-                    response = requests.get(
+                    data = get_json(
                         self.api_url,
-                        params=params,
+                        params=collector.params(),
                         headers=self.headers,
                         timeout=20,
+                        cache="links",
                     )
-                    response.raise_for_status()
-                    data = response.json()
-                except requests.exceptions.Timeout:
-                    partial = True
+                except httpx.TimeoutException:
+                    collector.partial = True
                     break
 
-                pages = data.get("query", {}).get("pages", {}) or {}
-                if not pages:
-                    return {
-                        "success": False,
-                        "error": f"Page '{page_title}' not found"
-                    }
+                new_links = collector.feed(data)
+                if collector.missing:
+                    yield {"type": "result", "result": collector.not_found()}
+                    return
 
-                page = list(pages.values())[0]
-                if page.get("missing") is not None:
+                if new_links:
+                    batch += 1
+                    yield {"type": "links", "batch": batch, "links": new_links, "total_links": len(collector.internal_links)}
+
+            yield {"type": "result", "result": collector.result()}
+
+        except Exception as e:
+            logger.error(f"Error getting internal links: {e}")
+            yield {"type": "result", "result": {"success": False, "error": str(e)}}
+
+
+class AsyncWikipediaAPIService(WikipediaAPIService):
+    """Version asyncio du service Wikipedia (mêmes méthodes, à utiliser avec `await`)
+
+    Les paramètres de requêtes et le parsing des réponses sont partagés avec
+    `WikipediaAPIService`; seules les entrées/sorties réseau diffèrent.
+    """
+
+    async def search_pages(self, keyword: str, limit: int = 20) -> Dict[str, Any]:
+        """Recherche des pages Wikipedia liées à un mot-clé"""
+        try:
+            data = await async_get_json(
+                self.api_url,
+                params=self._search_params(keyword, limit),
+                headers=self.headers,
+                timeout=30,
+                cache="search"
+            )
+
+            return self._parse_search_results(keyword, data)
+
+        except Exception as e:
+            logger.error(f"Error searching Wikipedia pages: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    async def get_page_info(self, page_title: str) -> Dict[str, Any]:
+        """Récupère les informations détaillées d'une page Wikipedia"""
+        try:
+            data = await async_get_json(
+                self.api_url,
+                params=self._page_info_params(page_title),
+                headers=self.headers,
+                timeout=30,
+                cache="page_info"
+            )
+
+            return self._parse_page_info(data)
+
+        except UpstreamUnavailableError:
+            # Indisponibilité temporaire: ne pas la confondre avec une page absente
+            raise
+        except Exception as e:
+            logger.error(f"Error getting page info: {e}")
+            return None
+
+    async def get_pages_info(
+        self,
+        page_titles: List[str],
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Récupère les informations de plusieurs pages en lots de 50 titres (lots en parallèle)"""
+        titles = _unique_titles(page_titles)
+
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+            try:
+                data = await async_get_json(
+                    self.api_url,
+                    params=self._pages_info_params(chunk),
+                    headers=self.headers,
+                    timeout=30,
+                    cache="page_info"
+                )
+                return self._parse_pages_info(chunk, data)
+            except Exception as e:
+                logger.error(f"Error getting pages info: {e}")
+                if errors is not None and isinstance(e, UpstreamUnavailableError):
+                    errors.update({title: str(e) for title in chunk})
+                return {title: None for title in chunk}
+
+        pages_info: Dict[str, Optional[Dict[str, Any]]] = {}
+        for chunk_info in await asyncio.gather(*(
+            fetch_chunk(chunk) for chunk in _chunks(titles, MAX_TITLES_PER_QUERY)
+        )):
+            pages_info.update(chunk_info)
+        return pages_info
+
+    async def get_pageviews(
+        self,
+        page_title: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        granularity: str = "daily"
+    ) -> Dict[str, Any]:
+        """Récupère les statistiques de vues pour une page"""
+        try:
+            start_date, end_date = self._default_pageviews_range(start_date, end_date)
+            url = self._pageviews_url(page_title, start_date, end_date, granularity)
+
+            try:
+                data = await async_get_json(
+                    url,
+                    headers=self.headers,
+                    timeout=30,
+                    cache="pageviews"
+                )
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
                     return {
                         "success": False,
-                        "error": f"Page '{page_title}' not found"
+                        "error": "Page not found in pageviews data"
                     }
+                raise
 
-                page_id = page.get("pageid")
-                title = page.get("title") or title
-
-                links = page.get("links", []) or []
-                for l in links:
-                    linked_title = (l or {}).get("title")
-                    if not linked_title:
-                        continue
-                    if linked_title in seen_titles:
-                        continue
-                    seen_titles.add(linked_title)
-                    internal_links.append({
-                        "anchor_text": linked_title,
-                        "linked_page_title": linked_title,
-                        "url": f"https://{self.language}.wikipedia.org/wiki/{linked_title.replace(' ', '_')}"
-                    })
-
-                    if len(internal_links) >= max_links:
-                        partial = True
-                        break
-
-                if len(internal_links) >= max_links:
-                    break
+            return self._parse_pageviews(page_title, data, start_date, end_date, granularity)
 
-                cont = data.get("continue", {}) or {}
-                plcontinue = cont.get("plcontinue")
-                if not plcontinue:
-                    break
+        except Exception as e:
+            logger.error(f"Error getting pageviews for {page_title}: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    async def get_pageviews_series(self, page_title: str, windows: Dict[str, tuple]) -> PageviewsSeries:
+        """Version asyncio de `get_pageviews_series`: les requêtes planifiées partent en parallèle"""
+        plan = plan_pageviews_requests(windows)
+        responses = await asyncio.gather(*(
+            self.get_pageviews(page_title, start, end, granularity)
+            for granularity, start, end in plan
+        ))
+        return self._series_from_segments([
+            (granularity, views)
+            for (granularity, _, _), views in zip(plan, responses)
+        ])
 
+    async def get_comprehensive_stats(
+        self,
+        page_title: str,
+        page_info: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Récupère toutes les statistiques pour une page (comme detailed.com)"""
+        try:
+            windows = stats_windows(datetime.now())
+
+            if page_info is None:
+                # Infos de base et série de vues sont indépendantes: en parallèle
+                page_info, series = await asyncio.gather(
+                    self.get_page_info(page_title),
+                    self.get_pageviews_series(page_title, windows),
+                )
+            else:
+                series = await self.get_pageviews_series(page_title, windows)
+
+            if not page_info:
+                return {
+                    "success": False,
+                    "error": f"Page '{page_title}' not found"
+                }
+
+            return self._build_comprehensive_stats(page_info, windows, series)
+
+        except Exception as e:
+            logger.error(f"Error getting comprehensive stats: {e}")
             return {
-                "success": True,
-                "page_title": title,
-                "page_id": page_id,
-                "total_internal_links": len(internal_links),
-                "internal_links": internal_links,
-                "partial": partial,
-                "max_links": max_links,
+                "success": False,
+                "error": str(e)
             }
-            
+
+    async def get_comprehensive_stats_bulk(
+        self,
+        page_titles: List[str],
+        max_concurrency: Optional[int] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Statistiques complètes de plusieurs pages, séries de vues récupérées en parallèle
+
+        Args:
+            page_titles: Titres des pages
+            max_concurrency: Nombre max de pages traitées en parallèle (défaut: configuration)
+            on_result: Appelé avec (index, résultat) dès qu'une page est traitée
+
+        Returns:
+            Liste de résultats de `get_comprehensive_stats`, dans l'ordre des titres
+        """
+        if max_concurrency is None:
+            max_concurrency = self.config["stats_concurrency"]
+
+        errors: Dict[str, str] = {}
+        pages_info = await self.get_pages_info(page_titles, errors)
+
+        async def stats_for(index: int) -> Dict[str, Any]:
+            title = page_titles[index]
+            page_info = pages_info.get(title)
+            if title in errors:
+                result = {"success": False, "error": errors[title]}
+            elif not page_info:
+                result = {
+                    "success": False,
+                    "error": f"Page '{title}' not found"
+                }
+            else:
+                try:
+                    result = await self.get_comprehensive_stats(title, page_info=page_info)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+            if on_result is not None:
+                on_result(index, result)
+            return result
+
+        return await fan_out(range(len(page_titles)), stats_for, max_concurrency=max_concurrency)
+
+    async def get_daily_views_bulk(
+        self,
+        page_titles: List[str],
+        start_date: str,
+        end_date: str,
+        max_concurrency: Optional[int] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Version asyncio de `get_daily_views_bulk`: séries récupérées en parallèle
+
+        Args:
+            max_concurrency: Nombre max de séries récupérées en parallèle (défaut: configuration)
+            on_result: Appelé avec (index, résultat) dès qu'une série est reçue
+        """
+        if max_concurrency is None:
+            max_concurrency = self.config["stats_concurrency"]
+
+        async def views_for(index: int) -> Dict[str, Any]:
+            result = await self.get_pageviews(page_titles[index], start_date, end_date)
+            if on_result is not None:
+                on_result(index, result)
+            return result
+
+        return await fan_out(range(len(page_titles)), views_for, max_concurrency=max_concurrency)
+
+    async def top_pages_by_views(
+        self,
+        page_titles: List[str],
+        start_date: str,
+        end_date: str,
+        top: int = 20,
+        time_budget: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Version asyncio de `top_pages_by_views`: séries récupérées en parallèle
+
+        Le classement est mis à jour dès qu'une série arrive; à l'expiration de
+        `time_budget`, les requêtes restantes sont annulées.
+
+        Args:
+            max_concurrency: Nombre max de séries récupérées en parallèle (défaut: configuration)
+            on_result: Appelé avec (index, résultat) dès qu'une série est reçue
+        """
+        if max_concurrency is None:
+            max_concurrency = self.config["stats_concurrency"]
+
+        ranking = _TopViews(top)
+        sem = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def views_for(index: int):
+            async with sem:
+                return index, await self.get_pageviews(page_titles[index], start_date, end_date)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + time_budget if time_budget is not None else None
+        pending = {asyncio.create_task(views_for(index)) for index in range(len(page_titles))}
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    index, views = task.result()
+                    ranking.add(index, page_titles[index], views)
+                    if on_result is not None:
+                        on_result(index, views)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return ranking.result(len(page_titles), start_date, end_date)
+
+    async def get_backlinks(self, page_title: str, max_links: int = 200) -> Dict[str, Any]:
+        """Récupère les pages (articles) qui lient vers une page Wikipedia"""
+        try:
+            local = self._local_backlinks(page_title, max_links)
+            if local is not None:
+                return local
+
+            titles: List[str] = []
+            blcontinue = None
+            while True:
+                data = await async_get_json(
+                    self.api_url,
+                    params=self._backlinks_params(page_title, max_links - len(titles), blcontinue),
+                    headers=self.headers,
+                    timeout=20,
+                    cache="links",
+                )
+                if "error" in data:
+                    return {"success": False, "error": data["error"].get("info", f"Page '{page_title}' not found")}
+                titles.extend(b["title"] for b in data.get("query", {}).get("backlinks", []) or [])
+                blcontinue = (data.get("continue") or {}).get("blcontinue")
+                if not blcontinue or len(titles) >= max_links:
+                    break
+
+            return self._backlinks_result(page_title, titles[:max_links], bool(blcontinue), "api")
+
         except Exception as e:
-            logger.error(f"Error getting internal links: {e}")
+            logger.error(f"Error getting backlinks: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
+
+    async def get_internal_links(self, page_title: str, max_links: int = 200) -> Dict[str, Any]:
+        """Récupère tous les liens internes (ancres) d'une page Wikipedia"""
+        result = None
+        async for event in self.stream_internal_links(page_title, max_links=max_links):
+            if event["type"] == "result":
+                result = event["result"]
+        return result
+
+    async def stream_internal_links(self, page_title: str, max_links: int = 200) -> AsyncIterator[Dict[str, Any]]:
+        """Version asyncio de `stream_internal_links`: chaque lot est produit dès réception de sa page"""
+        try:
+            if max_links < 1:
+                max_links = 200
+
+            local = self._local_internal_links(page_title, max_links)
+            if local is not None:
+                yield {"type": "links", "batch": 1, "links": local.internal_links, "total_links": len(local.internal_links)}
+                yield {"type": "result", "result": local.result()}
+                return
+
+            collector = _InternalLinksCollector(self.language, page_title, max_links)
+            batch = 0
+
+            while not collector.done:
+                try:
+                    data = await async_get_json(
+                        self.api_url,
+                        params=collector.params(),
+                        headers=self.headers,
+                        timeout=20,
+                        cache="links",
+                    )
+                except httpx.TimeoutException:
+                    collector.partial = True
+                    break
+
+                new_links = collector.feed(data)
+                if collector.missing:
+                    yield {"type": "result", "result": collector.not_found()}
+                    return
+
+                if new_links:
+                    batch += 1
+                    yield {"type": "links", "batch": batch, "links": new_links, "total_links": len(collector.internal_links)}
+
+            yield {"type": "result", "result": collector.result()}
+
+        except Exception as e:
+            logger.error(f"Error getting internal links: {e}")
+            yield {"type": "result", "result": {"success": False, "error": str(e)}}
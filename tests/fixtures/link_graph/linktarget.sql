@@ -0,0 +1 @@
+INSERT INTO `linktarget` VALUES (10,0,'France'),(11,0,'L\'Île_de_la_Cité'),(12,0,'Rouge_lien'),(13,0,'Paris'),(14,1,'Paris');
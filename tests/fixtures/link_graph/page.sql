@@ -0,0 +1 @@
+INSERT INTO `page` VALUES (1,0,'Paris','',0,0,0.5,'20240101','20240101',1,100,'wikitext',NULL),(2,0,'France','',0,0,0.5,'20240101','20240101',1,100,'wikitext',NULL),(3,0,'L\'Île_de_la_Cité','',0,0,0.5,'20240101','20240101',1,100,'wikitext',NULL),(4,1,'Paris','',0,0,0.5,'20240101','20240101',1,100,'wikitext',NULL);
@@ -0,0 +1 @@
+INSERT INTO `pagelinks` VALUES (1,0,'France',0),(1,0,'L\'Île_de_la_Cité',0),(1,0,'Rouge_lien',0),(2,0,'Paris',0),(3,0,'Paris',0),(3,0,'France',0),(4,0,'Paris',1),(1,0,'France',0);
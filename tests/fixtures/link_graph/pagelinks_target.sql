@@ -0,0 +1 @@
+INSERT INTO `pagelinks` VALUES (1,0,10),(1,0,11),(1,0,12),(2,0,13),(3,0,13),(3,0,10),(4,1,14);
@@ -0,0 +1,83 @@
+"""Construction et lecture du store d'entités à partir d'un petit dump JSON"""
+
+import json
+import os
+
+import pytest
+
+from services import entity_store
+from services.entity_store import EntityStore, build_entity_store
+
+from conftest import FIXTURES
+
+DUMP = os.path.join(FIXTURES, "entity_store", "dump.json")
+
+
+@pytest.fixture
+def store(tmp_path):
+    meta = build_entity_store(str(tmp_path), DUMP, ["fr", "en"])
+    assert (meta["entities"], meta["properties"]) == (3, 1)
+    store = EntityStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_get_compacts_entities(store):
+    paris = store.get("Q90")
+    assert paris["labels"] == {
+        "fr": {"language": "fr", "value": "Paris"},
+        "en": {"language": "en", "value": "Paris"},
+    }
+    assert paris["descriptions"] == {"fr": {"language": "fr", "value": "capitale de la France"}}
+    assert paris["aliases"]["fr"][0]["value"] == "Ville Lumière"
+    # Claims réduits au mainsnak et au rang
+    assert paris["claims"]["P31"] == [{
+        "mainsnak": {
+            "snaktype": "value",
+            "property": "P31",
+            "datatype": "wikibase-item",
+            "datavalue": {"value": {"entity-type": "item", "numeric-id": 515, "id": "Q515"}, "type": "wikibase-entityid"},
+        },
+        "rank": "normal",
+    }]
+    assert paris["sitelinks"] == {"frwiki": {"site": "frwiki", "title": "Paris"}}
+
+    assert store.get("p31")["datatype"] == "wikibase-item"
+    assert store.get("Q42")["labels"]["en"]["value"] == "Douglas Adams"
+
+
+def test_get_missing_entities(store):
+    assert store.get("Q1") is None
+    assert store.get("L1") is None
+    assert store.get("") is None
+    assert (store.stats()["hits"], store.stats()["misses"]) == (0, 3)
+
+
+def test_entities_in_id_order(store):
+    assert [entity["id"] for entity in store.entities()] == ["Q42", "Q90", "P31"]
+    assert store.covers(["fr"]) and not store.covers(["de"])
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_last_duplicate_wins(tmp_path, monkeypatch, numpy):
+    if numpy and entity_store.np is None:
+        pytest.skip("numpy non installé")
+    if not numpy:
+        monkeypatch.setattr(entity_store, "np", None)
+
+    dump = tmp_path / "dump.json"
+    entities = [
+        {"type": "item", "id": "Q90", "labels": {"fr": {"language": "fr", "value": "ancien"}}},
+        {"type": "item", "id": "Q42"},
+        {"type": "item", "id": "Q90", "labels": {"fr": {"language": "fr", "value": "nouveau"}}},
+    ]
+    dump.write_text("[\n" + ",\n".join(json.dumps(entity) for entity in entities) + "\n]\n", encoding="utf-8")
+
+    build_entity_store(str(tmp_path / "store"), str(dump), ["fr"])
+    store = EntityStore(str(tmp_path / "store"))
+    try:
+        assert len(store) == 2
+        assert store.get("Q90")["labels"]["fr"]["value"] == "nouveau"
+        assert [entity["id"] for entity in store.entities()] == ["Q42", "Q90"]
+    finally:
+        store.close()
@@ -0,0 +1,96 @@
+"""Index de labels local et recherche d'entités (index local, puis wbsearchentities)"""
+
+import pytest
+
+from services import wikidata_api
+from services.label_index import LabelIndex, build_label_index
+from services.wikidata_api import WikidataAPIService
+
+
+def _entity(qid: str, label: str, sitelinks: int, aliases=(), description=None):
+    return {
+        "id": qid,
+        "labels": {"fr": {"language": "fr", "value": label}},
+        "aliases": {"fr": [{"language": "fr", "value": alias} for alias in aliases]},
+        "descriptions": {"fr": {"language": "fr", "value": description}} if description else {},
+        "sitelinks": {f"site{i}": {"title": label} for i in range(sitelinks)},
+    }
+
+
+ENTITIES = [
+    # Labels peu populaires, triés avant "paris": ils remplissent le début de la plage de préfixe
+    *(_entity(f"Q{1000 + i}", f"Para {i:03d}", 0) for i in range(100)),
+    _entity("Q90", "Paris", 300, aliases=["Ville Lumière"], description="capitale de la France"),
+    _entity("Q167646", "Paris", 20, description="fils de Priam"),
+    _entity("Q1", "Parisien", 5),
+    _entity("Q2", "Tour Eiffel", 150, aliases=["Dame de fer"]),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    build_label_index(str(tmp_path), "fr", ENTITIES)
+    index = LabelIndex(str(tmp_path))
+    yield index
+    index.close()
+
+
+def test_exact_matches_by_popularity(index):
+    results = index.search("  PARIS ", limit=5)
+    assert [item["id"] for item in results[:2]] == ["Q90", "Q167646"]
+    assert [item["match"]["type"] for item in results] == ["exact", "exact", "prefix"]
+    assert results[0]["description"] == "capitale de la France"
+    assert index.search("ville lumière", limit=1)[0]["id"] == "Q90"
+
+
+def test_prefix_ranked_before_truncation(index):
+    results = index.search("par", limit=3)
+    assert [item["id"] for item in results] == ["Q90", "Q167646", "Q1"]
+    assert {item["match"]["type"] for item in results} == {"prefix"}
+
+
+def test_token_matches(index):
+    assert [item["id"] for item in index.search("eiffel")] == ["Q2"]
+    assert [(item["id"], item["match"]["type"]) for item in index.search("fer dame")] == [("Q2", "token")]
+    assert index.search("lyon") == []
+
+
+class _Service(WikidataAPIService):
+    def __init__(self, index, monkeypatch, api=None):
+        super().__init__()
+        self.calls = []
+        monkeypatch.setattr(wikidata_api, "get_label_index", lambda language: index)
+
+        def get_json(url, params=None, **kwargs):
+            self.calls.append(params["search"])
+            if api is None:
+                raise ConnectionError("network down")
+            return {"search": api}
+
+        monkeypatch.setattr(wikidata_api, "get_json", get_json)
+
+
+def test_search_entities_exact_stays_local(index, monkeypatch):
+    service = _Service(index, monkeypatch)
+    response = service.search_entities("Paris", limit=2)
+    assert response["source"] == "local"
+    assert [item["id"] for item in response["results"]] == ["Q90", "Q167646"]
+    assert service.calls == []
+
+
+def test_search_entities_prefix_queries_api(index, monkeypatch):
+    api = [{"id": "Q90", "label": "Paris", "concepturi": "http://www.wikidata.org/entity/Q90"}]
+    service = _Service(index, monkeypatch, api=api)
+    response = service.search_entities("Pari", limit=3)
+    assert service.calls == ["Pari"]
+    assert response["source"] == "api+local"
+    assert [item["id"] for item in response["results"]] == ["Q90", "Q167646", "Q1"]
+
+
+def test_search_entities_prefix_without_api(index, monkeypatch):
+    service = _Service(index, monkeypatch)
+    response = service.search_entities("Pari", limit=2)
+    assert response["success"] and response["source"] == "local"
+    assert [item["id"] for item in response["results"]] == ["Q90", "Q167646"]
+
+    assert service.search_entities("Lyon")["success"] is False
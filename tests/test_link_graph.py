@@ -0,0 +1,83 @@
+"""Construction et lecture de l'index des liens à partir de petits dumps"""
+
+import os
+
+import pytest
+
+from services import link_graph
+from services.link_graph import LinkGraph, build_link_graph
+
+from conftest import FIXTURES
+
+DUMPS = os.path.join(FIXTURES, "link_graph")
+
+
+def _dump(name: str) -> str:
+    return os.path.join(DUMPS, name)
+
+
+def _build(tmp_path, ext: str, linktarget: bool) -> LinkGraph:
+    if linktarget:
+        meta = build_link_graph(
+            str(tmp_path), "fr", _dump(f"page.{ext}"), _dump(f"pagelinks_target.{ext}"), _dump(f"linktarget.{ext}")
+        )
+    else:
+        meta = build_link_graph(str(tmp_path), "fr", _dump(f"page.{ext}"), _dump(f"pagelinks.{ext}"))
+    assert meta["language"] == "fr"
+    return LinkGraph(str(tmp_path))
+
+
+def _titles(graph: LinkGraph, nodes):
+    return [graph.title(node) for node in nodes]
+
+
+@pytest.mark.parametrize("linktarget", [False, True])
+def test_sql_dumps(tmp_path, linktarget):
+    graph = _build(tmp_path, "sql", linktarget)
+    try:
+        paris = graph.lookup("Paris")
+        assert paris is not None
+        assert graph.page_id(paris) == 1
+        # Doublons ignorés, lien rouge conservé, liens de l'espace Discussion exclus
+        assert _titles(graph, graph.links(paris)) == ["France", "L'Île de la Cité", "Rouge lien"]
+        assert _titles(graph, graph.backlinks(paris)) == ["France", "L'Île de la Cité"]
+        assert graph.links_count(paris) == 3
+        assert graph.backlinks_count(paris) == 2
+        assert _titles(graph, graph.links(paris, limit=1)) == ["France"]
+
+        ile = graph.lookup("l'Île de la Cité")
+        assert ile is not None and ile == graph.lookup("L'Île_de_la_Cité")
+        assert _titles(graph, graph.backlinks(ile)) == ["Paris"]
+
+        red = graph.lookup("Rouge lien")
+        assert red is not None and graph.page_id(red) is None
+        assert graph.links(red) == []
+        assert graph.lookup("Lyon") is None
+
+        stats = graph.stats()
+        assert (stats["nodes"], stats["pages"], stats["links"]) == (4, 3, 6)
+    finally:
+        graph.close()
+
+
+@pytest.mark.parametrize("linktarget", [False, True])
+def test_tsv_dumps_keep_numeric_titles(tmp_path, linktarget):
+    graph = _build(tmp_path, "tsv", linktarget)
+    try:
+        paris = graph.lookup("Paris")
+        assert _titles(graph, graph.links(paris)) == ["1984", "2024", "France"]
+        assert _titles(graph, graph.backlinks(graph.lookup("1984"))) == ["Paris"]
+        assert _titles(graph, graph.links(graph.lookup("1984"))) == ["Paris"]
+    finally:
+        graph.close()
+
+
+@pytest.mark.skipif(link_graph.np is None, reason="numpy non installé")
+def test_pure_python_build_matches_numpy(tmp_path, monkeypatch):
+    build_link_graph(str(tmp_path / "numpy"), "fr", _dump("page.sql"), _dump("pagelinks.sql"))
+    monkeypatch.setattr(link_graph, "np", None)
+    build_link_graph(str(tmp_path / "python"), "fr", _dump("page.sql"), _dump("pagelinks.sql"))
+
+    for name in sorted(link_graph._FILES.values()):
+        with open(tmp_path / "numpy" / name, "rb") as a, open(tmp_path / "python" / name, "rb") as b:
+            assert a.read() == b.read(), name
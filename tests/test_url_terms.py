@@ -0,0 +1,57 @@
+"""Extraction incrémentale des termes d'une page HTML (resolve_wikidata_entities_from_url)"""
+
+import pytest
+
+from tools.wikidata_tools import _HTMLTermExtractor
+
+CHUNK_SIZES = [1, 7, 64, 10 ** 6]
+
+
+def _links(count: int, start: int = 0) -> str:
+    return "".join(f'<a href="https://fr.wikipedia.org/wiki/L_{i}">x</a>' for i in range(start, start + count))
+
+
+def _terms(html: bytes, chunk_size: int, max_terms: int = 5, encoding=None):
+    extractor = _HTMLTermExtractor(max_terms, encoding=encoding)
+    for i in range(0, len(html), chunk_size):
+        if extractor.feed(html[i:i + chunk_size]):
+            break
+    return extractor.terms()
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_meta_charset_detected_across_chunks(chunk_size):
+    html = (
+        '<html><head><meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">'
+        "<title>Café Paris</title></head><body><h1>Hôtel de Ville</h1></body></html>"
+    ).encode("latin-1")
+    assert _terms(html, chunk_size) == ["Café Paris", "Hôtel de Ville"]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_http_charset_and_utf8_default(chunk_size):
+    body = "<title>Café</title><h1>Crème brûlée</h1>"
+    assert _terms(body.encode("cp1252"), chunk_size, encoding="cp1252") == ["Café", "Crème brûlée"]
+    assert _terms(body.encode("utf-8"), chunk_size) == ["Café", "Crème brûlée"]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_title_h1_and_wikipedia_links(chunk_size):
+    html = (
+        "<html><head><title> Mon titre </title></head><body>"
+        f"{_links(3)}<h1>  Jean <b>Dupont</b> de la Tour  </h1>{_links(30, 100)}</body></html>"
+    ).encode("utf-8")
+    # Comme get_text(strip=True) de BeautifulSoup: chaque nœud texte est nettoyé séparément
+    assert _terms(html, chunk_size, max_terms=4) == ["Mon titre", "JeanDupontde la Tour", "L 0", "L 1"]
+
+
+def test_reading_stops_after_enough_candidates():
+    html = ("<title>T</title><h1>H</h1>" + _links(200)).encode("utf-8")
+    extractor = _HTMLTermExtractor(2)
+    fed = 0
+    for i in range(0, len(html), 64):
+        fed += 1
+        if extractor.feed(html[i:i + 64]):
+            break
+    assert fed * 64 < len(html)
+    assert extractor.terms() == ["T", "H"]
@@ -1,13 +1,20 @@
 """Wikidata entity discovery tools"""
 
 import asyncio
+import heapq
 import logging
 import re
-from typing import Any, Dict, List, Optional, Set
-
-import requests
-from bs4 import BeautifulSoup
-from services.wikidata_api import WikidataAPIService
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from lxml import etree
+from config.settings import get_headers, get_url_fetch_config
+from core.events import emit_partial_result, emit_progress
+from services.http_client import web_page_client
+from services.wikidata_api import AsyncWikidataAPIService
+from services.wikidata_graph import crawl_relation_graph
 
 logger = logging.getLogger(__name__)
 
@@ -37,53 +44,238 @@ def _dedupe_terms(values: List[str]) -> List[str]:
     return out
 
 
-def _extract_terms_from_text(text: str, max_terms: int = 50) -> List[str]:
-    if not text:
-        return []
-
-    candidates: List[str] = []
-
-    # Heuristique: groupes de mots commençant par majuscule (noms propres)
-    pattern = re.compile(r"\b([A-Z][\w'\-]+(?:\s+[A-Z][\w'\-]+){0,3})\b")
-    for m in pattern.finditer(text):
-        candidates.append(m.group(1))
-        if len(candidates) >= max_terms * 3:
-            break
-
-    return _dedupe_terms(candidates)[:max_terms]
-
-
-def _extract_terms_from_url_html(html: str, max_terms: int = 50) -> List[str]:
-    if not html:
-        return []
-
-    soup = BeautifulSoup(html, "lxml")
-    candidates: List[str] = []
-
-    title = (soup.title.string if soup.title else None)
-    if title:
-        candidates.append(title)
-
-    h1 = soup.find("h1")
-    if h1 and h1.get_text(strip=True):
-        candidates.append(h1.get_text(strip=True))
+# Heuristique: groupes de mots commençant par majuscule (noms propres)
+_PROPER_NOUN = re.compile(r"\b([A-Z][\w'\-]+(?:\s+[A-Z][\w'\-]+){0,3})\b")
+# Taille (caractères) des blocs analysés dans les grands textes
+_TEXT_CHUNK_SIZE = 1 << 20
+
+
+def _iter_text_chunks(text: str, size: int = _TEXT_CHUNK_SIZE) -> Iterator[str]:
+    """Blocs d'un grand texte, coupés en fin de ligne ou de phrase pour ne pas couper un nom"""
+    start = 0
+    while start < len(text):
+        end = start + size
+        if end < len(text):
+            cut = max(text.rfind("\n", start, end), text.rfind(". ", start, end))
+            if cut <= start:
+                cut = max(text.rfind(" ", start, end), start + size - 1)
+            end = cut + 1
+        yield text[start:end]
+        start = end
+
+
+def _count_terms(texts: Iterable[str]) -> Dict[str, List[Any]]:
+    """Occurrences des termes candidats de tous les textes: clé casefold -> [forme, nombre, rang d'apparition]"""
+    # Comptage des formes brutes d'abord (ordre d'apparition conservé), normalisation ensuite une fois par forme
+    raw: Counter = Counter()
+    for text in texts:
+        for chunk in _iter_text_chunks(text or ""):
+            raw.update(_PROPER_NOUN.findall(chunk))
+
+    counts: Dict[str, List[Any]] = {}
+    for surface, count in raw.items():
+        term = _normalize_term(surface)
+        key = term.casefold()
+        entry = counts.get(key)
+        if entry is None:
+            counts[key] = [term, count, len(counts)]
+        else:
+            entry[1] += count
+    return counts
+
+
+def _rank_terms(texts: Iterable[str], max_terms: int = 50) -> List[Tuple[str, int]]:
+    """Les `max_terms` termes les plus fréquents (à égalité: ordre d'apparition), avec leur nombre"""
+    counts = _count_terms(texts)
+    top = heapq.nsmallest(max_terms, counts.values(), key=lambda entry: (-entry[1], entry[2]))
+    return [(term, count) for term, count, _ in top]
+
+
+# Candidats au-delà desquels la lecture d'une page s'arrête (par terme gardé)
+_CANDIDATES_PER_TERM = 5
+# Taille des blocs transmis au parser: l'arrêt est vérifié entre deux blocs
+_PARSE_BLOCK_SIZE = 16384
+# Début du document où chercher <meta charset> (tamponné avant de créer le parser)
+_CHARSET_SNIFF_BYTES = 4096
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+_HEAD_END = re.compile(rb"</head", re.IGNORECASE)
+
+
+class _HTMLTermCollector:
+    """Cible SAX du parser HTML lxml: <title>, premier <h1> et liens Wikipedia, sans construire d'arbre"""
+
+    def __init__(self, max_candidates: int):
+        self.max_candidates = max_candidates
+        self.title: Optional[str] = None
+        self.h1: Optional[str] = None
+        self.links: List[str] = []
+        self._capture: Optional[str] = None
+        self._depth = 0
+        self._parts: List[str] = []  # Nœuds texte complets de l'élément capturé
+        self._text: List[str] = []   # Fragments du nœud texte en cours (un nœud peut arriver en plusieurs appels)
+
+    @property
+    def done(self) -> bool:
+        # Seuls les liens sont plafonnés; title et h1 sont cherchés dans toute la page
+        return len(self.links) >= self.max_candidates and self.title is not None and self.h1 is not None
+
+    def _flush_text(self) -> None:
+        if self._text:
+            text = "".join(self._text)
+            self._parts.append(text if self._capture == "title" else text.strip())
+            self._text = []
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self._capture is not None:
+            self._flush_text()
+            self._depth += 1
+        elif (tag == "title" and self.title is None) or (tag == "h1" and self.h1 is None):
+            self._capture, self._depth, self._parts, self._text = tag, 0, [], []
+
+        if tag == "a" and len(self.links) < self.max_candidates:
+            # Si la page contient déjà des liens Wikipedia, c'est un signal fort.
+            href = attrib.get("href") or ""
+            if "wikipedia.org/wiki/" in href:
+                part = href.split("/wiki/", 1)[-1]
+                part = part.split("#", 1)[0]
+                part = part.split("?", 1)[0]
+                part = part.replace("_", " ")
+                if part:
+                    self.links.append(part)
+
+    def end(self, tag: str) -> None:
+        if self._capture is None:
+            return
+        self._flush_text()
+        if self._depth:
+            self._depth -= 1
+            return
+        if self._capture == "title":
+            self.title = "".join(self._parts)
+        else:
+            self.h1 = "".join(self._parts)
+        self._capture = None
+
+    def data(self, data: str) -> None:
+        if self._capture is not None:
+            self._text.append(data)
+
+    def close(self) -> None:
+        return None
 
-    # Si la page contient déjà des liens Wikipedia, c'est un signal fort.
-    for a in soup.find_all("a", href=True):
-        href = a.get("href")
-        if not href:
-            continue
-        if "wikipedia.org/wiki/" in href:
-            part = href.split("/wiki/", 1)[-1]
-            part = part.split("#", 1)[0]
-            part = part.split("?", 1)[0]
-            part = part.replace("_", " ")
-            if part:
-                candidates.append(part)
-        if len(candidates) >= max_terms * 5:
-            break
+    def terms(self, max_terms: int) -> List[str]:
+        candidates = [value for value in (self.title, self.h1) if value] + self.links
+        return _dedupe_terms(candidates[:self.max_candidates])[:max_terms]
+
+
+class _HTMLTermExtractor:
+    """Extraction incrémentale des termes d'une page HTML, alimentée bloc par bloc.
+
+    La mémoire reste constante quelle que soit la taille du document: aucun arbre
+    n'est construit et l'extraction s'arrête dès `max_terms * 5` liens Wikipedia,
+    une fois title et h1 trouvés.
+    """
+
+    def __init__(self, max_terms: int, encoding: Optional[str] = None):
+        self.max_terms = max_terms
+        self.encoding = encoding
+        self._collector = _HTMLTermCollector(max_terms * _CANDIDATES_PER_TERM)
+        self._parser = None
+        self._head = bytearray()
+
+    @property
+    def done(self) -> bool:
+        return self._collector.done
+
+    def _sniff_encoding(self, final: bool) -> Optional[str]:
+        """<meta charset> du début du document, UTF-8 à défaut; None tant qu'il peut encore arriver"""
+        head = bytes(self._head[:_CHARSET_SNIFF_BYTES])
+        complete = final or len(head) >= _CHARSET_SNIFF_BYTES
+        match = _META_CHARSET.search(head)
+        # Un nom d'encodage en fin de tampon peut être coupé: il faut l'octet suivant
+        if match and (match.end() < len(head) or complete):
+            return match.group(1).decode("ascii")
+        if complete or _HEAD_END.search(head):
+            return "utf-8"
+        return None
 
-    return _dedupe_terms(candidates)[:max_terms]
+    def _start(self, encoding: str) -> None:
+        try:
+            self._parser = etree.HTMLParser(target=self._collector, encoding=encoding)
+        except LookupError:
+            self._parser = etree.HTMLParser(target=self._collector, encoding="utf-8")
+
+    def feed(self, chunk: bytes) -> bool:
+        """Analyse un bloc d'octets; retourne True quand assez de candidats ont été vus"""
+        if self._parser is None:
+            # Encodage: en-tête HTTP, sinon <meta charset> des premiers Ko (ou jusqu'à </head>), sinon UTF-8
+            self._head += chunk
+            encoding = self.encoding or self._sniff_encoding(final=False)
+            if encoding is None:
+                return False
+            self._start(encoding)
+            chunk, self._head = bytes(self._head), bytearray()
+
+        for i in range(0, len(chunk), _PARSE_BLOCK_SIZE):
+            if self.done:
+                break
+            self._parser.feed(chunk[i:i + _PARSE_BLOCK_SIZE])
+        return self.done
+
+    def terms(self) -> List[str]:
+        if self._parser is None and self._head:
+            # Document plus court que la zone de détection
+            self._start(self._sniff_encoding(final=True))
+            head, self._head = bytes(self._head), bytearray()
+            self.feed(head)
+        if self._parser is not None and not self.done:
+            try:
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                pass
+        return self._collector.terms(self.max_terms)
+
+
+async def _has_more(chunks) -> bool:
+    """True si le flux d'octets contient encore des données"""
+    try:
+        async for chunk in chunks:
+            if chunk:
+                return True
+    except (httpx.HTTPError, httpx.StreamError):
+        return True  # Inconnu: considéré comme incomplet
+    return False
+
+
+async def _fetch_page_terms(client: httpx.AsyncClient, url: str, max_terms: int, timeout: float) -> Dict[str, Any]:
+    """Télécharge une page et en extrait les termes au fil des octets reçus.
+
+    La lecture s'arrête dès que l'extraction a assez de candidats, ou au plafond
+    URL_FETCH_MAX_BYTES.
+    """
+    max_bytes = get_url_fetch_config()["max_bytes"]
+    headers = {"User-Agent": get_headers()["User-Agent"], "Accept": "text/html,application/xhtml+xml"}
+    bytes_read = 0
+    complete = True
+
+    async with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+        response.raise_for_status()
+        extractor = _HTMLTermExtractor(max_terms, encoding=response.charset_encoding)
+        chunks = response.aiter_bytes()
+        async for chunk in chunks:
+            kept = chunk[:max_bytes - bytes_read]
+            bytes_read += len(kept)
+            if extractor.feed(kept) or bytes_read >= max_bytes:
+                # Lecture interrompue: la page n'est incomplète que s'il restait des octets
+                complete = len(kept) == len(chunk) and not await _has_more(chunks)
+                break
+
+    terms = extractor.terms()
+    return {"terms": terms, "terms_count": len(terms), "bytes_read": bytes_read, "complete": complete}
+
+
+def _labels_progress(done: int, total: int) -> None:
+    emit_progress("labels", done, total)
 
 
 def register_wikidata_tools(mcp):
@@ -123,9 +315,9 @@ def register_wikidata_tools(mcp):
             max_linked_entities = 200
 
         try:
-            service = WikidataAPIService()
+            service = AsyncWikidataAPIService()
 
-            search = service.search_entities(query=query, language=language, limit=search_limit)
+            search = await service.search_entities(query=query, language=language, limit=search_limit)
             if not search.get("success"):
                 return search
 
@@ -142,8 +334,13 @@ def register_wikidata_tools(mcp):
 
             selected = results[0]
             entity_id = selected.get("id")
+            emit_partial_result("candidate_selected", entity=selected, candidates_count=len(results))
 
-            entity_data = service.get_entity_data(entity_id)
+            entity_data = await service.get_entity_data(
+                entity_id,
+                props=["labels", "descriptions", "claims"],
+                languages=[language],
+            )
             if not entity_data.get("success"):
                 return {
                     "success": False,
@@ -164,7 +361,14 @@ def register_wikidata_tools(mcp):
                 return extracted
 
             linked_ids = extracted.get("linked_entity_ids", [])
-            labels_resp = service.get_entities_labels(linked_ids, language=language)
+            emit_partial_result(
+                "relations_extracted",
+                relations=extracted.get("relations", {}),
+                linked_entities_count=len(linked_ids),
+            )
+            labels_resp = await service.get_entities_labels(
+                linked_ids, language=language, on_progress=_labels_progress
+            )
             if not labels_resp.get("success"):
                 # On renvoie quand même l'entity et les ids si l'enrichissement échoue
                 linked_entities = {qid: {"id": qid, "url": f"https://www.wikidata.org/wiki/{qid}"} for qid in linked_ids}
@@ -236,9 +440,9 @@ def register_wikidata_tools(mcp):
             max_values_per_identifier = 5
 
         try:
-            service = WikidataAPIService()
+            service = AsyncWikidataAPIService()
 
-            search = service.search_entities(query=query, language=language, limit=search_limit)
+            search = await service.search_entities(query=query, language=language, limit=search_limit)
             if not search.get("success"):
                 return search
 
@@ -255,7 +459,12 @@ def register_wikidata_tools(mcp):
 
             selected = results[0]
             entity_id = selected.get("id")
-            entity_data = service.get_entity_data(entity_id)
+            emit_partial_result("candidate_selected", entity=selected, candidates_count=len(results))
+            entity_data = await service.get_entity_data(
+                entity_id,
+                props=["labels", "descriptions", "claims", "sitelinks"],
+                languages=[language],
+            )
             if not entity_data.get("success"):
                 return {
                     "success": False,
@@ -275,7 +484,22 @@ def register_wikidata_tools(mcp):
                 return extracted
 
             linked_ids = extracted.get("linked_entity_ids", [])
-            labels_resp = service.get_entities_labels(linked_ids, language=language)
+            emit_partial_result(
+                "relations_extracted",
+                relations=extracted.get("relations", {}),
+                linked_entities_count=len(linked_ids),
+            )
+
+            # Labels des entités liées et identifiants externes sont indépendants: en parallèle
+            labels_resp, identifiers_resp = await asyncio.gather(
+                service.get_entities_labels(linked_ids, language=language, on_progress=_labels_progress),
+                service.extract_external_identifiers(
+                    entity,
+                    language=language,
+                    max_properties=max_identifier_properties,
+                    max_values_per_property=max_values_per_identifier,
+                ),
+            )
             if not labels_resp.get("success"):
                 linked_entities = {
                     qid: {"id": qid, "url": f"https://www.wikidata.org/wiki/{qid}"}
@@ -285,12 +509,6 @@ def register_wikidata_tools(mcp):
                 linked_entities = labels_resp.get("entities", {})
 
             sitelinks_resp = service.extract_sitelinks(entity)
-            identifiers_resp = service.extract_external_identifiers(
-                entity,
-                language=language,
-                max_properties=max_identifier_properties,
-                max_values_per_property=max_values_per_identifier,
-            )
 
             return {
                 "success": True,
@@ -315,6 +533,91 @@ def register_wikidata_tools(mcp):
             logger.error(f"deep_dive_wikidata_topic error: {e}")
             return {"success": False, "error": str(e)}
 
+    @mcp.tool()
+    async def explore_wikidata_graph(
+        query: str,
+        language: str = "fr",
+        depth: int = 2,
+        max_nodes_per_level: int = 100,
+        max_links_per_node: int = 50,
+        properties: Optional[List[str]] = None,
+        exclude_properties: Optional[List[str]] = None,
+        ctx=None,
+    ):
+        """\
+        Explore le graphe de relations Wikidata sur plusieurs sauts (parcours en largeur).
+
+        Le tool:
+        - sélectionne l'entité (Qid direct ou 1er résultat de recherche pour `query`)
+        - développe les relations niveau par niveau (lots de 50 entités, en parallèle)
+        - ne visite chaque entité qu'une fois et limite le nombre de nœuds par niveau
+        - retourne un graphe compact: listes de nœuds/propriétés indexées et
+          arêtes `[source, propriété, cible]` (indices dans `nodes.ids` / `properties.ids`)
+
+        Args:
+            query: Sujet ou Qid de départ (ex: "SEO", "Q180711")
+            language: Langue des labels (ex: fr, en)
+            depth: Nombre de sauts (1-3)
+            max_nodes_per_level: Nouveaux nœuds retenus par niveau (1-500)
+            max_links_per_node: Relations suivies par nœud (1-500)
+            properties: Propriétés à suivre uniquement (ex: ["P31", "P279", "P361"])
+            exclude_properties: Propriétés à ignorer (ex: ["P17"])
+        """
+        if not query or not str(query).strip():
+            return {"success": False, "error": "query is required and cannot be empty"}
+
+        if depth < 1 or depth > 3:
+            depth = 2
+
+        if max_nodes_per_level < 1 or max_nodes_per_level > 500:
+            max_nodes_per_level = 100
+
+        if max_links_per_node < 1 or max_links_per_node > 500:
+            max_links_per_node = 50
+
+        try:
+            service = AsyncWikidataAPIService()
+
+            query = str(query).strip()
+            if re.fullmatch(r"[Qq]\d+", query):
+                root_id = query.upper()
+            else:
+                search = await service.search_entities(query=query, language=language, limit=1)
+                if not search.get("success"):
+                    return search
+
+                results = search.get("results", [])
+                if not results:
+                    return {
+                        "success": True,
+                        "query": query,
+                        "language": language,
+                        "message": "No Wikidata entity found for this query",
+                        "root": None,
+                    }
+                root_id = results[0].get("id")
+
+            graph = await crawl_relation_graph(
+                service,
+                root_id,
+                language=language,
+                depth=depth,
+                max_nodes_per_level=max_nodes_per_level,
+                max_links_per_node=max_links_per_node,
+                properties={p.strip().upper() for p in properties if p and p.strip()} if properties else None,
+                exclude_properties={p.strip().upper() for p in exclude_properties if p and p.strip()} if exclude_properties else None,
+                on_level=lambda level, nodes, frontier: emit_progress(
+                    "graph_level", level, depth, nodes=nodes, frontier=frontier
+                ),
+            )
+            if not graph.get("success"):
+                return graph
+
+            return {"query": query, **graph}
+        except Exception as e:
+            logger.error(f"explore_wikidata_graph error: {e}")
+            return {"success": False, "error": str(e)}
+
     @mcp.tool()
     async def resolve_wikidata_entities(
         entities: List[str],
@@ -329,7 +632,8 @@ def register_wikidata_tools(mcp):
         Objectif: éviter que le modèle fasse des appels un par un.
         Le tool:
         - dé-duplique les termes
-        - parallélise les appels à Wikidata (`wbsearchentities`)
+        - résout localement les termes présents dans l'index de labels de la langue (LABEL_INDEX_PATH)
+        - parallélise les appels à Wikidata (`wbsearchentities`) pour les autres
         - retourne une liste unique d'entités (Qid) + URLs cliquables
 
         Args:
@@ -347,13 +651,21 @@ def register_wikidata_tools(mcp):
             max_concurrency = 8
 
         terms = _dedupe_terms(entities)
-        service = WikidataAPIService()
+        service = AsyncWikidataAPIService()
         sem = asyncio.Semaphore(max_concurrency)
+        resolved_count = 0
 
         async def resolve_one(term: str) -> Dict[str, Any]:
+            nonlocal resolved_count
+            item = await resolve_term(term)
+            resolved_count += 1
+            emit_partial_result("term_resolved", **item)
+            emit_progress("resolve", resolved_count, len(terms))
+            return item
+
+        async def resolve_term(term: str) -> Dict[str, Any]:
             async with sem:
-                resp = await asyncio.to_thread(
-                    service.search_entities,
+                resp = await service.search_entities(
                     query=term,
                     language=language,
                     limit=search_limit,
@@ -363,7 +675,7 @@ def register_wikidata_tools(mcp):
 
                 results = resp.get("results", []) or []
                 if not results:
-                    return {"term": term, "success": True, "entity": None, "candidates": []}
+                    return {"term": term, "success": True, "entity": None, "candidates": [], "source": resp.get("source")}
 
                 best = results[0]
                 qid = best.get("id")
@@ -378,6 +690,7 @@ def register_wikidata_tools(mcp):
                         or (f"https://www.wikidata.org/wiki/{qid}" if qid else None),
                     },
                     "candidates": results,
+                    "source": resp.get("source"),
                 }
 
         resolved = await asyncio.gather(*(resolve_one(t) for t in terms))
@@ -408,36 +721,47 @@ def register_wikidata_tools(mcp):
             "entities_count": len(entities_list),
             "entities": entities_list,
             "unresolved": unresolved,
+            "resolved_locally": sum(1 for item in resolved if item.get("source") == "local"),
         }
 
     @mcp.tool()
     async def resolve_wikidata_entities_from_text(
-        text: str,
+        text: str = "",
         language: str = "fr",
         max_terms: int = 50,
         search_limit: int = 5,
         max_concurrency: int = 8,
+        texts: Optional[List[str]] = None,
         ctx=None,
     ):
         """\
-        Extrait des entités candidates depuis un texte puis les résout vers Wikidata.
+        Extrait des entités candidates depuis un ou plusieurs textes puis les résout vers Wikidata.
+
+        Les textes (`text` et/ou `texts`: plusieurs documents, articles complets, transcriptions)
+        sont analysés par blocs; les candidats sont dé-dupliqués entre documents et classés par
+        nombre d'occurrences: seuls les `max_terms` plus fréquents sont résolus.
 
         Note: l'extraction est heuristique (noms propres). Pour un NER plus précis,
         laisse le modèle produire une liste de candidats et appelle `resolve_wikidata_entities`.
         """
-        if not text or not str(text).strip():
-            return {"success": False, "error": "text is required and cannot be empty"}
+        documents = [str(doc) for doc in ([text] + list(texts or [])) if doc and str(doc).strip()]
+        if not documents:
+            return {"success": False, "error": "text (or texts) is required and cannot be empty"}
 
         if max_terms < 1 or max_terms > 200:
             max_terms = 50
 
-        terms = _extract_terms_from_text(str(text), max_terms=max_terms)
-        return await resolve_wikidata_entities(
-            entities=terms,
+        ranked = _rank_terms(documents, max_terms=max_terms)
+        resolution = await resolve_wikidata_entities(
+            entities=[term for term, _ in ranked],
             language=language,
             search_limit=search_limit,
             max_concurrency=max_concurrency,
         )
+        if resolution.get("success"):
+            resolution["documents_count"] = len(documents)
+            resolution["term_frequencies"] = [{"term": term, "count": count} for term, count in ranked]
+        return resolution
 
     @mcp.tool()
     async def resolve_wikidata_entities_from_urls(
@@ -452,6 +776,10 @@ def register_wikidata_tools(mcp):
         """\
         Prend une liste d'URLs, extrait des entités candidates (title/h1 + liens Wikipedia présents),
         dé-duplique, puis résout en batch vers Wikidata.
+
+        Les pages sont téléchargées en parallèle (URL_FETCH_CONCURRENCY, au plus URL_FETCH_PER_DOMAIN
+        par domaine); les termes sont extraits au fil des octets reçus et la lecture d'une page
+        s'arrête dès que `max_terms_per_url * 5` liens Wikipedia, le title et le h1 ont été vus.
         """
         if not isinstance(urls, list) or not urls:
             return {"success": False, "error": "urls must be a non-empty list"}
@@ -459,21 +787,26 @@ def register_wikidata_tools(mcp):
         if max_terms_per_url < 1 or max_terms_per_url > 200:
             max_terms_per_url = 30
 
-        fetched: List[Dict[str, Any]] = []
-        all_terms: List[str] = []
+        config = get_url_fetch_config()
+        fetch_slots = asyncio.Semaphore(max(1, config["concurrency"]))
+        domain_slots: Dict[str, asyncio.Semaphore] = {}
 
-        for raw in urls:
-            url = _normalize_term(raw)
-            if not url:
-                continue
+        async def fetch_one(url: str) -> Dict[str, Any]:
+            domain = urlsplit(url).netloc.lower()
+            domain_sem = domain_slots.setdefault(domain, asyncio.Semaphore(max(1, config["per_domain"])))
             try:
-                resp = requests.get(url, timeout=timeout_seconds)
-                resp.raise_for_status()
-                terms = _extract_terms_from_url_html(resp.text, max_terms=max_terms_per_url)
-                fetched.append({"url": url, "success": True, "terms": terms, "terms_count": len(terms)})
-                all_terms.extend(terms)
+                async with domain_sem, fetch_slots:
+                    item = {"url": url, "success": True, **await _fetch_page_terms(client, url, max_terms_per_url, timeout_seconds)}
             except Exception as e:
-                fetched.append({"url": url, "success": False, "error": str(e)})
+                item = {"url": url, "success": False, "error": str(e)}
+            emit_partial_result("url_fetched", **item)
+            return item
+
+        targets = [url for url in (_normalize_term(raw) for raw in urls) if url]
+        # Sites tiers: client dédié, fermé en fin d'appel (pas le transport partagé Wikimedia)
+        async with web_page_client(config["concurrency"]) as client:
+            fetched: List[Dict[str, Any]] = list(await asyncio.gather(*(fetch_one(url) for url in targets)))
+        all_terms: List[str] = [term for item in fetched if item.get("success") for term in item["terms"]]
 
         deduped_terms = _dedupe_terms(all_terms)
         resolution = await resolve_wikidata_entities(
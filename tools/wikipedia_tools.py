@@ -1,10 +1,35 @@
 """Wikipedia search and statistics tools"""
 
 import logging
-from services.wikipedia_api import WikipediaAPIService
+import time
+from typing import Any, Callable, Dict, List, Optional
+from core.events import emit_partial_result, emit_progress
+from services.pageviews_analytics import analyze_views, build_views_matrix, numpy_available
+from services.pageviews_stats import daily_range
+from services.wikipedia_api import AsyncWikipediaAPIService
 
 logger = logging.getLogger(__name__)
 
+
+def _stats_reporter(kind: str, titles: List[str]) -> Callable[[int, Dict[str, Any]], None]:
+    """Callback `on_result`: relaie chaque statistique dès qu'elle est calculée (SSE)"""
+    completed = 0
+
+    def on_result(index: int, stats: Dict[str, Any]) -> None:
+        nonlocal completed
+        completed += 1
+        emit_partial_result(
+            kind,
+            index=index,
+            title=titles[index],
+            success=stats.get("success"),
+            statistics=stats.get("statistics"),
+            error=stats.get("error"),
+        )
+        emit_progress("stats", completed, len(titles))
+
+    return on_result
+
 def register_wikipedia_tools(mcp):
     """Enregistre les outils de recherche et statistiques Wikipedia"""
     
@@ -14,6 +39,7 @@ def register_wikipedia_tools(mcp):
         language: str = "en",
         max_results: int = 20,
         include_stats: bool = True,
+        max_concurrency: Optional[int] = None,
         ctx=None
     ):
         """
@@ -33,6 +59,7 @@ def register_wikipedia_tools(mcp):
             language: Code de langue Wikipedia (en, fr, de, es, etc.). Défaut: "en"
             max_results: Nombre maximum de pages à retourner (1-50). Défaut: 20
             include_stats: Inclure les statistiques détaillées pour chaque page. Défaut: True
+            max_concurrency: Nombre max de pages dont les stats sont récupérées en parallèle (1-32). Défaut: WIKIPEDIA_STATS_CONCURRENCY (10)
         
         Returns:
             Un dictionnaire JSON contenant:
@@ -63,18 +90,22 @@ def register_wikipedia_tools(mcp):
         if max_results < 1 or max_results > 50:
             return {"error": "max_results must be between 1 and 50"}
         
+        if max_concurrency is not None and (max_concurrency < 1 or max_concurrency > 32):
+            max_concurrency = None
+        
         try:
             # Créer le service Wikipedia pour la langue spécifiée
-            wiki_service = WikipediaAPIService(language=language)
+            wiki_service = AsyncWikipediaAPIService(language=language)
             
             # Rechercher les pages
             logger.info(f"Searching Wikipedia for '{keyword}' in {language}")
-            search_results = wiki_service.search_pages(keyword, limit=max_results)
+            search_results = await wiki_service.search_pages(keyword, limit=max_results)
             
             if not search_results.get("success"):
                 return search_results
             
             pages = search_results.get("results", [])
+            emit_progress("search", results=len(pages))
             
             if not pages:
                 return {
@@ -91,12 +122,17 @@ def register_wikipedia_tools(mcp):
                 logger.info(f"Fetching statistics for {len(pages)} pages")
                 enriched_pages = []
                 
-                for page in pages:
+                # Infos en lots de 50 titres, puis séries de vues en parallèle (ordre conservé)
+                titles = [page["title"] for page in pages]
+                all_stats = await wiki_service.get_comprehensive_stats_bulk(
+                    titles,
+                    max_concurrency=max_concurrency,
+                    on_result=_stats_reporter("page_stats", titles)
+                )
+                
+                for page, stats in zip(pages, all_stats):
                     page_title = page["title"]
                     
-                    # Récupérer les statistiques complètes
-                    stats = wiki_service.get_comprehensive_stats(page_title)
-                    
                     if stats.get("success"):
                         page_info = stats.get("page_info", {})
                         statistics = stats.get("statistics", {})
@@ -176,8 +212,8 @@ def register_wikipedia_tools(mcp):
             return {"error": "page_title is required and cannot be empty"}
         
         try:
-            wiki_service = WikipediaAPIService(language=language)
-            stats = wiki_service.get_comprehensive_stats(page_title)
+            wiki_service = AsyncWikipediaAPIService(language=language)
+            stats = await wiki_service.get_comprehensive_stats(page_title)
             
             return stats
             
@@ -195,6 +231,7 @@ def register_wikipedia_tools(mcp):
         include_stats: bool = False,
         max_links_with_stats: int = 20,
         max_internal_links: int = 200,
+        max_concurrency: Optional[int] = None,
         ctx=None
     ):
         """
@@ -211,6 +248,7 @@ def register_wikipedia_tools(mcp):
             language: Code de langue Wikipedia (en, fr, de, es, etc.). Défaut: "fr"
             include_stats: Si True, récupère les statistiques de vues pour chaque lien. Défaut: False
             max_links_with_stats: Nombre maximum de liens pour lesquels récupérer les stats (1-100). Défaut: 20
+            max_concurrency: Nombre max de liens dont les stats sont récupérées en parallèle (1-32). Défaut: WIKIPEDIA_STATS_CONCURRENCY (10)
         
         Returns:
             Un dictionnaire JSON contenant:
@@ -232,10 +270,10 @@ def register_wikipedia_tools(mcp):
             # Sans statistiques (rapide)
             get_wikipedia_internal_links(keyword="SEO", language="fr")
             
-            # Avec statistiques pour les 20 premiers liens (prend ~20 secondes)
+            # Avec statistiques pour les 20 premiers liens (quelques secondes)
             get_wikipedia_internal_links(keyword="SEO", language="fr", include_stats=True, max_links_with_stats=20)
             
-            # Avec statistiques pour les 50 premiers liens (prend ~50 secondes)
+            # Avec statistiques pour les 50 premiers liens (stats récupérées en parallèle)
             get_wikipedia_internal_links(keyword="SEO", language="fr", include_stats=True, max_links_with_stats=50)
         """
         if not keyword or not str(keyword).strip():
@@ -249,13 +287,16 @@ def register_wikipedia_tools(mcp):
         if max_internal_links < 1 or max_internal_links > 2000:
             max_internal_links = 200
         
+        if max_concurrency is not None and (max_concurrency < 1 or max_concurrency > 32):
+            max_concurrency = None
+        
         try:
             # Créer le service Wikipedia pour la langue spécifiée
-            wiki_service = WikipediaAPIService(language=language)
+            wiki_service = AsyncWikipediaAPIService(language=language)
             
             # D'abord, rechercher la page correspondant au mot-clé
             logger.info(f"Searching Wikipedia for '{keyword}' in {language}")
-            search_results = wiki_service.search_pages(keyword, limit=1)
+            search_results = await wiki_service.search_pages(keyword, limit=1)
             
             if not search_results.get("success") or not search_results.get("results"):
                 return {
@@ -270,9 +311,22 @@ def register_wikipedia_tools(mcp):
             
             logger.info(f"Found page: {page_title}")
             logger.info(f"Extracting internal links...")
+            emit_partial_result("page_selected", page_title=page_title, page_url=page_url)
             
-            # Extraire les liens internes de cette page
-            links_data = wiki_service.get_internal_links(page_title, max_links=max_internal_links)
+            # Extraire les liens internes de cette page: en streaming (SSE), chaque page
+            # de résultats est transmise au client dès réception
+            links_data = None
+            async for event in wiki_service.stream_internal_links(page_title, max_links=max_internal_links):
+                if event["type"] == "links":
+                    emit_partial_result(
+                        "links_batch",
+                        page_title=page_title,
+                        batch=event["batch"],
+                        links=event["links"],
+                        total_links=event["total_links"],
+                    )
+                else:
+                    links_data = event["result"]
             
             if not links_data.get("success"):
                 return links_data
@@ -284,23 +338,23 @@ def register_wikipedia_tools(mcp):
                 # Limiter le nombre de liens pour lesquels on récupère les stats
                 links_to_process = links_data["internal_links"][:max_links_with_stats]
                 
-                # Récupérer les stats pour chaque lien de manière séquentielle
-                # (pour éviter de surcharger les APIs Wikipedia)
-                for idx, link in enumerate(links_to_process, 1):
-                    try:
-                        logger.info(f"Fetching stats for link {idx}/{len(links_to_process)}: {link['linked_page_title']}")
-                        stats = wiki_service.get_comprehensive_stats(link["linked_page_title"])
-                        
-                        if stats.get("success"):
-                            link["statistics"] = stats.get("statistics", {})
-                            link["page_info"] = stats.get("page_info", {})
-                        else:
-                            link["statistics"] = None
-                            link["stats_error"] = stats.get("error", "Unknown error")
-                    except Exception as e:
-                        logger.error(f"Error getting stats for {link['linked_page_title']}: {e}")
+                # Infos des pages liées en lots de 50 titres, puis séries de vues en parallèle
+                # (concurrence bornée + plafond de requêtes/s par hôte dans le transport)
+                titles = [link["linked_page_title"] for link in links_to_process]
+                all_stats = await wiki_service.get_comprehensive_stats_bulk(
+                    titles,
+                    max_concurrency=max_concurrency,
+                    on_result=_stats_reporter("link_stats", titles)
+                )
+                
+                for link, stats in zip(links_to_process, all_stats):
+                    if stats.get("success"):
+                        link["statistics"] = stats.get("statistics", {})
+                        link["page_info"] = stats.get("page_info", {})
+                    else:
+                        logger.warning(f"Error getting stats for {link['linked_page_title']}: {stats.get('error')}")
                         link["statistics"] = None
-                        link["stats_error"] = str(e)
+                        link["stats_error"] = stats.get("error", "Unknown error")
                 
                 logger.info(f"Statistics fetched for {len(links_to_process)} pages")
                 links_data["stats_included"] = True
@@ -322,3 +376,328 @@ def register_wikipedia_tools(mcp):
                 "success": False,
                 "error": str(e)
             }
+    
+    @mcp.tool()
+    async def get_wikipedia_backlinks(
+        keyword: str,
+        language: str = "fr",
+        max_backlinks: int = 200,
+        ctx=None
+    ):
+        """
+        Récupère les articles Wikipedia qui font un lien vers la page trouvée pour un mot-clé.
+        
+        Répondu localement si un index de liens a été construit pour la langue
+        (voir LINK_GRAPH_PATH), sinon via l'API Wikipedia (list=backlinks).
+        
+        Args:
+            keyword: Le terme de recherche pour trouver la page Wikipedia
+            language: Code de langue Wikipedia (en, fr, de, es, etc.). Défaut: "fr"
+            max_backlinks: Nombre maximum de rétroliens (1-5000). Défaut: 200
+        
+        Returns:
+            Un dictionnaire JSON contenant:
+            - success: True/False
+            - page_title: Titre de la page trouvée
+            - total_backlinks: Nombre de rétroliens retournés
+            - backlinks: Liste des pages liantes (page_title, url)
+            - partial: True si d'autres rétroliens existent au-delà de max_backlinks
+            - source: "local" (index de liens) ou "api"
+        
+        Exemple d'utilisation:
+            get_wikipedia_backlinks(keyword="SEO", language="fr", max_backlinks=500)
+        """
+        if not keyword or not str(keyword).strip():
+            return {"error": "keyword is required and cannot be empty"}
+        
+        # Valider max_backlinks
+        if max_backlinks < 1 or max_backlinks > 5000:
+            max_backlinks = 200
+        
+        try:
+            wiki_service = AsyncWikipediaAPIService(language=language)
+            
+            search_results = await wiki_service.search_pages(keyword, limit=1)
+            if not search_results.get("success") or not search_results.get("results"):
+                return {
+                    "success": False,
+                    "error": f"No Wikipedia page found for keyword '{keyword}'"
+                }
+            
+            first_page = search_results["results"][0]
+            page_title = first_page["title"]
+            emit_partial_result("page_selected", page_title=page_title, page_url=first_page["url"])
+            
+            backlinks_data = await wiki_service.get_backlinks(page_title, max_links=max_backlinks)
+            if not backlinks_data.get("success"):
+                return backlinks_data
+            
+            backlinks_data["source_page_url"] = first_page["url"]
+            backlinks_data["keyword_searched"] = keyword
+            backlinks_data["language"] = language
+            
+            return backlinks_data
+            
+        except Exception as e:
+            logger.error(f"get_wikipedia_backlinks error: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    @mcp.tool()
+    async def rank_wikipedia_links_by_traffic(
+        keyword: str,
+        language: str = "fr",
+        top: int = 20,
+        days: int = 30,
+        max_internal_links: int = 2000,
+        time_budget: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        ctx=None
+    ):
+        """
+        Classe TOUS les liens internes d'une page Wikipedia par nombre de vues.
+        
+        Contrairement à get_wikipedia_internal_links (statistiques des N premiers liens,
+        dans l'ordre alphabétique de l'API), les vues de chaque page liée sont récupérées
+        en parallèle (avec cache) et seules les `top` pages les plus vues sont conservées.
+        
+        Args:
+            keyword: Le terme de recherche pour trouver la page Wikipedia
+            language: Code de langue Wikipedia (en, fr, de, es, etc.). Défaut: "fr"
+            top: Nombre de pages retournées (1-500). Défaut: 20
+            days: Période de comptage des vues, en jours jusqu'à hier (1-365). Défaut: 30
+            max_internal_links: Nombre maximum de liens internes classés (1-5000). Défaut: 2000
+            time_budget: Durée max en secondes (1-300). Une fois atteinte, le classement est
+                rendu sur les liens déjà traités (complete=False). Défaut: aucune limite
+            max_concurrency: Nombre max de séries récupérées en parallèle (1-32). Défaut: WIKIPEDIA_STATS_CONCURRENCY (10)
+        
+        Returns:
+            Un dictionnaire JSON contenant:
+            - success: True/False
+            - page_title / page_url: Page analysée
+            - top: Liste ordonnée de {rank, title, url, views}
+            - total_pages / ranked_pages: Liens internes à classer / effectivement classés
+            - complete: False si le budget de temps a interrompu le classement
+            - failed_pages: Liens dont les vues n'ont pas pu être récupérées
+        
+        Exemple d'utilisation:
+            rank_wikipedia_links_by_traffic(keyword="SEO", language="fr", top=10)
+            rank_wikipedia_links_by_traffic(keyword="Paris", language="fr", top=50, time_budget=20)
+        """
+        if not keyword or not str(keyword).strip():
+            return {"error": "keyword is required and cannot be empty"}
+        
+        if top < 1 or top > 500:
+            top = 20
+        if days < 1 or days > 365:
+            days = 30
+        if max_internal_links < 1 or max_internal_links > 5000:
+            max_internal_links = 2000
+        if time_budget is not None and (time_budget < 1 or time_budget > 300):
+            time_budget = None
+        if max_concurrency is not None and (max_concurrency < 1 or max_concurrency > 32):
+            max_concurrency = None
+        
+        try:
+            wiki_service = AsyncWikipediaAPIService(language=language)
+            started = time.monotonic()
+            
+            search_results = await wiki_service.search_pages(keyword, limit=1)
+            if not search_results.get("success") or not search_results.get("results"):
+                return {
+                    "success": False,
+                    "error": f"No Wikipedia page found for keyword '{keyword}'"
+                }
+            
+            first_page = search_results["results"][0]
+            page_title = first_page["title"]
+            emit_partial_result("page_selected", page_title=page_title, page_url=first_page["url"])
+            
+            links_data = await wiki_service.get_internal_links(page_title, max_links=max_internal_links)
+            if not links_data.get("success"):
+                return links_data
+            
+            urls = {}
+            for link in links_data.get("internal_links", []):
+                urls.setdefault(link["linked_page_title"], link["url"])
+            titles = list(urls)
+            
+            # Le budget couvre tout l'appel: recherche et liens compris
+            remaining = None
+            if time_budget is not None:
+                remaining = max(0.0, time_budget - (time.monotonic() - started))
+            
+            completed = 0
+            
+            def on_result(index: int, views: Dict[str, Any]) -> None:
+                nonlocal completed
+                completed += 1
+                emit_progress("pageviews", completed, len(titles))
+            
+            start_date, end_date = daily_range(days)
+            logger.info(f"Ranking {len(titles)} linked pages of '{page_title}' by pageviews")
+            ranking = await wiki_service.top_pages_by_views(
+                titles, start_date, end_date,
+                top=top,
+                time_budget=remaining,
+                max_concurrency=max_concurrency,
+                on_result=on_result
+            )
+            
+            for entry in ranking["top"]:
+                entry["url"] = urls.get(entry["title"])
+            
+            return {
+                "success": True,
+                "page_title": page_title,
+                "page_url": first_page["url"],
+                "language": language,
+                "links_partial": links_data.get("partial", False),
+                **ranking
+            }
+            
+        except Exception as e:
+            logger.error(f"rank_wikipedia_links_by_traffic error: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    @mcp.tool()
+    async def analyze_wikipedia_pageviews(
+        page_titles: Optional[List[str]] = None,
+        hub_keyword: Optional[str] = None,
+        language: str = "en",
+        days: int = 400,
+        window: int = 7,
+        spike_threshold: float = 3.5,
+        max_pages: int = 500,
+        top: int = 20,
+        max_concurrency: Optional[int] = None,
+        ctx=None
+    ):
+        """
+        Analyse comparative des vues quotidiennes de nombreuses pages Wikipedia (NumPy).
+        
+        Les séries quotidiennes de toutes les pages sont rassemblées dans une matrice
+        (pages × jours) et analysées en une passe vectorisée: tendance, croissance,
+        évolution annuelle corrigée du jour de la semaine, pics d'audience et classements.
+        Passe à l'échelle sur des milliers de pages (ex: tous les liens internes d'une page).
+        
+        Args:
+            page_titles: Titres des pages à analyser
+            hub_keyword: Alternative à page_titles: analyse les pages liées depuis la page trouvée pour ce mot-clé
+            language: Code de langue Wikipedia (en, fr, de, es, etc.). Défaut: "en"
+            days: Nombre de jours d'historique (60-1000). Défaut: 400 (nécessaire pour l'évolution annuelle)
+            window: Taille de la moyenne mobile en jours (1-90). Défaut: 7
+            spike_threshold: Seuil de z-score robuste (médiane/MAD) au-delà duquel un jour est un pic. Défaut: 3.5
+            max_pages: Nombre maximum de pages analysées (1-2000). Défaut: 500
+            top: Nombre de pages par classement (1-100). Défaut: 20
+            max_concurrency: Nombre max de séries récupérées en parallèle (1-32). Défaut: WIKIPEDIA_STATS_CONCURRENCY (10)
+        
+        Returns:
+            Un dictionnaire JSON contenant:
+            - success: True/False
+            - start_date / end_date / days: Période analysée
+            - pages: Colonnes alignées sur `titles` (total_views, daily_average, rolling_mean,
+              growth_percent (30 j vs 30 j précédents), yoy_percent (28 j vs 52 semaines plus tôt),
+              spike_count, top_spike)
+            - rankings: Titres classés par vues, croissance, évolution annuelle et intensité de pic
+            - failed_pages: Pages dont la série n'a pas pu être récupérée
+        
+        Exemple d'utilisation:
+            analyze_wikipedia_pageviews(hub_keyword="SEO", language="fr", max_pages=300)
+            analyze_wikipedia_pageviews(page_titles=["Python (langage)", "JavaScript"], language="fr")
+        """
+        if not numpy_available():
+            return {
+                "success": False,
+                "error": "NumPy is required for pageviews analytics (pip install numpy)"
+            }
+        
+        if not page_titles and not (hub_keyword and str(hub_keyword).strip()):
+            return {"error": "page_titles or hub_keyword is required"}
+        
+        if days < 60 or days > 1000:
+            days = 400
+        if window < 1 or window > 90:
+            window = 7
+        if max_pages < 1 or max_pages > 2000:
+            max_pages = 500
+        if top < 1 or top > 100:
+            top = 20
+        if max_concurrency is not None and (max_concurrency < 1 or max_concurrency > 32):
+            max_concurrency = None
+        
+        try:
+            wiki_service = AsyncWikipediaAPIService(language=language)
+            source: Dict[str, Any] = {}
+            
+            if page_titles:
+                titles = list(dict.fromkeys(t.strip() for t in page_titles if t and t.strip()))
+            else:
+                search_results = await wiki_service.search_pages(hub_keyword, limit=1)
+                if not search_results.get("success") or not search_results.get("results"):
+                    return {
+                        "success": False,
+                        "error": f"No Wikipedia page found for keyword '{hub_keyword}'"
+                    }
+                hub_title = search_results["results"][0]["title"]
+                links_data = await wiki_service.get_internal_links(hub_title, max_links=max_pages)
+                if not links_data.get("success"):
+                    return links_data
+                titles = list(dict.fromkeys(link["linked_page_title"] for link in links_data.get("internal_links", [])))
+                source = {"hub_page_title": hub_title, "hub_page_url": search_results["results"][0]["url"]}
+                emit_partial_result("page_selected", page_title=hub_title, links_count=len(titles))
+            
+            titles = titles[:max_pages]
+            if not titles:
+                return {"success": False, "error": "No pages to analyze"}
+            
+            start_date, end_date = daily_range(days)
+            completed = 0
+            
+            def on_result(index: int, views: Dict[str, Any]) -> None:
+                nonlocal completed
+                completed += 1
+                emit_progress("pageviews", completed, len(titles))
+            
+            logger.info(f"Fetching daily pageviews for {len(titles)} pages ({start_date}-{end_date})")
+            all_views = await wiki_service.get_daily_views_bulk(
+                titles, start_date, end_date,
+                max_concurrency=max_concurrency,
+                on_result=on_result
+            )
+            
+            analyzed_titles = []
+            series = []
+            failed_pages = []
+            for title, views in zip(titles, all_views):
+                if views.get("success"):
+                    analyzed_titles.append(title)
+                    series.append(views.get("views", []))
+                else:
+                    failed_pages.append({"title": title, "error": views.get("error", "Unknown error")})
+            
+            matrix = build_views_matrix(series, start_date, days)
+            analysis = analyze_views(
+                analyzed_titles, matrix, start_date,
+                window=window, spike_threshold=spike_threshold, top=top
+            )
+            
+            return {
+                "success": True,
+                "language": language,
+                **source,
+                **analysis,
+                "failed_pages": failed_pages
+            }
+            
+        except Exception as e:
+            logger.error(f"analyze_wikipedia_pageviews error: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }